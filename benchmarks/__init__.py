@@ -0,0 +1,16 @@
+"""
+Benchmarky pro extract_files_script.py.
+
+    synthetic             generátor syntetických artefaktů
+    bench_extractor       fáze i celá extrakce, baseline a hlídání regresí
+    bench_csharp_scanner  C# scanner proti původní kaskádě regexů
+    pathological          patologické vstupy a kontrola lineární složitosti
+    pipeline_latency      --pipeline zapisuje uzavřené bloky hned, ne až na konci roury
+    shard_equivalence     --parse-jobs extrahuje totéž co sériový průchod
+
+Spouštěj z kořene repozitáře, např.:
+    python -m benchmarks.bench_extractor --check
+
+baseline.json je změřená na jednom stroji - na jiném HW (nebo po
+záměrné změně výkonu) ji přeulož pomocí --save-baseline.
+"""
@@ -0,0 +1,113 @@
+"""
+Porovnání C# scanneru s původní kaskádou regexů po řádcích.
+
+Usage:
+    python -m benchmarks.bench_csharp_scanner [--members N] [--repeat N]
+"""
+
+import argparse
+import re
+import timeit
+
+from extract_files_script import scan_csharp_declaration, starts_with_csharp_code
+
+
+def legacy_declaration(block: str):
+    """
+    Původní detekce z extract_csharp_file_info (před scannerem) - referenční baseline.
+    """
+    namespace_name = None
+    class_name = None
+    
+    for line in block.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith('//') or stripped.startswith('/*') or stripped.startswith('*'):
+            continue
+        
+        namespace_match = re.match(r'namespace\s+([^\s{]+)', stripped)
+        if namespace_match:
+            namespace_name = namespace_match.group(1)
+            continue
+        
+        class_matches = [
+            re.match(r'.*?(?:public|internal|private)?\s*(?:partial\s+)?(?:class|interface|record|enum|struct)\s+(\w+)', stripped),
+            re.match(r'.*?\[Generator\].*?(?:public|internal)?\s*(?:class)\s+(\w+)', stripped),
+            re.match(r'.*?(?:public|internal)?\s*(?:static\s+)?(?:class)\s+(\w+)', stripped)
+        ]
+        for match in class_matches:
+            if match:
+                class_name = match.group(1)
+                break
+    
+    return namespace_name, class_name
+
+
+def legacy_is_csharp(block: str) -> bool:
+    for line in block.split('\n'):
+        line = line.strip()
+        if not line or line.startswith(('//', '/*', '*')):
+            continue
+        return line.startswith(('using ', 'namespace ', '[', 'public ', 'internal ', 'private '))
+    return False
+
+
+def make_block(members: int) -> str:
+    """
+    Jeden velký C# soubor - model s mnoha vlastnostmi a metodami.
+    """
+    lines = [
+        'using System;',
+        'using CommunityToolkit.Mvvm.ComponentModel;',
+        '',
+        'namespace HierarchicalMvvm.Demo.ViewModels;',
+        '',
+        '/// <summary>Model pro binding</summary>',
+        'public partial class LargeModel : ObservableObject',
+        '{',
+    ]
+    for i in range(members):
+        lines += [
+            f'    private string _value{i} = "class Fake{i} {{";',
+            f'    public string Value{i}',
+            '    {',
+            f'        get => _value{i};',
+            f'        set => SetProperty(ref _value{i}, value); // where T : class',
+            '    }',
+            '',
+        ]
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+def run(members: int, repeat: int):
+    block = make_block(members)
+    size_kb = len(block.encode('utf-8')) / 1024
+    
+    # (název, původní implementace, nová implementace)
+    cases = [
+        ('declaration', lambda: legacy_declaration(block), lambda: scan_csharp_declaration(block)),
+        ('declaration + span', lambda: legacy_declaration(block),
+         lambda: scan_csharp_declaration(block, find_end=True)),
+        ('is_csharp_code_block', lambda: legacy_is_csharp(block), lambda: starts_with_csharp_code(block)),
+    ]
+    
+    print(f"Blok: {members} členů, {size_kb:.0f} KiB")
+    for name, legacy, scanner in cases:
+        legacy_time = min(timeit.repeat(legacy, number=1, repeat=repeat))
+        scanner_time = min(timeit.repeat(scanner, number=1, repeat=repeat))
+        print(f"  {name:<22} legacy {legacy_time * 1000:9.3f} ms   "
+              f"scanner {scanner_time * 1000:9.3f} ms   ({legacy_time / scanner_time:8.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark C# scanneru')
+    parser.add_argument('--members', type=int, nargs='*', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    for members in args.members:
+        run(members, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+"""
+Benchmarky FileExtractor nad syntetickým artefaktem.
+
+Měří propustnost (MiB/s vstupu) a špičku alokované paměti (tracemalloc)
+jednotlivých fází i celé extrakce do dočasného adresáře (tmpfs, pokud je).
+Výsledky lze uložit jako baseline a proti ní hlídat regrese.
+
+Usage:
+    python -m benchmarks.bench_extractor
+    python -m benchmarks.bench_extractor --files 2000 --json results.json
+    python -m benchmarks.bench_extractor --save-baseline
+    python -m benchmarks.bench_extractor --check  # exit 1 při regresi
+
+Lineární složitost na patologických vstupech hlídá benchmarks/pathological.py.
+"""
+
+import argparse
+import atexit
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from extract_files_script import ArchiveWriter, ContentStore, FileExtractor, FileFilter, TreePacker, iter_lines
+from benchmarks.synthetic import ArtifactGenerator
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baseline.json'
+
+
+def scratch_root() -> str:
+    """
+    Adresář pro zápisy - /dev/shm, aby se měřil extraktor a ne disk.
+    """
+    shm = Path('/dev/shm')
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return str(shm)
+    return tempfile.gettempdir()
+
+
+class BenchmarkCase:
+    """
+    Jeden benchmark: setup() připraví vstup mimo měření, run(state) se měří.
+    """
+
+    def __init__(self, name: str, run: Callable, setup: Callable = lambda: None,
+                 teardown: Callable = lambda state: None, input_bytes: int = 0):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.teardown = teardown
+        self.input_bytes = input_bytes
+
+
+def tree_files(root: str) -> Dict[str, bytes]:
+    files = {}
+    for directory, dirnames, filenames in os.walk(root):
+        # .extract-cache apod. - pack skryté adresáře nebalí
+        dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+        for name in filenames:
+            path = os.path.join(directory, name)
+            files[os.path.relpath(path, root)] = Path(path).read_bytes()
+    return files
+
+
+def pack_tree(tree_dir: str) -> bytes:
+    output = io.BytesIO()
+    TreePacker([tree_dir], jobs=4).write(output)
+    return output.getvalue()
+
+
+def check_roundtrip(tree_dir: str):
+    """
+    Strom vzniklý extrakcí je v kanonické podobě, pack a nová extrakce
+    ho proto musí zopakovat bajtově přesně.
+    """
+    output_dir = tempfile.mkdtemp(prefix='extract-bench-roundtrip-', dir=scratch_root())
+    try:
+        FileExtractor(base_dir=output_dir).extract_all_files(pack_tree(tree_dir).decode('utf-8'))
+        original, extracted = tree_files(tree_dir), tree_files(output_dir)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    different = sorted(path for path in original if extracted.get(path) != original[path])
+    if different:
+        raise RuntimeError(f"Round-trip pack -> extrakce není bajtově přesný: {', '.join(different[:5])}")
+
+
+def build_cases(artifact: str) -> List[BenchmarkCase]:
+    # Prázdný base_dir - routování auto-detekce nezávisí na stromu, ze kterého se spouští
+    index_dir = tempfile.mkdtemp(prefix='extract-bench-index-', dir=scratch_root())
+    atexit.register(shutil.rmtree, index_dir, True)
+    extractor = FileExtractor(base_dir=index_dir)
+    artifact_bytes = len(artifact.encode('utf-8'))
+
+    # Vstupy pro čisticí funkce - surové (nevyčištěné) obsahy všech souborů z artefaktu.
+    # Auto bloky jsou vyčištěné už z detekce, jejich surový segment se vezme z artefaktu
+    # podle provenance - jinak by se měřila jen rychlá cesta pro čistý obsah.
+    index = extractor.build_index(iter_lines(artifact))
+    auto_contents = [artifact[block.provenance.start_offset:block.provenance.end_offset]
+                     for block in index if block.source == 'auto']
+    contents = [(block.path, artifact[block.provenance.start_offset:block.provenance.end_offset]
+                 if block.source == 'auto' else block.content) for block in index]
+    contents_bytes = sum(len(content.encode('utf-8')) for _, content in contents)
+    auto_bytes = sum(len(content.encode('utf-8')) for content in auto_contents)
+
+    # Strom pro pack - výsledek extrakce artefaktu
+    tree_dir = tempfile.mkdtemp(prefix='extract-bench-tree-', dir=scratch_root())
+    atexit.register(shutil.rmtree, tree_dir, True)
+    FileExtractor(base_dir=tree_dir).extract_all_files(artifact)
+    tree_bytes = sum(len(data) for data in tree_files(tree_dir).values())
+    check_roundtrip(tree_dir)
+
+    # Teplé úložiště obsahu - měří se připojení výchozím způsobem (reflink, jinak kopie)
+    # do dalšího stromu, hardlink je jen na vyžádání (--store-link hardlink)
+    store_dir = tempfile.mkdtemp(prefix='extract-bench-store-', dir=scratch_root())
+    atexit.register(shutil.rmtree, store_dir, True)
+    warm_dir = tempfile.mkdtemp(prefix='extract-bench-warm-', dir=scratch_root())
+    FileExtractor(base_dir=warm_dir, store=ContentStore(store_dir)).extract_all_files(artifact)
+    shutil.rmtree(warm_dir, ignore_errors=True)
+
+    def clean_csharp():
+        for content in auto_contents:
+            extractor.clean_csharp_content(content)
+
+    def clean_files():
+        for path, content in contents:
+            extractor.clean_file_content(content, path)
+
+    def make_output_dir():
+        return tempfile.mkdtemp(prefix='extract-bench-', dir=scratch_root())
+
+    def extract_into(output_dir: str, jobs: int = 1):
+        writer = FileExtractor(base_dir=output_dir, force_overwrite=True, jobs=jobs)
+        writer.extract_all_files(artifact)
+
+    def extract_selected_into(output_dir: str):
+        # Jeden projekt z pěti - vyřazené bloky se nesbírají ani nečistí
+        selection = FileFilter(only=['src/HierarchicalMvvm.Generator/**'])
+        extractor = FileExtractor(base_dir=output_dir, force_overwrite=True, file_filter=selection)
+        extractor.extract_all_files(artifact)
+
+    def store_into(output_dir: str):
+        writer = FileExtractor(base_dir=output_dir, force_overwrite=True, store=ContentStore(store_dir))
+        writer.extract_all_files(artifact)
+
+    def archive_into(output_dir: str):
+        with ArchiveWriter(os.path.join(output_dir, 'out.tar')) as archive:
+            FileExtractor(base_dir=index_dir, archive=archive).extract_all_files(artifact)
+
+    def pack_into_null():
+        with open(os.devnull, 'wb') as output:
+            TreePacker([tree_dir], jobs=4).write(output)
+
+    def roundtrip_into(output_dir: str):
+        packed = pack_tree(tree_dir).decode('utf-8')
+        FileExtractor(base_dir=output_dir, force_overwrite=True).extract_all_files(packed)
+
+    def remove_output_dir(output_dir: str):
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    return [
+        BenchmarkCase('parse_artifact_content', lambda _: extractor.parse_artifact_content(artifact),
+                      input_bytes=artifact_bytes),
+        BenchmarkCase('detect_csharp_files', lambda _: extractor.detect_csharp_files(artifact),
+                      input_bytes=artifact_bytes),
+        BenchmarkCase('extract_project_files', lambda _: extractor.extract_project_files(artifact),
+                      input_bytes=artifact_bytes),
+        BenchmarkCase('clean_csharp_content', lambda _: clean_csharp(), input_bytes=auto_bytes),
+        BenchmarkCase('clean_file_content', lambda _: clean_files(), input_bytes=contents_bytes),
+        BenchmarkCase('end_to_end_write', lambda output_dir: extract_into(output_dir),
+                      setup=make_output_dir, teardown=remove_output_dir, input_bytes=artifact_bytes),
+        BenchmarkCase('end_to_end_write_jobs4', lambda output_dir: extract_into(output_dir, jobs=4),
+                      setup=make_output_dir, teardown=remove_output_dir, input_bytes=artifact_bytes),
+        BenchmarkCase('end_to_end_only', lambda output_dir: extract_selected_into(output_dir),
+                      setup=make_output_dir, teardown=remove_output_dir, input_bytes=artifact_bytes),
+        BenchmarkCase('end_to_end_store', lambda output_dir: store_into(output_dir),
+                      setup=make_output_dir, teardown=remove_output_dir, input_bytes=artifact_bytes),
+        BenchmarkCase('end_to_end_archive', lambda output_dir: archive_into(output_dir),
+                      setup=make_output_dir, teardown=remove_output_dir, input_bytes=artifact_bytes),
+        BenchmarkCase('pack_tree', lambda _: pack_into_null(), input_bytes=tree_bytes),
+        BenchmarkCase('roundtrip_pack_extract', lambda output_dir: roundtrip_into(output_dir),
+                      setup=make_output_dir, teardown=remove_output_dir, input_bytes=tree_bytes),
+    ]
+
+
+def measure(case: BenchmarkCase, repeat: int) -> Dict:
+    """
+    Nejlepší čas z repeat běhů a špička paměti z jednoho samostatného běhu.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        state = case.setup()
+        gc.collect()
+        start = time.perf_counter()
+        case.run(state)
+        best = min(best, time.perf_counter() - start)
+        case.teardown(state)
+
+    # tracemalloc zpomaluje, proto se paměť měří zvlášť
+    state = case.setup()
+    gc.collect()
+    tracemalloc.start()
+    case.run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    case.teardown(state)
+
+    return {
+        'seconds': best,
+        'input_bytes': case.input_bytes,
+        'throughput_mib_s': case.input_bytes / best / 1024 / 1024 if best else 0.0,
+        'peak_memory_bytes': peak,
+    }
+
+
+def check_regressions(results: Dict, baseline: Dict, tolerance: float,
+                      memory_tolerance: float) -> List[str]:
+    """
+    Porovná výsledky s baseline - propustnost nesmí klesnout o víc než tolerance
+    a špička paměti (ta je na rozdíl od času deterministická) stoupnout o víc
+    než memory_tolerance.
+    """
+    problems = []
+
+    if baseline.get('config') != results['config']:
+        problems.append(f"konfigurace se liší od baseline ({baseline.get('config')})")
+        return problems
+
+    for name, result in results['benchmarks'].items():
+        expected = baseline['benchmarks'].get(name)
+        if not expected:
+            # Nový benchmark bez baseline by se nikdy nehlídal
+            problems.append(f"{name}: chybí v baseline - přeulož ji pomocí --save-baseline")
+            continue
+
+        min_throughput = expected['throughput_mib_s'] * (1 - tolerance)
+        if result['throughput_mib_s'] < min_throughput:
+            problems.append(f"{name}: propustnost {result['throughput_mib_s']:.2f} MiB/s "
+                            f"< {min_throughput:.2f} MiB/s")
+
+        max_memory = expected['peak_memory_bytes'] * (1 + memory_tolerance)
+        if result['peak_memory_bytes'] > max_memory:
+            problems.append(f"{name}: špička paměti {result['peak_memory_bytes'] / 1024 / 1024:.1f} MiB "
+                            f"> {max_memory / 1024 / 1024:.1f} MiB")
+
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarky FileExtractor')
+    parser.add_argument('--files', type=int, default=1000, help='Počet souborů v artefaktu')
+    parser.add_argument('--block-lines', type=int, default=60, help='Řádků těla jednoho souboru')
+    parser.add_argument('--explicit-share', type=float, default=0.7)
+    parser.add_argument('--project-share', type=float, default=0.1)
+    parser.add_argument('--repeat', type=int, default=5, help='Počet měřených běhů (bere se nejlepší)')
+    parser.add_argument('--only', nargs='*', help='Spustit jen vybrané benchmarky')
+    parser.add_argument('--json', type=str, help='Uložit výsledky do JSON souboru')
+    parser.add_argument('--baseline', type=str, default=str(BASELINE_PATH))
+    parser.add_argument('--save-baseline', action='store_true', help='Uložit výsledky jako novou baseline')
+    parser.add_argument('--check', action='store_true', help='Porovnat s baseline a při regresi skončit s 1')
+    parser.add_argument('--tolerance', type=float, default=0.35,
+                        help='Povolený pokles propustnosti oproti baseline')
+    parser.add_argument('--memory-tolerance', type=float, default=0.10,
+                        help='Povolený nárůst špičky paměti oproti baseline')
+    args = parser.parse_args()
+
+    config = {
+        'files': args.files,
+        'block_lines': args.block_lines,
+        'explicit_share': args.explicit_share,
+        'project_share': args.project_share,
+    }
+    artifact = ArtifactGenerator(**config).generate()
+    print(f"📦 Artefakt: {args.files} souborů, {len(artifact.encode('utf-8')) / 1024 / 1024:.1f} MiB")
+
+    results = {
+        'config': config,
+        'python': platform.python_version(),
+        'benchmarks': {},
+    }
+    for case in build_cases(artifact):
+        if args.only and case.name not in args.only:
+            continue
+        result = measure(case, args.repeat)
+        results['benchmarks'][case.name] = result
+        print(f"   {case.name:<24} {result['seconds'] * 1000:9.1f} ms  "
+              f"{result['throughput_mib_s']:8.2f} MiB/s  "
+              f"peak {result['peak_memory_bytes'] / 1024 / 1024:7.1f} MiB")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8', newline='\n') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"💾 Baseline uložena do {args.baseline}")
+
+    if args.check:
+        try:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except OSError as e:
+            print(f"❌ Nelze načíst baseline {args.baseline}: {e}")
+            sys.exit(1)
+
+        problems = check_regressions(results, baseline, args.tolerance, args.memory_tolerance)
+        if problems:
+            print("❌ Regrese oproti baseline:")
+            for problem in problems:
+                print(f"   • {problem}")
+            sys.exit(1)
+        print("✅ Bez regresí oproti baseline")
+
+
+if __name__ == '__main__':
+    main()
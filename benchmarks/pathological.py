@@ -0,0 +1,223 @@
+"""
+Patologické vstupy pro parsery extract_files_script.py a kontrola lineární složitosti.
+
+Každý případ se vygeneruje ve dvou velikostech (--size-mib a --scale krát
+větší) a projde celou extrakcí bez zápisu - streaming parser i --mmap index,
+auto-detekci a čištění obsahu. Kontroluje se:
+
+- rozpočet: čas na MiB vstupu větší varianty nesmí překročit --budget,
+- linearita: čas větší varianty smí vůči menší narůst nejvýš
+  scale * --max-growth krát (kvadratický parser by narostl scale^2 krát).
+
+Usage:
+    python -m benchmarks.pathological
+    python -m benchmarks.pathological --only megabyte_line unterminated_wrapper
+    python -m benchmarks.pathological --check  # exit 1 při překročení
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from extract_files_script import ArtifactIndex, FileExtractor, iter_lines
+from benchmarks.bench_extractor import scratch_root
+
+CODE_LINE = '        var value = items.Where(item => item.IsActive).Select(item => item.Name).ToList();\n'
+
+
+def repeat_to(unit: str, size: int) -> str:
+    """
+    Opakuje unit, dokud text nedosáhne aspoň size znaků.
+    """
+    return unit * (size // len(unit) + 1)
+
+
+def unterminated_wrapper(size: int) -> str:
+    # /* bez */ - explicitní i project blok běží až do konce vstupu
+    half = size // 2
+    return ('// File: src/A/Open.cs\n/*\n' + repeat_to(CODE_LINE, half)
+            + '// File: src/A/A.csproj\n/*\n' + repeat_to('    <Item Include="x" />\n', half))
+
+
+def unterminated_comment(size: int) -> str:
+    # Auto segment s neuzavřeným /* uprostřed kódu a neuzavřeným řetězcem
+    return ('using System;\n\nnamespace A.B;\n\npublic class Open\n{\n    /* komentář\n'
+            + repeat_to(CODE_LINE, size // 2) + '    var text = "neukončený řetězec\n'
+            + repeat_to(CODE_LINE, size // 2))
+
+
+def unterminated_raw_string(size: int) -> str:
+    return ('using System;\n\nnamespace A.B;\n\npublic class Raw\n{\n    const string Text = """\n'
+            + repeat_to('        "" " \\" @" $"{x}" \'c\' // /* */\n', size))
+
+
+def megabyte_line(size: int) -> str:
+    # Jeden obří řádek v explicitním bloku a jeden v auto segmentu
+    half = size // 2
+    return ('// File: src/A/Long.cs\n/*\n' + 'x = 1; ' * (half // 7) + '\n*/\n'
+            + '// ' + '=' * 67 + '\n'
+            + 'using System;\nnamespace A.B;\npublic class Long { ' + '/* */ "s" { } ' * (half // 14) + '}\n')
+
+
+def megabyte_marker_line(size: int) -> str:
+    # Řádek plný */ a mezer - zkouší regex konce obalu v --mmap indexu
+    return '// File: src/A/Markers.csproj\n/*\n' + '*/ ' * (size // 3) + 'x\n'
+
+
+def many_usings(size: int) -> str:
+    # Tisíce using bez deklarace typu - jeden obří segment, který není souborem
+    return repeat_to('using System.Collections.Generic.Something;\n', size)
+
+
+def many_namespaces(size: int) -> str:
+    # Každý namespace bez typu je vlastní segment
+    return repeat_to('namespace A.B.C;\nusing System;\n', size)
+
+
+def many_headers(size: int) -> str:
+    # Hlavičky s prázdnými bloky a neplatné hlavičky
+    return repeat_to('// File: src/A/Empty.cs\n/*\n*/\n// File:\n// ===\n', size)
+
+
+def many_wrapper_lines(size: int) -> str:
+    # Samé /* a */ řádky - mimo bloky každý uzavírá segment
+    return repeat_to('/*\n*/\nusing System;\n', size)
+
+
+def deep_braces(size: int) -> str:
+    return 'using System;\nnamespace A.B;\n' + '{' * (size // 2) + '}' * (size // 2) + '\npublic class Deep { }\n'
+
+
+CASES: Dict[str, Callable[[int], str]] = {
+    'unterminated_wrapper': unterminated_wrapper,
+    'unterminated_comment': unterminated_comment,
+    'unterminated_raw_string': unterminated_raw_string,
+    'megabyte_line': megabyte_line,
+    'megabyte_marker_line': megabyte_marker_line,
+    'many_usings': many_usings,
+    'many_namespaces': many_namespaces,
+    'many_headers': many_headers,
+    'many_wrapper_lines': many_wrapper_lines,
+    'deep_braces': deep_braces,
+}
+
+
+def extract_streaming(text: str, path: str, base_dir: str):
+    extractor = FileExtractor(base_dir=base_dir)
+    for block in extractor.build_index(iter_lines(text)):
+        extractor.clean_file_content(block.content, block.path)
+
+
+def extract_mmap(text: str, path: str, base_dir: str):
+    extractor = FileExtractor(base_dir=base_dir)
+    with ArtifactIndex(path) as index:
+        for block in extractor.iter_indexed_blocks(index):
+            extractor.clean_file_content(block.content, block.path)
+
+
+MODES = {
+    'stream': extract_streaming,
+    'mmap': extract_mmap,
+}
+
+
+def best_time(run: Callable[[str, str, str], None], text: str, path: str, base_dir: str,
+              repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run(text, path, base_dir)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_case(name: str, size: int, scale: int, repeat: int) -> Dict:
+    """
+    Změří případ v obou velikostech a obou režimech.
+    """
+    generate = CASES[name]
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='extract-pathological-', dir=scratch_root()) as directory:
+        # Prázdný base_dir - routování auto-detekce nezávisí na okolí
+        base_dir = os.path.join(directory, 'base')
+        os.mkdir(base_dir)
+        variants = []
+        for variant_size in (size, size * scale):
+            text = generate(variant_size)
+            path = os.path.join(directory, f'{name}-{variant_size}.txt')
+            with open(path, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(text)
+            variants.append((text, path, len(text.encode('utf-8'))))
+
+        for mode, run in MODES.items():
+            (small_text, small_path, small_bytes), (large_text, large_path, large_bytes) = variants
+            # Zahřívací běh - první volání platí kompilaci regexů a načtení indexu solution
+            run(small_text, small_path, base_dir)
+            small = best_time(run, small_text, small_path, base_dir, repeat)
+            large = best_time(run, large_text, large_path, base_dir, repeat)
+            results[mode] = {
+                'bytes': large_bytes,
+                'seconds': large,
+                'seconds_per_mib': large / (large_bytes / 1024 / 1024),
+                # Nárůst času vůči nárůstu velikosti - lineární parser ~1
+                'growth': (large / small) / (large_bytes / small_bytes) if small else 0.0,
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Patologické vstupy a kontrola lineární složitosti')
+    parser.add_argument('--size-mib', type=float, default=0.5, help='Velikost menší varianty v MiB')
+    parser.add_argument('--scale', type=int, default=4, help='Kolikrát je větší varianta větší')
+    parser.add_argument('--repeat', type=int, default=3, help='Počet měřených běhů (bere se nejlepší)')
+    parser.add_argument('--only', nargs='*', help='Spustit jen vybrané případy')
+    parser.add_argument('--budget', type=float, default=2.0,
+                        help='Povolený čas na MiB vstupu v sekundách (default: 2.0)')
+    parser.add_argument('--max-growth', type=float, default=2.0,
+                        help='Povolený nárůst času nad lineární (default: 2.0, kvadratický = scale)')
+    parser.add_argument('--json', type=str, help='Uložit výsledky do JSON souboru')
+    parser.add_argument('--check', action='store_true', help='Při překročení rozpočtu skončit s 1')
+    args = parser.parse_args()
+
+    size = int(args.size_mib * 1024 * 1024)
+    print(f"🧨 Patologické vstupy: {args.size_mib:g} MiB a {args.size_mib * args.scale:g} MiB, "
+          f"rozpočet {args.budget:g} s/MiB")
+
+    results = {}
+    problems: List[str] = []
+    for name in CASES:
+        if args.only and name not in args.only:
+            continue
+        results[name] = measure_case(name, size, args.scale, args.repeat)
+        for mode, result in results[name].items():
+            print(f"   {name:<24} {mode:<6} {result['seconds'] * 1000:9.1f} ms  "
+                  f"{result['seconds_per_mib']:6.3f} s/MiB  nárůst {result['growth']:5.2f}×")
+
+            if result['seconds_per_mib'] > args.budget:
+                problems.append(f"{name} ({mode}): {result['seconds_per_mib']:.3f} s/MiB "
+                                f"> {args.budget:g} s/MiB")
+            if result['growth'] > args.max_growth:
+                problems.append(f"{name} ({mode}): čas roste {result['growth']:.2f}× rychleji než vstup")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if problems:
+        print("❌ Překročené limity:")
+        for problem in problems:
+            print(f"   • {problem}")
+        if args.check:
+            sys.exit(1)
+    else:
+        print("✅ Všechny vstupy v lineárním rozpočtu")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Latence --pipeline na rouře: uzavřený blok se musí zapsat hned, ne až na konci vstupu.
+
+Producent zapíše do roury (FIFO, kde je k dispozici, jinak anonymní roura)
+první část artefaktu - blok a/one.cs uzavřený hlavičkou dalšího bloku -
+a čeká. a/one.cs musí na disku vzniknout do --timeout sekund, ještě před
+druhým zápisem. Kontroluje se nekomprimovaný vstup i gzip.
+
+Usage:
+    python -m benchmarks.pipeline_latency
+    python -m benchmarks.pipeline_latency --check  # exit 1 při zdržení
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.bench_extractor import scratch_root
+
+SCRIPT_PATH = Path(__file__).resolve().parent.parent / 'extract_files_script.py'
+
+FIRST_WRITE = b"// File: a/one.cs\n/*\nclass One {}\n*/\n// File: a/two.cs\n/*\nclass Two {}\n"
+SECOND_WRITE = b"*/\n"
+
+
+def plain_chunks() -> List[bytes]:
+    return [FIRST_WRITE, SECOND_WRITE]
+
+
+def gzip_chunks() -> List[bytes]:
+    # Z_SYNC_FLUSH - první zápis jde rozbalit celý, i když stream ještě neskončil
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    first = compressor.compress(FIRST_WRITE) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    return [first, compressor.compress(SECOND_WRITE) + compressor.flush()]
+
+
+CASES: Dict[str, Callable[[], List[bytes]]] = {
+    'plain': plain_chunks,
+    'gzip': gzip_chunks,
+}
+
+
+def open_pipe(directory: str):
+    """
+    Roura pro stdin extrakce - pojmenovaná FIFO, kde ji OS umí.
+
+    Returns:
+        (konec pro čtení, funkce vracející konec pro zápis)
+    """
+    if hasattr(os, 'mkfifo'):
+        fifo = os.path.join(directory, 'artifact.fifo')
+        os.mkfifo(fifo)
+        # Otevření FIFO pro čtení čeká na zapisovatele - otevírá se ve vlákně
+        opened = {}
+        opener = threading.Thread(target=lambda: opened.update(reader=open(fifo, 'rb', buffering=0)))
+        opener.start()
+        writer = open(fifo, 'wb', buffering=0)
+        opener.join()
+        return opened['reader'], writer
+
+    read_fd, write_fd = os.pipe()
+    return os.fdopen(read_fd, 'rb', buffering=0), os.fdopen(write_fd, 'wb', buffering=0)
+
+
+def measure_case(name: str, timeout: float) -> float | None:
+    """
+    Sekundy od prvního zápisu do vzniku a/one.cs, None když nevznikl do timeout.
+    """
+    chunks = CASES[name]()
+    directory = tempfile.mkdtemp(prefix='extract-pipeline-', dir=scratch_root())
+    try:
+        output_dir = os.path.join(directory, 'out')
+        reader, writer = open_pipe(directory)
+        process = subprocess.Popen(
+            [sys.executable, str(SCRIPT_PATH), '--pipeline', '--base-dir', output_dir],
+            stdin=reader, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        reader.close()
+
+        try:
+            started = time.perf_counter()
+            writer.write(chunks[0])
+            target = Path(output_dir) / 'a' / 'one.cs'
+            latency = None
+            while time.perf_counter() - started < timeout and process.poll() is None:
+                if target.exists():
+                    latency = time.perf_counter() - started
+                    break
+                time.sleep(0.01)
+            writer.write(chunks[1])
+        finally:
+            writer.close()
+        process.wait(timeout=30)
+
+        if process.returncode != 0:
+            raise RuntimeError(f"extrakce skončila s kódem {process.returncode}")
+        if (Path(output_dir) / 'a' / 'two.cs').read_text(encoding='utf-8') != 'class Two {}':
+            raise RuntimeError("a/two.cs nemá očekávaný obsah")
+        return latency
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latence --pipeline na rouře')
+    parser.add_argument('--timeout', type=float, default=5.0,
+                        help='Nejdelší povolené zdržení prvního bloku v sekundách (default: 5)')
+    parser.add_argument('--only', nargs='*', help='Spustit jen vybrané případy')
+    parser.add_argument('--check', action='store_true', help='Při zdržení skončit s 1')
+    args = parser.parse_args()
+
+    print(f"⏱️  Latence --pipeline, limit {args.timeout:g} s")
+    problems: List[str] = []
+    for name in CASES:
+        if args.only and name not in args.only:
+            continue
+        latency = measure_case(name, args.timeout)
+        if latency is None:
+            print(f"   {name:<8} a/one.cs nevznikl před druhým zápisem")
+            problems.append(name)
+        else:
+            print(f"   {name:<8} {latency * 1000:8.1f} ms")
+
+    if problems:
+        print(f"❌ Bloky zdržené do dalšího zápisu: {', '.join(problems)}")
+        if args.check:
+            sys.exit(1)
+    else:
+        print("✅ Uzavřené bloky se zapisují hned")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Kontrola, že --parse-jobs extrahuje totéž co sériový průchod.
+
+Každý artefakt se projde třikrát:
+
+- shardy: parse_shard (kód workeru) na všech kandidátních hranicích
+  split_artifact musí vrátit stejné bloky včetně provenance jako sériový
+  parser,
+- hranice: žádný řez nesmí ležet uvnitř explicitního ani project bloku,
+- strom: extract_sharded s malými shardy a skutečnými worker procesy
+  musí zapsat bajtově stejný strom jako extract_all_files.
+
+Vstupy obsahují v explicitních blocích i v /* */ obalech řádky, které
+vypadají jako hranice (using/namespace, odsazené a neplatné // File:
+hlavičky, // KROK), a každý artefakt se kontroluje i s CRLF konci řádků.
+
+Usage:
+    python -m benchmarks.shard_equivalence
+    python -m benchmarks.shard_equivalence --only tricky tricky_crlf
+    python -m benchmarks.shard_equivalence --check  # exit 1 při rozdílu
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import extract_files_script
+from extract_files_script import (FileExtractor, FileFilter, init_shard_worker, iter_lines,
+                                  parse_shard, split_artifact)
+from benchmarks.bench_extractor import scratch_root
+from benchmarks.synthetic import ArtifactGenerator, SEPARATOR
+
+
+def tricky_section(index: int) -> str:
+    """
+    Jeden úsek artefaktu s řádky, na kterých by naivní řez rozbil blok.
+    """
+    return (
+        f"{SEPARATOR}\n// KROK {index}: Sekce {index}\n{SEPARATOR}\n\n"
+        # Explicitní blok s řádky auto-detekce a neplatnými hlavičkami uvnitř
+        f"// File: src/Tricky{index}/Explicit{index}.cs\n/*\n"
+        f"using System;\n\nnamespace Tricky{index}.Inner;\n\npublic class Explicit{index}\n{{\n"
+        f"    // File:\n    //File: not/a/header.cs\n    // KROK uvnitř bloku\n"
+        f"    const string Text = \"// File: in/string.cs\";\n}}\n\n"
+        f"using System.Linq;\nnamespace Tricky{index}.Second;\npublic class Second{index} {{ }}\n"
+        "*/\n\n"
+        # Project blok v /* */ obalu, uvnitř text podobný C#
+        f"// File: src/Tricky{index}/Tricky{index}.csproj\n/*\n<Project Sdk=\"Microsoft.NET.Sdk\">\n"
+        "  <!--\n  using System;\n  namespace Not.Code;\n  -->\n"
+        f"  <PropertyGroup><RootNamespace>Tricky{index}</RootNamespace></PropertyGroup>\n</Project>\n*/\n\n"
+        # Auto segmenty bez hlavičky, jeden z nich v samostatném /* */ obalu
+        f"{SEPARATOR}\n\nusing System;\nusing System.Collections.Generic;\n\n"
+        f"namespace Tricky{index}.Auto;\n\npublic class AutoFirst{index}\n{{\n"
+        "    /* komentář\n       namespace Not.Here;\n    */\n    public int Value { get; set; }\n}\n\n"
+        f"using System.Text;\n\nnamespace Tricky{index}.Auto;\n\npublic record AutoSecond{index}(string Name);\n\n"
+        f"/*\nusing System;\nnamespace Tricky{index}.Wrapped;\npublic class Wrapped{index} {{ }}\n*/\n\n"
+    )
+
+
+def tricky_artifact(sections: int) -> str:
+    # Na konci neuzavřený explicitní blok - běží až do konce vstupu
+    return (''.join(tricky_section(index) for index in range(sections))
+            + "// File: src/Tail/Open.cs\n/*\nusing System;\nnamespace Tail;\npublic class Open { }\n")
+
+
+def synthetic_artifact(files: int) -> str:
+    return ArtifactGenerator(files, block_lines=20, explicit_share=0.5, project_share=0.2).generate()
+
+
+def crlf(generate: Callable[[int], str]) -> Callable[[int], str]:
+    return lambda size: generate(size).replace('\n', '\r\n')
+
+
+CASES: Dict[str, Callable[[int], str]] = {
+    'tricky': tricky_artifact,
+    'tricky_crlf': crlf(tricky_artifact),
+    'synthetic': synthetic_artifact,
+    'synthetic_crlf': crlf(synthetic_artifact),
+}
+
+
+def block_key(block) -> Tuple:
+    provenance = block.provenance
+    return (block.path, block.content, provenance.source, provenance.start_line, provenance.end_line,
+            provenance.start_offset, provenance.end_offset)
+
+
+def all_cuts(text: str) -> List[Tuple[int, int, int]]:
+    """
+    Shardy na všech kandidátních hranicích - minimální velikost shardu se vypne.
+    """
+    min_size = extract_files_script.SHARD_MIN_SIZE
+    extract_files_script.SHARD_MIN_SIZE = 1
+    try:
+        return split_artifact(text, len(text))
+    finally:
+        extract_files_script.SHARD_MIN_SIZE = min_size
+
+
+def compare_shards(text: str, base_dir: str) -> List[str]:
+    """
+    Bloky z parse_shard na všech hranicích proti sériovému parseru.
+    """
+    problems = []
+    extractor = FileExtractor(base_dir=base_dir)
+    serial = [extractor.clean_block(block) for block in extractor.iter_file_blocks(iter_lines(text))]
+
+    shards = all_cuts(text)
+    init_shard_worker(base_dir, False, FileFilter(), extractor.solution_index)
+    sharded = []
+    for start, end, first_line in shards:
+        blocks, _ = parse_shard(text[start:end], first_line, start, False)
+        sharded.extend(blocks)
+
+    serial_keys = [block_key(block) for block in serial]
+    sharded_keys = [block_key(block) for block in sharded]
+    if serial_keys != sharded_keys:
+        different = next((position for position, (left, right) in enumerate(zip(serial_keys, sharded_keys))
+                          if left != right), min(len(serial_keys), len(sharded_keys)))
+        problems.append(f"bloky se liší od #{different} ({len(serial_keys)} sériově, "
+                        f"{len(sharded_keys)} ze {len(shards)} shardů)")
+
+    # Řez smí ležet jen na začátku nebo konci explicitního/project bloku
+    wrapped = [block.provenance for block in serial if block.provenance.source != 'auto']
+    for start, _, first_line in shards[1:]:
+        inside = [provenance for provenance in wrapped
+                  if provenance.start_offset < start < provenance.end_offset]
+        if inside:
+            problems.append(f"řez na řádku {first_line} leží uvnitř bloku ({inside[0].describe()})")
+    return problems
+
+
+def read_tree(root: str) -> Dict[str, bytes]:
+    tree = {}
+    for path in Path(root).rglob('*'):
+        if path.is_file() and '.extract-cache' not in path.parts:
+            tree[path.relative_to(root).as_posix()] = path.read_bytes()
+    return tree
+
+
+def compare_trees(text: str, directory: str, parse_jobs: int) -> List[str]:
+    """
+    Strom z extract_sharded (worker procesy, malé shardy) proti extract_all_files.
+    """
+    serial_dir = os.path.join(directory, 'serial')
+    sharded_dir = os.path.join(directory, 'sharded')
+    FileExtractor(base_dir=serial_dir).extract_all_files(text)
+
+    # Menší shardy, aby jich i malý artefakt měl víc než workerů
+    min_size = extract_files_script.SHARD_MIN_SIZE
+    extract_files_script.SHARD_MIN_SIZE = max(len(text) // (parse_jobs * 8), 1)
+    try:
+        FileExtractor(base_dir=sharded_dir).extract_sharded(text, parse_jobs)
+    finally:
+        extract_files_script.SHARD_MIN_SIZE = min_size
+
+    serial, sharded = read_tree(serial_dir), read_tree(sharded_dir)
+    problems = []
+    if not serial:
+        problems.append("sériová extrakce nezapsala nic")
+    for file_path in sorted(serial.keys() | sharded.keys()):
+        if file_path not in sharded:
+            problems.append(f"{file_path}: chybí s --parse-jobs")
+        elif file_path not in serial:
+            problems.append(f"{file_path}: navíc s --parse-jobs")
+        elif serial[file_path] != sharded[file_path]:
+            problems.append(f"{file_path}: jiný obsah s --parse-jobs")
+    return problems
+
+
+def check_case(name: str, size: int, parse_jobs: int) -> List[str]:
+    text = CASES[name](size)
+    with tempfile.TemporaryDirectory(prefix='extract-shards-', dir=scratch_root()) as directory:
+        # Prázdný base_dir - routování auto-detekce nezávisí na okolí
+        base_dir = os.path.join(directory, 'base')
+        os.mkdir(base_dir)
+        return compare_shards(text, base_dir) + compare_trees(text, directory, parse_jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shoda --parse-jobs se sériovou extrakcí')
+    parser.add_argument('--size', type=int, default=40,
+                        help='Počet úseků (tricky) a desítek souborů (synthetic) (default: 40)')
+    parser.add_argument('--parse-jobs', type=int, default=4, help='Počet worker procesů (default: 4)')
+    parser.add_argument('--only', nargs='*', help='Spustit jen vybrané případy')
+    parser.add_argument('--check', action='store_true', help='Při rozdílu skončit s 1')
+    args = parser.parse_args()
+
+    print(f"🧩 Shoda sériové extrakce a --parse-jobs {args.parse_jobs}")
+    problems: List[str] = []
+    for name in CASES:
+        if args.only and name not in args.only:
+            continue
+        size = args.size if name.startswith('tricky') else args.size * 10
+        case_problems = check_case(name, size, args.parse_jobs)
+        print(f"   {name:<16} {'✅ shodné' if not case_problems else f'❌ {len(case_problems)} rozdílů'}")
+        problems += [f"{name}: {problem}" for problem in case_problems]
+
+    if problems:
+        print("❌ Rozdíly proti sériové extrakci:")
+        for problem in problems[:20]:
+            print(f"   • {problem}")
+        if args.check:
+            sys.exit(1)
+    else:
+        print("✅ --parse-jobs extrahuje totéž co sériový průchod")
+
+
+if __name__ == '__main__':
+    main()
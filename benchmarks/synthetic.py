@@ -0,0 +1,196 @@
+"""
+Generátor syntetických artefaktů ve formátu, který čte extract_files_script.py.
+
+Těla tříd se skládají z řádků šablon complete_solution_structure.cs
+a hierarchical_tests_structure.cs, takže obsah odpovídá skutečnému kódu
+(komentáře, atributy, řetězce, lambdy).
+
+Usage:
+    python -m benchmarks.synthetic --files 1000 --output artifact.txt
+    python -m benchmarks.synthetic --files 50000 --block-lines 200 --explicit-share 0.5 -o big.txt
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Iterator, List, TextIO
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+# (šablona, je celá zakomentovaná)
+TEMPLATE_FILES = (
+    (REPO_ROOT / 'complete_solution_structure.cs', True),
+    (REPO_ROOT / 'hierarchical_tests_structure.cs', False),
+)
+
+SEPARATOR = '// ' + '=' * 67
+
+# (namespace, adresář) - odpovídá routování auto-detekce v extraktoru
+PROJECTS = (
+    ('HierarchicalMvvm.Core', 'src/HierarchicalMvvm.Core'),
+    ('HierarchicalMvvm.Generator', 'src/HierarchicalMvvm.Generator'),
+    ('HierarchicalMvvm.Attributes', 'src/HierarchicalMvvm.Attributes'),
+    ('HierarchicalMvvm.Demo.Models', 'src/HierarchicalMvvm.Demo/Models'),
+    ('HierarchicalMvvm.Demo', 'src/HierarchicalMvvm.Demo'),
+)
+
+TYPE_KINDS = ('public class', 'public partial class', 'public sealed class', 'internal static class',
+              'public interface', 'public record')
+
+USINGS = (
+    'using System;',
+    'using System.Collections.Generic;',
+    'using System.ComponentModel;',
+    'using CommunityToolkit.Mvvm.ComponentModel;',
+    'using HierarchicalMvvm.Attributes;',
+)
+
+
+def load_template_lines() -> List[str]:
+    """
+    Řádky těl tříd ze šablon (bez komentářových prefixů a artefaktových značek).
+    """
+    lines = []
+    for template, commented in TEMPLATE_FILES:
+        for line in template.read_text(encoding='utf-8').split('\n'):
+            if commented and line.startswith('//'):
+                line = line[2:]
+            stripped = line.strip()
+
+            # Jen odsazené C# členy - žádné hranice bloků, /* */ obaly ani XML
+            if not line.startswith('    ') or not stripped or stripped.startswith('<'):
+                continue
+            if stripped.startswith(('/*', '// File:', '// ===')) or stripped.endswith('*/'):
+                continue
+            # Řádky s nespárovanými uvozovkami by otevřely řetězec přes celé tělo
+            if '@"' in line or line.count('"') % 2:
+                continue
+            lines.append('    ' + line.rstrip())
+
+    if not lines:
+        raise RuntimeError("Šablony neobsahují žádné použitelné řádky")
+    return lines
+
+
+class ArtifactGenerator:
+    """
+    Deterministický generátor artefaktu.
+
+    files           počet souborů
+    block_lines     přibližný počet řádků těla jednoho souboru
+    explicit_share  podíl .cs souborů s // File: hlavičkou (zbytek je auto-detekovaný)
+    project_share   podíl .csproj/.xaml bloků ze všech souborů
+    """
+
+    def __init__(self, files: int = 200, block_lines: int = 60, explicit_share: float = 0.7,
+                 project_share: float = 0.1, seed: int = 0):
+        self.files = files
+        self.block_lines = block_lines
+        self.explicit_share = explicit_share
+        self.project_share = project_share
+        self.random = random.Random(seed)
+        self.template_lines = load_template_lines()
+        self._template_position = 0
+
+    def _body(self, count: int) -> List[str]:
+        lines = []
+        for _ in range(count):
+            lines.append(self.template_lines[self._template_position])
+            self._template_position = (self._template_position + 1) % len(self.template_lines)
+        return lines
+
+    def _csharp_file(self, index: int) -> tuple:
+        namespace, directory = PROJECTS[index % len(PROJECTS)]
+        type_name = f"Generated{index}Model"
+        kind = self.random.choice(TYPE_KINDS)
+        usings = self.random.sample(USINGS, self.random.randint(1, len(USINGS)))
+
+        lines = usings + ['', f'namespace {namespace};', '', '/// <summary>', f'/// Syntetický typ {index}',
+                          '/// </summary>']
+        if kind == 'public record':
+            lines.append(f'{kind} {type_name}(string Name, int Value)')
+        else:
+            lines.append(f'{kind} {type_name}')
+        lines.append('{')
+        lines += self._body(self.block_lines)
+        lines.append('}')
+        return f"{directory}/{type_name}.cs", lines
+
+    def _project_file(self, index: int) -> tuple:
+        if index % 2:
+            path = f"src/HierarchicalMvvm.Demo/Views/GeneratedView{index}.xaml"
+            lines = [f'<UserControl x:Class="HierarchicalMvvm.Demo.Views.GeneratedView{index}"',
+                     '             xmlns="http://schemas.microsoft.com/winfx/2006/xaml/presentation"',
+                     '             xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">',
+                     '    <StackPanel>']
+            lines += [f'        <TextBlock Text="{{Binding Value{row}}}" Margin="4" />'
+                      for row in range(max(self.block_lines // 2, 1))]
+            lines += ['    </StackPanel>', '</UserControl>']
+        else:
+            path = f"src/HierarchicalMvvm.Generated{index}/HierarchicalMvvm.Generated{index}.csproj"
+            lines = ['<Project Sdk="Microsoft.NET.Sdk">', '  <PropertyGroup>',
+                     '    <TargetFramework>net8.0</TargetFramework>', '    <Nullable>enable</Nullable>',
+                     '  </PropertyGroup>', '  <ItemGroup>']
+            lines += [f'    <PackageReference Include="Generated.Package{row}" Version="1.0.{row}" />'
+                      for row in range(max(self.block_lines // 4, 1))]
+            lines += ['  </ItemGroup>', '</Project>']
+        return path, lines
+
+    def iter_chunks(self) -> Iterator[str]:
+        """
+        Vrací artefakt po blocích, takže i obrovský artefakt jde zapsat bez držení v paměti.
+        """
+        previous_explicit = False
+        for index in range(self.files):
+            if index % 25 == 0:
+                yield f"{SEPARATOR}\n// KROK {index // 25 + 1}: Generated section\n{SEPARATOR}\n\n"
+                previous_explicit = False
+
+            if self.random.random() < self.project_share:
+                path, lines = self._project_file(index)
+                explicit = True
+            else:
+                path, lines = self._csharp_file(index)
+                explicit = self.random.random() < self.explicit_share
+
+            if explicit:
+                yield f"// File: {path}\n/*\n" + '\n'.join(lines) + "\n*/\n\n"
+            else:
+                # Auto-detekovaný blok nesmí navázat na předchozí explicitní blok
+                if previous_explicit:
+                    yield f"{SEPARATOR}\n\n"
+                yield '\n'.join(lines) + "\n\n"
+            previous_explicit = explicit
+
+    def generate(self) -> str:
+        return ''.join(self.iter_chunks())
+
+    def write(self, output: TextIO):
+        for chunk in self.iter_chunks():
+            output.write(chunk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generátor syntetických artefaktů')
+    parser.add_argument('--files', type=int, default=200, help='Počet souborů v artefaktu')
+    parser.add_argument('--block-lines', type=int, default=60, help='Řádků těla jednoho souboru')
+    parser.add_argument('--explicit-share', type=float, default=0.7,
+                        help='Podíl .cs souborů s // File: hlavičkou')
+    parser.add_argument('--project-share', type=float, default=0.1, help='Podíl .csproj/.xaml bloků')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', '-o', type=str, help='Výstupní soubor (default: stdout)')
+    args = parser.parse_args()
+
+    generator = ArtifactGenerator(args.files, args.block_lines, args.explicit_share,
+                                  args.project_share, args.seed)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='\n') as f:
+            generator.write(f)
+        size = Path(args.output).stat().st_size
+        print(f"📝 Zapsáno {size / 1024 / 1024:.1f} MiB do {args.output}", file=sys.stderr)
+    else:
+        generator.write(sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Tenký klient teplého extrakčního serveru (extract_files.py serve).
+
+Importuje jen os, sys, json a socket, takže start stojí zlomek času plného
+scriptu - extrakci provede běžící server s teplými regexy a indexy solution.
+Když server neběží, spustí se místo něj plný script se stejnými argumenty.
+
+Usage:
+    python extract_files.py serve &
+    python extract_client.py --input artifact.txt --base-dir ./MyProject --force
+    generate_artifact | python extract_client.py --base-dir ./MyProject
+    python extract_client.py --input artifact.txt --json  # odpověď serveru jako JSON
+    python extract_client.py --status
+    python extract_client.py --shutdown
+    python extract_client.py --port 8765 --input artifact.txt  # TCP, token z --token-file
+"""
+
+import os
+import sys
+import json
+import socket
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'extract_files_script.py')
+
+# Volby předávané serveru: přepínač -> (klíč požadavku, typ hodnoty), None = bez hodnoty,
+# list = jedna či více hodnot až k další volbě. Musí odpovídat SERVER_OPTIONS
+# v extract_files_script.py.
+REQUEST_OPTIONS = {
+    '--input': ('input', str),
+    '-i': ('input', str),
+    '--base-dir': ('base_dir', str),
+    '-d': ('base_dir', str),
+    '--force': ('force', None),
+    '-f': ('force', None),
+    '--debug': ('debug', None),
+    '--incremental': ('incremental', None),
+    '--prune': ('prune', None),
+    '--jobs': ('jobs', int),
+    '-j': ('jobs', int),
+    '--reindex': ('reindex', None),
+    '--only': ('only', list),
+    '--exclude': ('exclude', list),
+    '--namespace': ('namespace', list),
+    '--store': ('store', str),
+}
+
+# Volby samotného klienta
+CLIENT_OPTIONS = {
+    '--socket': ('socket', str),
+    '--port': ('port', int),
+    '--token-file': ('token_file', str),
+    '--json': ('json', None),
+    '--status': ('status', None),
+    '--shutdown': ('shutdown', None),
+}
+
+USAGE = """usage: extract_client.py [--input FILE] [--base-dir DIR] [--force] [--debug]
+                          [--incremental] [--prune] [--jobs N] [--reindex]
+                          [--only GLOB ...] [--exclude GLOB ...] [--namespace NS ...]
+                          [--store DIR]
+                          [--socket PATH | --port PORT [--token-file FILE]]
+                          [--json] [--status | --shutdown]
+
+Bez --input se artefakt čte ze stdin. Ostatní volby mají stejný význam jako
+u extract_files.py, --socket/--port určují server (viz extract_files.py serve).
+Bez Unix socketů (Windows) je potřeba --port, jinak se extrakce spustí lokálně."""
+
+
+def runtime_dir() -> str:
+    return (os.environ.get('XDG_RUNTIME_DIR') or os.environ.get('TMPDIR') or os.environ.get('TEMP')
+            or '/tmp')
+
+
+def default_socket_path() -> str:
+    """
+    Výchozí Unix socket serveru - stejně ho počítá extract_files_script.py.
+    """
+    if os.environ.get('EXTRACT_FILES_SOCKET'):
+        return os.environ['EXTRACT_FILES_SOCKET']
+    return os.path.join(runtime_dir(), f"extract-files-{getattr(os, 'getuid', lambda: 0)()}.sock")
+
+
+def default_token_path() -> str:
+    """
+    Výchozí soubor s tokenem TCP serveru - stejně ho počítá extract_files_script.py.
+    """
+    if os.environ.get('EXTRACT_FILES_TOKEN_FILE'):
+        return os.environ['EXTRACT_FILES_TOKEN_FILE']
+    return os.path.join(runtime_dir(), f"extract-files-{getattr(os, 'getuid', lambda: 0)()}.token")
+
+
+def fail(message: str):
+    print(f"❌ {message}", file=sys.stderr)
+    print(USAGE, file=sys.stderr)
+    sys.exit(2)
+
+
+def parse_args(argv: list) -> tuple:
+    """
+    Ruční parser - argparse by stál víc než celá cesta k serveru.
+
+    Returns:
+        (volby požadavku, volby klienta, argumenty pro plný script)
+    """
+    request, client, passthrough = {}, {}, []
+    position = 0
+    while position < len(argv):
+        argument = argv[position]
+        position += 1
+        if argument in ('-h', '--help'):
+            print(USAGE)
+            sys.exit(0)
+
+        name, has_value, value = argument.partition('=')
+        known = REQUEST_OPTIONS.get(name) or CLIENT_OPTIONS.get(name)
+        if known is None:
+            fail(f"neznámý argument: {argument}")
+        key, kind = known
+
+        if kind is None:
+            if has_value:
+                fail(f"{name} nebere hodnotu")
+            value = True
+        elif kind is list:
+            values = [value] if has_value else []
+            while position < len(argv) and not argv[position].startswith('-'):
+                values.append(argv[position])
+                position += 1
+            if not values:
+                fail(f"{name} vyžaduje aspoň jednu hodnotu")
+            # Opakovaná volba hodnoty přidává (jako action='extend')
+            value = request.get(key, []) + values
+            values_argument = [name] + values
+        else:
+            if not has_value:
+                if position >= len(argv):
+                    fail(f"{name} vyžaduje hodnotu")
+                value = argv[position]
+                position += 1
+            try:
+                value = kind(value)
+            except ValueError:
+                fail(f"{name}: neplatná hodnota {value!r}")
+
+        if name in REQUEST_OPTIONS:
+            request[key] = value
+            if kind is list:
+                passthrough.extend(values_argument)
+            else:
+                passthrough.extend([name] if kind is None else [name, str(value)])
+        else:
+            client[key] = value
+
+    if 'socket' in client and 'port' in client:
+        fail("--socket nelze kombinovat s --port")
+    if 'token_file' in client and 'port' not in client:
+        fail("--token-file vyžaduje --port")
+    return request, client, passthrough
+
+
+def connect(client: dict) -> socket.socket:
+    if 'port' in client:
+        return socket.create_connection(('127.0.0.1', client['port']))
+
+    # Windows nemá AF_UNIX - jako by server neběžel, extrakce proběhne lokálně
+    if not hasattr(socket, 'AF_UNIX'):
+        raise OSError("Unix sockety tu nejsou k dispozici, server je dostupný jen přes --port")
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(client.get('socket') or default_socket_path())
+    except OSError:
+        connection.close()
+        raise
+    return connection
+
+
+def send(connection: socket.socket, request: dict, payload: bytes | None = None) -> dict:
+    """
+    Pošle hlavičku (a artefakt) a přečte odpověď - jeden JSON řádek.
+    """
+    if payload is not None:
+        request['length'] = len(payload)
+    connection.sendall(json.dumps(request).encode('utf-8') + b'\n')
+    if payload:
+        connection.sendall(payload)
+    connection.shutdown(socket.SHUT_WR)
+
+    with connection.makefile('rb') as response:
+        line = response.readline()
+    if not line:
+        raise ConnectionError("server zavřel spojení bez odpovědi")
+    return json.loads(line)
+
+
+def main():
+    request, client, passthrough = parse_args(sys.argv[1:])
+    command = 'status' if client.get('status') else 'shutdown' if client.get('shutdown') else 'extract'
+
+    try:
+        connection = connect(client)
+    except OSError as e:
+        if command != 'extract' or client.get('json'):
+            print(f"❌ Server neběží: {e}", file=sys.stderr)
+            sys.exit(1)
+        # Bez serveru extrakci provede plný script - stdin je ještě nepřečtený
+        print("⚠️  Server neběží, spouštím extrakci lokálně", file=sys.stderr)
+        sys.stderr.flush()
+        os.execv(sys.executable, [sys.executable, SCRIPT_PATH] + passthrough)
+
+    payload = None
+    if command == 'extract':
+        # Server má jiný pracovní adresář - cesty musí být absolutní
+        request['base_dir'] = os.path.abspath(request.get('base_dir', '.'))
+        # Úložiště obsahu jako u plného scriptu - z --store nebo z prostředí klienta
+        store = request.get('store') or os.environ.get('EXTRACT_FILES_STORE')
+        if store:
+            request['store'] = os.path.abspath(store)
+        if 'input' in request:
+            request['input'] = os.path.abspath(request['input'])
+        elif sys.stdin.isatty():
+            fail("chybí --input a stdin není přesměrovaný")
+        else:
+            payload = sys.stdin.buffer.read()
+    request['command'] = command
+    if 'port' in client:
+        # TCP server přijme jen požadavek s tokenem ze souboru, který zapsal při startu
+        token_path = client.get('token_file') or default_token_path()
+        try:
+            with open(token_path, 'r', encoding='utf-8') as f:
+                request['token'] = f.read().strip()
+        except OSError as e:
+            connection.close()
+            print(f"❌ Nelze přečíst token serveru {token_path}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    try:
+        with connection:
+            response = send(connection, request, payload)
+    except (OSError, ValueError) as e:
+        print(f"❌ Chyba komunikace se serverem: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if client.get('json'):
+        print(json.dumps(response, ensure_ascii=False, indent=2))
+    elif not response.get('ok'):
+        print(f"❌ Server: {response.get('error')}", file=sys.stderr)
+    elif command == 'status':
+        indexes = ', '.join(response['indexes']) or 'žádné'
+        print(f"🔌 Server běží (pid {response['pid']}, {response['uptime']:.0f} s, "
+              f"{response['requests']} extrakcí), indexy solution: {indexes}")
+    elif command == 'shutdown':
+        print("👋 Server se ukončuje")
+    else:
+        sys.stdout.write('\n'.join(response['messages']) + '\n')
+
+    if not response.get('ok') or response.get('summary', {}).get('failed'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
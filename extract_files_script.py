@@ -3,459 +3,4272 @@
 Script pro extrakci souborů z HierarchicalMvvm artefaktu do správné adresářové struktury.
 
 Usage:
-    python extract_files.py [--input input_file] [--base-dir output_dir] [--force] [--debug]
+    python extract_files.py [--input input_file] [--base-dir output_dir] [--force] [--debug] [--mmap]
 
 Příklady:
     python extract_files.py
     python extract_files.py --input artifact.txt --base-dir ./HierarchicalMvvm
     python extract_files.py --force  # přepíše existující soubory
     python extract_files.py --debug  # zobrazí debug informace
+    python extract_files.py --input artifact.txt --mmap  # velké artefakty bez načtení do paměti
+    python extract_files.py --input artifact.txt.gz  # gzip/bz2/xz/zstd se rozbalí za běhu
+    python extract_files.py --input artifact.txt --incremental  # zapíše jen změněné soubory
+    python extract_files.py --input artifact.txt --only 'src/App/**'  # jen vybrané soubory
+    python extract_files.py --input artifact.txt --stats  # JSON metriky fází na stderr
+    python extract_files.py --input artifact.txt --output-archive out.zip  # jeden archiv místo stromu
+    python extract_files.py --batch artifacts/ --jobs 8  # víc artefaktů, parsování v procesech
+    python extract_files.py --input artifact.txt --store ~/.cache/extract-store  # sdílené úložiště obsahu
+    python extract_files.py pack src tests -o artifact.txt  # opačný směr - strom do artefaktu
+    python extract_files.py serve  # teplý server, extrakci pak volá extract_client.py
 """
 
 import os
 import re
+import json
+import mmap
+import io
+import gzip
+import bz2
+import lzma
+import zipfile
+import tarfile
+import hashlib
+import hmac
+import secrets
 import argparse
+import itertools
+import glob
+import fnmatch
+import queue
+import codecs
+import collections
+import errno
+import select
+import signal
+import socket
+import socketserver
+import struct
+import ctypes
+import ctypes.util
+import functools
+import heapq
+import threading
+import time
+import cProfile
+import tracemalloc
+from contextlib import contextmanager, nullcontext, redirect_stdout
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple, Dict
+from stat import S_IWUSR
+from typing import List, Tuple, Dict, Iterable, Iterator, Callable
 import sys
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Hlavička explicitního souboru: // File: path/to/file.ext
+FILE_HEADER_PATTERN = re.compile(r'^// File: (.+)$')
+
+# Začátek potenciálního C# souboru při auto-detekci
+CSHARP_BOUNDARY_PATTERN = re.compile(r'(?:using|namespace)\s')
+
+# Soubory, jejichž obsah se bere jen z /* */ obalu
+PROJECT_FILE_SUFFIXES = ('.csproj', '.xaml')
+
+# Značky artefaktu, které čištění obsahu odstraňuje. Blok bez nich (a bez okrajových
+# bílých znaků) je už čistý a zapisuje se beze změny - bez rozdělení na řádky a kopie.
+CLEAN_MARKER_PATTERN = re.compile(r'/\*|\*/|// (?:===|File:|KROK)')
+
+# Řádky, které se zahazují ze všech souborů (porovnává se řádek bez okrajových mezer)
+ARTIFACT_LINE_PREFIXES = ('// ===', '// File:', '/*', '*/')
+
+# Kandidáti na hranice shardů --parse-jobs: // File: hlavičky a // === oddělovače
+# (hlavička se ještě ověří FILE_HEADER_PATTERN)
+SHARD_MARKER_PATTERN = re.compile(r'^[^\S\n]*// (?:File: |===)', re.MULTILINE)
+
+# Nejmenší shard - menší artefakt se s --parse-jobs parsuje sériově
+SHARD_MIN_SIZE = 1 << 18
+
+# Hranice bloků v bytovém indexu: // File: hlavičky a // === oddělovače
+INDEX_MARKER_PATTERN = re.compile(rb'^[ \t\f\v]*// (?:File:|===)', re.MULTILINE)
+
+# Řádky /* */ obalu uvnitř explicitního bloku
+INDEX_WRAPPER_OPEN_PATTERN = re.compile(rb'^[ \t\f\v]*/\*', re.MULTILINE)
+INDEX_WRAPPER_CLOSE_PATTERN = re.compile(rb'^(?![ \t\f\v]*/\*)[^\n]*\*/[ \t\f\v\r]*$', re.MULTILINE)
+
+
+# Velikost úseku při počítání řádků v memory-mapped artefaktu
+INDEX_CHUNK_SIZE = 1 << 20
+
+# Komprimovaný artefakt (--input i stdin) se pozná podle magic bytes
+COMPRESSION_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+COMPRESSION_MAGIC_LENGTH = max(len(magic) for magic, _ in COMPRESSION_MAGIC)
+
+# Chyby čtení artefaktu za běhu - useknutý gzip (EOFError), poškozená data,
+# chybějící zstd modul (RuntimeError), neplatné UTF-8 (ValueError)
+ARTIFACT_READ_ERRORS = (OSError, EOFError, ValueError, RuntimeError, lzma.LZMAError)
+
+# Manifest inkrementální extrakce (v --base-dir)
+MANIFEST_FILE_NAME = '.extract-manifest.json'
+MANIFEST_VERSION = 1
+
+# Řádky, které parser artefaktu nebo čištění obsahu zahodí - soubor s nimi
+# se při balení (pack) ověří skutečnou extrakcí
+PACK_ROUNDTRIP_RISK_PATTERN = re.compile(r'^[^\S\n]*(?:// (?:File:|===|KROK)|/\*|\*/)|\*/[^\S\n]*$', re.MULTILINE)
+PACK_ROUNDTRIP_MARKERS = ('/*', '*/', '// File:', '// ===', '// KROK')
+
+# Pevná metadata záznamů --output-archive, aby stejný artefakt dal bajtově stejný archiv
+ARCHIVE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ARCHIVE_MTIME = 315532800  # 1980-01-01 00:00:00 UTC, nejstarší čas, který umí zip
+ARCHIVE_FILE_MODE = 0o644
+
+# Úložiště obsahu (--store): objekty pojmenované SHA-256 vyčištěného obsahu,
+# sdílené extrakcemi do více stromů (worktree v CI)
+STORE_ENV = 'EXTRACT_FILES_STORE'
+STORE_OBJECTS_DIR = 'objects'
+STORE_ACCESS_LOG = 'access.log'
+STORE_LOCK_FILE = 'lock'
+STORE_OBJECT_MODE = 0o444  # hardlink sdílí inode - objekt se nesmí upravit na místě
+# auto nechává soubory ve stromu běžně zapisovatelné (reflink je vlastní inode),
+# hardlink je jen na vyžádání - soubor sdílí inode i práva 0444 s objektem
+STORE_LINK_MODES = {
+    'auto': ('reflink', 'copy'),
+    'reflink': ('reflink', 'copy'),
+    'hardlink': ('hardlink', 'copy'),
+    'copy': ('copy',),
+}
+STORE_STALE_TMP_SECONDS = 3600
+# ioctl FICLONE (Linux) - copy-on-write kopie celého souboru na btrfs/XFS
+FICLONE = 0x40049409
+SIZE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?\s*$', re.IGNORECASE)
+SIZE_UNITS = {'': 1, 'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30, 't': 1 << 40}
+
+# Požadavek serve: hlavička je jeden JSON řádek, za ní volitelně `length` bajtů
+# artefaktu. Volby požadavku a jejich typy musí odpovídat extract_client.py.
+SERVER_MAX_HEADER = 1 << 16
+# Sdílené tajemství TCP serveru (--port) - soubor jen pro vlastníka, klient ho
+# posílá v hlavičce jako "token"
+SERVER_TOKEN_ENV = 'EXTRACT_FILES_TOKEN_FILE'
+SERVER_TOKEN_MODE = 0o600
+SERVER_OPTIONS = {
+    'input': str,
+    'base_dir': str,
+    'force': bool,
+    'debug': bool,
+    'incremental': bool,
+    'prune': bool,
+    'jobs': int,
+    'reindex': bool,
+    'only': list,
+    'exclude': list,
+    'namespace': list,
+    'store': str,
+}
+
+# Cache indexu cílové solution (v --base-dir). Vlastní adresář, aby zápis
+# cache neměnil mtime kořene --base-dir a nevynucoval jeho nové procházení.
+SOLUTION_INDEX_PATH = Path('.extract-cache') / 'solution-index.json'
+SOLUTION_INDEX_VERSION = 1
+
+# Namespace, které se podle konvence solution routují do projektu jiného jména
+# (HierarchicalMvvm.Generators -> projekt HierarchicalMvvm.Generator)
+PROJECT_NAMESPACE_ALIASES = {
+    'HierarchicalMvvm.Generators': 'HierarchicalMvvm.Generator',
+}
+
+# Adresáře, které se při indexování solution neprocházejí
+SOLUTION_SKIP_DIRS = frozenset({'bin', 'obj', 'node_modules', 'packages', 'TestResults'})
+SOLUTION_MAX_DEPTH = 12
+
+# Projekt v .sln: Project("{typ}") = "Název", "cesta\\k\\projektu.csproj", "{guid}"
+SLN_PROJECT_PATTERN = re.compile(r'^Project\("\{[^}]*\}"\)\s*=\s*"([^"]+)"\s*,\s*"([^"]+\.csproj)"', re.MULTILINE)
+CSPROJ_ROOT_NAMESPACE_PATTERN = re.compile(r'<RootNamespace>\s*([^<]+?)\s*</RootNamespace>')
+
+
+@dataclass
+class BlockProvenance:
+    """
+    Odkud v artefaktu blok pochází.
+    
+    source je 'explicit' (// File: hlavička), 'project' (.csproj/.xaml
+    v /* */ obalu) nebo 'auto' (auto-detekce podle using/namespace).
+    Řádky jsou číslované od 1 včetně hlavičky, end_line je poslední řádek
+    bloku. Offsety jsou [start_offset, end_offset) ve znacích vstupního
+    textu, u --mmap v bajtech souboru. artifact je cesta k artefaktu
+    v dávkovém režimu (--batch).
+    """
+    source: str
+    start_line: int
+    end_line: int
+    start_offset: int
+    end_offset: int
+    artifact: str | None = None
+    
+    def describe(self) -> str:
+        if self.artifact:
+            return f"{self.artifact}: {self.source}, ř. {self.start_line}-{self.end_line}"
+        return f"{self.source}, ř. {self.start_line}-{self.end_line}"
+
+
+class FileBlock:
+    """
+    Jeden soubor nalezený v artefaktu.
+    
+    Obsah může být načten líně přes loader až ve chvíli, kdy je potřeba.
+    cleaned říká, že obsah je už vyčištěný do podoby pro zápis - tak
+    vznikají auto-detekované bloky (clean_csharp_content) a bloky
+    z --parse-jobs workerů, ostatní nesou surový obsah z artefaktu.
+    """
+    __slots__ = ('path', 'provenance', 'cleaned', '_content', '_loader')
+    
+    def __init__(self, path: str, content: str | None, provenance: BlockProvenance,
+                 loader: Callable[[], str] | None = None, cleaned: bool = False):
+        self.path = path
+        self.provenance = provenance
+        self.cleaned = cleaned
+        self._content = content
+        self._loader = loader
+    
+    @property
+    def source(self) -> str:
+        return self.provenance.source
+    
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            self._content = self._loader() if self._loader else ''
+            self._loader = None
+        return self._content
+    
+    def __repr__(self) -> str:
+        return f"FileBlock({self.path!r}, {self.provenance.describe()})"
+
+
+class ProvenanceIndex:
+    """
+    Výsledek sloučení bloků do jedné sady souborů.
+    
+    Explicitní a project bloky mají přednost před auto-detekcí, mezi bloky
+    stejné priority vyhrává poslední. U každé cesty si pamatuje přehlasované
+    kandidáty, takže shrnutí i hlášení konfliktů jsou lineární.
+    """
+    
+    def __init__(self, blocks: Iterable[FileBlock] = ()):
+        self.files: Dict[str, FileBlock] = {}
+        self.overridden: Dict[str, List[FileBlock]] = {}
+        for block in blocks:
+            self.add(block)
+    
+    def add(self, block: FileBlock) -> bool:
+        """
+        Přidá blok a vrátí True, pokud se stal platnou verzí souboru.
+        """
+        existing = self.files.get(block.path)
+        if existing is None:
+            self.files[block.path] = block
+            return True
+        
+        if block.source == 'auto' and existing.source != 'auto':
+            self.overridden.setdefault(block.path, []).append(block)
+            return False
+        
+        self.overridden.setdefault(block.path, []).append(existing)
+        self.files[block.path] = block
+        return True
+    
+    def __len__(self) -> int:
+        return len(self.files)
+    
+    def __iter__(self) -> Iterator[FileBlock]:
+        return iter(self.files.values())
+    
+    def get(self, file_path: str) -> FileBlock | None:
+        return self.files.get(file_path)
+    
+    def explicit_files(self) -> Dict[str, FileBlock]:
+        return {path: block for path, block in self.files.items() if block.source != 'auto'}
+    
+    def auto_detected_files(self) -> Dict[str, FileBlock]:
+        return {path: block for path, block in self.files.items() if block.source == 'auto'}
+    
+    def conflicts(self) -> Dict[str, List[FileBlock]]:
+        """
+        Cesty, pro které artefakt obsahuje víc kandidátů, a přehlasované bloky.
+        """
+        return {path: blocks for path, blocks in self.overridden.items() if blocks}
+    
+    def contents(self) -> Dict[str, str]:
+        return {path: block.content for path, block in self.files.items()}
+
+
+class FileFilter:
+    """
+    Výběr souborů k extrakci (--only, --exclude, --namespace).
+    
+    Vzory bez '/' se porovnávají se jménem souboru i jmény nadřazených
+    adresářů, vzory s '/' s cestou a jejími adresářovými prefixy (fnmatch,
+    * zahrnuje i '/'). --only src/Projekt, src/Projekt/* i src/Projekt/**
+    tak vyberou celý podstrom.
+    
+    Namespace vybírá C# typy v daném namespace a jeho podnamespacech.
+    Soubory bez namespace (projekty, XAML) vypadnou už podle přípony.
+    """
+    
+    def __init__(self, only: List[str] | None = None, exclude: List[str] | None = None,
+                 namespaces: List[str] | None = None):
+        self.only = only or []
+        self.exclude = exclude or []
+        self.namespaces = namespaces or []
+    
+    def __bool__(self) -> bool:
+        return bool(self.only or self.exclude or self.namespaces)
+    
+    @staticmethod
+    def matches(file_path: str, patterns: List[str]) -> bool:
+        parts = file_path.split('/')
+        for position in range(len(parts), 0, -1):
+            prefix = '/'.join(parts[:position])
+            name = parts[position - 1]
+            for pattern in patterns:
+                if fnmatch.fnmatchcase(prefix if '/' in pattern else name, pattern):
+                    return True
+        return False
+    
+    def accepts_path(self, file_path: str) -> bool:
+        """
+        Rozhodnutí jen podle cesty - padne dřív, než se čte obsah bloku.
+        """
+        if self.namespaces and not file_path.endswith('.cs'):
+            return False
+        if self.only and not self.matches(file_path, self.only):
+            return False
+        return not (self.exclude and self.matches(file_path, self.exclude))
+    
+    def accepts_namespace(self, namespace: str | None) -> bool:
+        if not self.namespaces:
+            return True
+        if not namespace:
+            return False
+        return any(namespace == selected or namespace.startswith(selected + '.')
+                   for selected in self.namespaces)
+    
+    def describe(self) -> str:
+        parts = []
+        if self.only:
+            parts.append(f"jen {', '.join(self.only)}")
+        if self.exclude:
+            parts.append(f"kromě {', '.join(self.exclude)}")
+        if self.namespaces:
+            parts.append(f"namespace {', '.join(self.namespaces)}")
+        return '; '.join(parts)
+
+
+@dataclass
+class IndexEntry:
+    """
+    Záznam v bytovém indexu artefaktu.
+    
+    kind je 'file' pro explicitní // File: blok (start ukazuje na hlavičku,
+    wrapper_* na obsah uvnitř /* */ obalu) nebo 'gap' pro text mimo
+    explicitní bloky, který se prochází auto-detekcí.
+    """
+    kind: str
+    start: int
+    end: int
+    path: str | None = None
+    wrapper_start: int | None = None
+    wrapper_end: int | None = None
+    start_line: int = 1
+    end_line: int = 0
+
+
+class ArtifactIndex:
+    """
+    Memory-mapped artefakt s indexem hranic bloků podle bytových offsetů.
+    
+    Při stavbě indexu se nic nedekóduje kromě řádků s hlavičkami, obsah
+    bloků se vyřízne a dekóduje až na vyžádání. Obal /* */ se hledá jen
+    v rozsahu bloku, stavba indexu je proto lineární i bez koncového */.
+    
+    Použití:
+        with ArtifactIndex('artifact.txt') as index:
+            entry = index.find('src/HierarchicalMvvm.Core/IObserver.cs')
+    """
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        if os.fstat(self._file.fileno()).st_size:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._data = b''
+        self.entries: List[IndexEntry] = []
+        self._build()
+    
+    def __enter__(self) -> 'ArtifactIndex':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def is_blank(self) -> bool:
+        return re.search(rb'\S', self._data) is None
+    
+    def _line_end(self, offset: int) -> int:
+        end = self._data.find(b'\n', offset)
+        return len(self._data) if end == -1 else end
+    
+    def _count_lines(self, start: int, end: int) -> int:
+        """
+        Spočítá konce řádků v úseku bez kopírování celého úseku najednou.
+        """
+        count = 0
+        while start < end:
+            chunk_end = min(start + INDEX_CHUNK_SIZE, end)
+            count += self._data[start:chunk_end].count(b'\n')
+            start = chunk_end
+        return count
+    
+    def _build(self):
+        data = self._data
+        gap_start = 0
+        gap_line = 1
+        current = None
+        # Číslo řádku na pozici position
+        line = 1
+        position = 0
+        
+        for marker in INDEX_MARKER_PATTERN.finditer(data):
+            line_start = marker.start()
+            line_end = self._line_end(line_start)
+            
+            if data[marker.end() - 3:marker.end()] == b'===':
+                path = None
+            else:
+                header = FILE_HEADER_PATTERN.match(self.decode(line_start, line_end).strip())
+                if not header:
+                    continue
+                path = header.group(1)
+            
+            line += self._count_lines(position, line_start)
+            position = line_start
+            
+            if current:
+                self._close_file_entry(current, line_start, line - 1)
+                # Oddělovač patří do textu mimo bloky
+                gap_start = line_start
+                gap_line = line
+                current = None
+            elif path is not None and line_start > gap_start:
+                self.entries.append(IndexEntry('gap', gap_start, line_start,
+                                               start_line=gap_line,
+                                               end_line=line - 1))
+            
+            if path is not None:
+                current = IndexEntry('file', line_start, line_end, path, start_line=line)
+        
+        line += self._count_lines(position, len(data))
+        last_line = line - 1 if data[-1:] in (b'\n', b'') else line
+        if current:
+            self._close_file_entry(current, len(data), last_line)
+        elif len(data) > gap_start:
+            self.entries.append(IndexEntry('gap', gap_start, len(data),
+                                           start_line=gap_line,
+                                           end_line=last_line))
+    
+    def _close_file_entry(self, entry: IndexEntry, end: int, end_line: int):
+        body_start = min(entry.end + 1, end)
+        entry.end = end
+        entry.end_line = end_line
+        
+        wrapper_open = INDEX_WRAPPER_OPEN_PATTERN.search(self._data, body_start, end)
+        if wrapper_open:
+            entry.wrapper_start = min(self._line_end(wrapper_open.start()) + 1, end)
+            wrapper_close = INDEX_WRAPPER_CLOSE_PATTERN.search(self._data, entry.wrapper_start, end)
+            if wrapper_close:
+                entry.wrapper_end = wrapper_close.start()
+        
+        self.entries.append(entry)
+    
+    def decode(self, start: int, end: int) -> str:
+        """
+        Vyřízne a dekóduje úsek artefaktu (s převodem konců řádků jako v textovém režimu).
+        """
+        text = self._data[start:end].decode('utf-8')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+    
+    def iter_lines(self, start: int, end: int) -> Iterator[str]:
+        """
+        Dekóduje úsek artefaktu po řádcích (včetně jejich konců).
+        """
+        while start < end:
+            line_end = min(self._line_end(start) + 1, end)
+            yield self._data[start:line_end].decode('utf-8')
+            start = line_end
+    
+    def file_entries(self) -> Iterator[IndexEntry]:
+        return (entry for entry in self.entries if entry.kind == 'file')
+    
+    def find(self, file_path: str) -> IndexEntry | None:
+        """
+        Najde explicitní blok podle cesty (poslední výskyt vyhrává, stejně jako při parsování).
+        """
+        found = None
+        for entry in self.file_entries():
+            if entry.path == file_path:
+                found = entry
+        return found
+
+
+def iter_lines(content: str) -> Iterator[str]:
+    """
+    Iteruje řádky textu (včetně konců řádků) bez vytváření seznamu všech řádků.
+    """
+    start = 0
+    length = len(content)
+    while start < length:
+        end = content.find('\n', start)
+        if end == -1:
+            yield content[start:]
+            return
+        yield content[start:end + 1]
+        start = end + 1
+
+
+def utf8_length(text: str) -> int:
+    """
+    Délka textu v bajtech UTF-8 (pro bajtové offsety u --mmap).
+    """
+    return len(text.encode('utf-8'))
+
+
+def detect_compression(header: bytes) -> str | None:
+    """
+    Formát komprese podle magic bytes na začátku dat (None = nekomprimováno).
+    """
+    for magic, name in COMPRESSION_MAGIC:
+        if header.startswith(magic):
+            return name
+    return None
+
+
+def file_compression(path: str) -> str | None:
+    """
+    Formát komprese souboru. Chybu čtení nehlásí - tu ohlásí až samotné otevření.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return detect_compression(f.read(COMPRESSION_MAGIC_LENGTH))
+    except OSError:
+        return None
+
+
+class _PrefixedReader(io.RawIOBase):
+    """
+    Nepřevinutelný stream (roura), který nejdřív vrátí už přečtenou hlavičku.
+    """
+    
+    def __init__(self, prefix: bytes, stream):
+        self.prefix = prefix
+        self.stream = stream
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        if self.prefix:
+            size = min(len(buffer), len(self.prefix))
+            buffer[:size] = self.prefix[:size]
+            self.prefix = self.prefix[size:]
+            return size
+        # read1 vrátí, co je k dispozici (i jen to, co už leží v bufferu streamu po
+        # přečtení hlavičky), a nečeká na zaplnění celého bufferu - readinto1
+        # BufferedReaderu po vydání bufferovaných dat čeká na další zápis producenta
+        read1 = getattr(self.stream, 'read1', None)
+        if read1 is None:
+            return self.stream.readinto(buffer)
+        data = read1(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def open_zstd(stream):
+    """
+    Rozbalí zstd stream - stdlib compression.zstd (Python 3.14+), jinak balíček zstandard.
+    """
+    try:
+        from compression import zstd
+    except ImportError:
+        pass
+    else:
+        return zstd.ZstdFile(stream)
+    
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("artefakt je komprimovaný zstd, ale chybí compression.zstd (Python 3.14+) "
+                           "i balíček zstandard - rozbal ho předem (zstd -d)") from None
+    return zstandard.ZstdDecompressor().stream_reader(stream, read_across_frames=True)
+
+
+def open_decompressed(stream) -> Tuple[object, str | None]:
+    """
+    Obalí binární stream dekompresí podle magic bytes na jeho začátku.
+    
+    Funguje i pro roury (stdin) - přečtená hlavička se u nich vrátí přes
+    _PrefixedReader, u souborů se stream jen převine zpět.
+    
+    Returns:
+        (binární stream s rozbaleným obsahem, formát komprese nebo None)
+    """
+    header = stream.read(COMPRESSION_MAGIC_LENGTH)
+    compression = detect_compression(header)
+    if stream.seekable():
+        stream.seek(-len(header), io.SEEK_CUR)
+    elif compression:
+        # Dekompresor čte po velkých blocích - nebufferovaný stream mu vrací
+        # kratší úseky hned, jak je producent zapíše
+        stream = _PrefixedReader(header, stream)
+    else:
+        stream = io.BufferedReader(_PrefixedReader(header, stream))
+    
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=stream, mode='rb'), compression
+    if compression == 'bz2':
+        return bz2.BZ2File(stream), compression
+    if compression == 'xz':
+        return lzma.LZMAFile(stream), compression
+    if compression == 'zstd':
+        return open_zstd(stream), compression
+    return stream, None
+
+
+@contextmanager
+def open_artifact(path: str, stats: 'ExtractionStats | None' = None) -> Iterator:
+    """
+    Otevře artefakt pro čtení po řádcích, komprimovaný rozbalí za běhu.
+    Se stats se čtení měří jako fáze read.
+    """
+    with open(path, 'rb') as raw:
+        binary, _ = open_decompressed(raw)
+        if stats is not None:
+            binary = stats.timed_stream(binary)
+        with io.TextIOWrapper(binary, encoding='utf-8') as f:
+            yield f
+
+
+# Tokeny C# scanneru - komentáře a řetězce se přeskakují jako celek,
+# takže klíčová slova a závorky uvnitř nich se nepočítají. Koncovka komentáře
+# i řetězce je volitelná - neuzavřený pohltí zbytek textu jedním průchodem,
+# místo aby se od každé další pozice zkoušel znovu (scanner je lineární).
+_CSHARP_STRUCTURE_TOKENS = r"""
+    (?P<comment>//[^\n]*|/\*(?:[^*]|\*(?!/))*(?:\*/)?)
+  | (?P<string>\$*\"\"\"(?:[^"]|"(?!""))*(?:\"\"\")?
+             |(?:\$@|@\$?)"(?:[^"]|"")*"?
+             |\$?"(?:[^"\\\n]|\\.)*"?
+             |'(?:[^'\\\n]|\\.)*'?)
+  | (?P<brace>[{}])
+  | (?P<semicolon>;)
+"""
+CSHARP_TOKEN_PATTERN = re.compile(_CSHARP_STRUCTURE_TOKENS + r"""
+  | (?P<keyword>(?<![\w@])(?:namespace|class|interface|struct|enum|record)\b)
+""", re.VERBOSE)
+
+# Po nalezení typu už stačí sledovat závorky (bez klíčových slov)
+CSHARP_BODY_TOKEN_PATTERN = re.compile(_CSHARP_STRUCTURE_TOKENS, re.VERBOSE)
+
+CSHARP_NAMESPACE_NAME_PATTERN = re.compile(r'\s*(@?[\w.]+)')
+CSHARP_TYPE_NAME_PATTERN = re.compile(r'\s+(@?\w+)')
+CSHARP_RECORD_NAME_PATTERN = re.compile(r'\s+(?:(class|struct)\s+)?(@?\w+)')
+
+# Začátek C# kódu po úvodních komentářích a prázdných řádcích
+CSHARP_LEADING_TRIVIA_PATTERN = re.compile(r'(?:\s+|//[^\n]*|/\*(?:[^*]|\*(?!/))*(?:\*/)?)*')
+CSHARP_CODE_START_PATTERN = re.compile(r'(?:using|namespace|public|internal|private)\s|\[')
+
+
+@dataclass
+class CSharpDeclaration:
+    """
+    První top-level typ v C# kódu.
+    
+    kind je klíčové slovo deklarace ('class', 'record struct', ...),
+    řádky jsou číslované od 1 v rámci skenovaného textu. end_line je
+    vyplněn jen pokud se o něj scanner požádá.
+    """
+    namespace: str | None
+    kind: str
+    name: str
+    start_line: int
+    end_line: int | None = None
+
+
+def starts_with_csharp_code(text: str) -> bool:
+    """
+    Zkontroluje, jestli první kód po komentářích vypadá jako začátek C# souboru.
+    """
+    start = CSHARP_LEADING_TRIVIA_PATTERN.match(text).end()
+    return CSHARP_CODE_START_PATTERN.match(text, start) is not None
+
+
+def scan_csharp_declaration(text: str, find_end: bool = False) -> CSharpDeclaration | None:
+    """
+    Jedním průchodem najde namespace (blokový i file-scoped) a první top-level typ.
+    
+    Skenování končí hned po nalezení typu, s find_end=True až na konci
+    jeho deklarace (uzavírací závorka nebo středník u pozičních recordů).
+    
+    Returns:
+        CSharpDeclaration nebo None, pokud kód žádný typ nedeklaruje
+    """
+    depth = 0
+    # Hloubky a názvy otevřených blokových namespace
+    namespaces: List[Tuple[int, str]] = []
+    file_namespace = None
+    pending_namespace = None
+    
+    for token in CSHARP_TOKEN_PATTERN.finditer(text):
+        kind = token.lastgroup
+        
+        if kind == 'brace':
+            if token.group() == '{':
+                if pending_namespace:
+                    namespaces.append((depth, pending_namespace))
+                    pending_namespace = None
+                depth += 1
+            else:
+                depth = max(depth - 1, 0)
+                if namespaces and namespaces[-1][0] == depth:
+                    namespaces.pop()
+            continue
+        
+        if kind == 'semicolon':
+            if pending_namespace:
+                file_namespace = pending_namespace
+                pending_namespace = None
+            continue
+        
+        if kind != 'keyword':
+            continue
+        
+        keyword = token.group()
+        if keyword == 'namespace':
+            match = CSHARP_NAMESPACE_NAME_PATTERN.match(text, token.end())
+            if match:
+                pending_namespace = match.group(1)
+            continue
+        
+        # Typ vnořený v jiném typu (nebo v metodě) není top-level
+        top_depth = namespaces[-1][0] + 1 if namespaces else 0
+        if depth != top_depth:
+            continue
+        
+        if keyword == 'record':
+            match = CSHARP_RECORD_NAME_PATTERN.match(text, token.end())
+            if match and match.group(1):
+                keyword = f"record {match.group(1)}"
+            name_group = 2
+        else:
+            match = CSHARP_TYPE_NAME_PATTERN.match(text, token.end())
+            name_group = 1
+        
+        # např. generické omezení "where T : class"
+        if not match or match.group(name_group) in ('class', 'struct', 'where'):
+            continue
+        
+        namespace_parts = ([file_namespace] if file_namespace else []) + [name for _, name in namespaces]
+        declaration = CSharpDeclaration(
+            namespace='.'.join(namespace_parts) or None,
+            kind=keyword,
+            name=match.group(name_group).lstrip('@'),
+            start_line=text.count('\n', 0, token.start()) + 1,
+        )
+        if find_end:
+            end_offset = _find_declaration_end(text, match.end())
+            declaration.end_line = text.count('\n', 0, end_offset) + 1
+        return declaration
+    
+    return None
+
+
+def _find_declaration_end(text: str, start: int) -> int:
+    """
+    Najde offset konce deklarace typu, jejíž hlavička začíná na start.
+    """
+    depth = 0
+    body_opened = False
+    
+    for token in CSHARP_BODY_TOKEN_PATTERN.finditer(text, start):
+        kind = token.lastgroup
+        if kind == 'brace':
+            if token.group() == '{':
+                if depth == 0:
+                    body_opened = True
+                depth += 1
+            else:
+                depth -= 1
+                if body_opened and depth == 0:
+                    return token.end()
+        elif kind == 'semicolon' and not body_opened and depth == 0:
+            return token.end()
+    
+    return len(text)
+
+
+class SolutionIndex:
+    """
+    Index cílové solution pod --base-dir pro routování auto-detekovaných typů.
+    
+    Obsahuje projekty (z .sln a .csproj, klíčem je root namespace) a mapu
+    typů na soubory, ve kterých už existují (jen .cs uvnitř projektů).
+    Index se cachuje po adresářích a adresář se znovu prochází jen při
+    změně jeho mtime - přidání, smazání nebo přejmenování souboru. Úpravy
+    .cs souborů na místě se projeví až s --reindex, .sln a .csproj se
+    kontrolují podle vlastního mtime.
+    
+    Použití:
+        index = SolutionIndex.load(Path('.'))
+        index.resolve('HierarchicalMvvm.Demo.Models', 'Person')
+    """
+    
+    def __init__(self, root: Path):
+        self.root = root
+        # relativní adresář -> záznam (mtime_ns, subdirs, types, projects, solutions)
+        self.directories: Dict[str, Dict] = {}
+        self.projects: Dict[str, str] = {}  # root namespace -> adresář projektu
+        self.types: Dict[str, str] = {}  # Namespace.Typ -> soubor
+        self.type_names: Dict[str, str | None] = {}  # Typ -> soubor, None pokud není jednoznačný
+    
+    @property
+    def cache_path(self) -> Path:
+        return self.root / SOLUTION_INDEX_PATH
+    
+    @classmethod
+    def load(cls, root: Path, rebuild: bool = False, persist: bool = True) -> 'SolutionIndex':
+        """
+        Načte index z cache, projde změněné adresáře a aktualizovanou cache uloží.
+        Bez persist se cache jen čte - do root se nic nezapíše.
+        """
+        index = cls(root)
+        if not root.is_dir():
+            return index
+        
+        if not rebuild:
+            try:
+                with open(index.cache_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == SOLUTION_INDEX_VERSION:
+                    index.directories = data.get('directories', {})
+            except (OSError, ValueError, AttributeError):
+                pass
+        
+        if index.refresh() and persist:
+            index.save()
+        index.build_lookups()
+        return index
+    
+    def save(self):
+        tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        try:
+            tmp_path.parent.mkdir(exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+                json.dump({'version': SOLUTION_INDEX_VERSION, 'directories': self.directories},
+                          f, separators=(',', ':'), sort_keys=True)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+    
+    def refresh(self) -> bool:
+        """
+        Projde strom od kořene, adresáře se stejným mtime převezme z cache.
+        
+        Returns:
+            True, pokud se index změnil
+        """
+        cached = self.directories
+        directories = {}
+        changed = False
+        stack = ['']
+        
+        while stack:
+            relative = stack.pop()
+            full_path = self.root / relative
+            try:
+                mtime_ns = full_path.stat().st_mtime_ns
+            except OSError:
+                continue
+            
+            record = cached.get(relative)
+            if record is None or record['mtime_ns'] != mtime_ns:
+                record = self._scan_directory(relative, full_path, mtime_ns)
+                changed = True
+            elif self._refresh_project_files(record, full_path):
+                changed = True
+            
+            directories[relative] = record
+            if relative.count('/') < SOLUTION_MAX_DEPTH:
+                stack.extend(f"{relative}/{name}" if relative else name for name in record['subdirs'])
+        
+        if directories.keys() != cached.keys():
+            changed = True
+        self.directories = directories
+        return changed
+    
+    def _scan_directory(self, relative: str, full_path: Path, mtime_ns: int) -> Dict:
+        record = {'mtime_ns': mtime_ns, 'subdirs': [], 'types': [], 'projects': [], 'solutions': []}
+        try:
+            entries = sorted(os.scandir(full_path), key=lambda entry: entry.name)
+        except OSError:
+            return record
+        
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SOLUTION_SKIP_DIRS:
+                    record['subdirs'].append(entry.name)
+                continue
+            
+            file_path = f"{relative}/{entry.name}" if relative else entry.name
+            if entry.name.endswith('.cs'):
+                declaration = scan_csharp_declaration(self._read_text(entry.path))
+                if declaration:
+                    record['types'].append([declaration.namespace or '', declaration.name, file_path])
+            elif entry.name.endswith('.csproj'):
+                record['projects'].append(self._parse_project(entry.path, file_path))
+            elif entry.name.endswith('.sln'):
+                record['solutions'].append(self._parse_solution(entry.path, file_path, relative))
+        return record
+    
+    def _refresh_project_files(self, record: Dict, full_path: Path) -> bool:
+        """
+        Znovu načte .csproj/.sln v nezměněném adresáři, pokud se změnil jejich mtime.
+        """
+        changed = False
+        for position, (_, file_path, mtime_ns) in enumerate(record['projects']):
+            full_file = self.root / file_path
+            try:
+                if full_file.stat().st_mtime_ns != mtime_ns:
+                    record['projects'][position] = self._parse_project(str(full_file), file_path)
+                    changed = True
+            except OSError:
+                pass
+        for position, (file_path, mtime_ns, _) in enumerate(record['solutions']):
+            full_file = self.root / file_path
+            try:
+                if full_file.stat().st_mtime_ns != mtime_ns:
+                    directory = file_path.rpartition('/')[0]
+                    record['solutions'][position] = self._parse_solution(str(full_file), file_path, directory)
+                    changed = True
+            except OSError:
+                pass
+        return changed
+    
+    @staticmethod
+    def _read_text(path: str) -> str:
+        try:
+            with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+                return f.read()
+        except OSError:
+            return ''
+    
+    def _parse_project(self, path: str, file_path: str) -> List:
+        """
+        [root namespace, soubor, mtime] - bez <RootNamespace> platí název projektu.
+        """
+        match = CSPROJ_ROOT_NAMESPACE_PATTERN.search(self._read_text(path))
+        root_namespace = match.group(1) if match else Path(file_path).stem
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        return [root_namespace, file_path, mtime_ns]
+    
+    def _parse_solution(self, path: str, file_path: str, directory: str) -> List:
+        """
+        [soubor, mtime, [[název projektu, adresář projektu], ...]]
+        """
+        projects = []
+        for name, project_path in SLN_PROJECT_PATTERN.findall(self._read_text(path)):
+            parts = [part for part in directory.split('/') if part]
+            for part in project_path.replace('\\', '/').split('/')[:-1]:
+                if part == '..':
+                    if not parts:
+                        break
+                    parts.pop()
+                elif part not in ('', '.'):
+                    parts.append(part)
+            else:
+                projects.append([name, '/'.join(parts)])
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        return [file_path, mtime_ns, projects]
+    
+    def build_lookups(self):
+        """
+        Sestaví slovníky projektů a typů z adresářových záznamů.
+        """
+        project_dirs: Dict[str, str] = {}
+        for record in self.directories.values():
+            for _, _, solution_projects in record['solutions']:
+                for name, directory in solution_projects:
+                    project_dirs.setdefault(directory, name)
+        # RootNamespace z .csproj má přednost před názvem v .sln
+        for record in self.directories.values():
+            for root_namespace, file_path, _ in record['projects']:
+                project_dirs[file_path.rpartition('/')[0]] = root_namespace
+        
+        self.projects = {root_namespace: directory for directory, root_namespace in sorted(project_dirs.items())}
+        self.types = {}
+        self.type_names = {}
+        
+        for directory in sorted(self.directories):
+            record = self.directories[directory]
+            if not record['types'] or not self._in_project(directory, project_dirs):
+                continue
+            for namespace, name, file_path in record['types']:
+                self.types[f"{namespace}.{name}" if namespace else name] = file_path
+                if name in self.type_names and self.type_names[name] != file_path:
+                    self.type_names[name] = None
+                else:
+                    self.type_names[name] = file_path
+    
+    @staticmethod
+    def _in_project(directory: str, project_dirs: Dict[str, str]) -> bool:
+        while True:
+            if directory in project_dirs:
+                return True
+            if not directory:
+                return False
+            directory = directory.rpartition('/')[0]
+    
+    def resolve(self, namespace: str | None, type_name: str) -> str | None:
+        """
+        Cesta pro typ - existující soubor, jinak adresář projektu s nejdelším
+        odpovídajícím root namespace (zbytek namespace jsou podadresáře).
+        
+        Returns:
+            relativní cesta, nebo None, pokud typ nepatří do žádného projektu
+        """
+        if not namespace:
+            return self.type_names.get(type_name)
+        
+        existing = self.types.get(f"{namespace}.{type_name}")
+        if existing:
+            return existing
+        
+        parts = namespace.split('.')
+        for length in range(len(parts), 0, -1):
+            directory = self.projects.get('.'.join(parts[:length]))
+            if directory is not None:
+                return '/'.join([part for part in [directory] if part] + parts[length:] + [f"{type_name}.cs"])
+        return None
+
+
+class ExtractionStats:
+    """
+    Metriky jedné extrakce pro --stats.
+    
+    Fáze se měří exkluzivně - vnořená fáze (např. clean uvnitř write)
+    pozastaví nadřazenou, takže se časy fází nepřekrývají. CPU čas je
+    per-vlákno, s --jobs > 1 se tedy fáze write sčítá přes všechna vlákna.
+    Fáze read je čtení vstupu v hlavním vlákně, s --pipeline čekání na
+    čtecí vlákno (to samo se neměří, běží souběžně s ostatními fázemi).
+    """
+    
+    def __init__(self, slowest_writes: int = 10):
+        self.slowest_writes = slowest_writes
+        self.phases: Dict[str, List[float]] = {}  # fáze -> [wall, cpu, počet volání]
+        self.counters: Dict[str, int] = {}
+        self.writes: List[Tuple[float, str, int]] = []  # (sekundy, cesta, bajty)
+        self.memory: Dict | None = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started_wall = time.perf_counter()
+        self._started_cpu = time.process_time()
+    
+    def _stack(self) -> List[list]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+    
+    def _add(self, name: str, wall: float, cpu: float, calls: int):
+        with self._lock:
+            totals = self.phases.get(name)
+            if totals is None:
+                totals = self.phases[name] = [0.0, 0.0, 0]
+            totals[0] += wall
+            totals[1] += cpu
+            totals[2] += calls
+    
+    def enter(self, name: str):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        stack = self._stack()
+        if stack:
+            parent = stack[-1]
+            self._add(parent[0], wall - parent[1], cpu - parent[2], 0)
+        stack.append([name, wall, cpu])
+    
+    def exit(self):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        stack = self._stack()
+        name, started_wall, started_cpu = stack.pop()
+        self._add(name, wall - started_wall, cpu - started_cpu, 1)
+        if stack:
+            stack[-1][1] = wall
+            stack[-1][2] = cpu
+    
+    @contextmanager
+    def phase(self, name: str):
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit()
+    
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+    
+    def merge(self, phases: Dict[str, List[float]], counters: Dict[str, int]):
+        """
+        Přičte fáze a čítače naměřené v jiném procesu (--batch).
+        """
+        for name, (wall, cpu, calls) in phases.items():
+            self._add(name, wall, cpu, calls)
+        for name, value in counters.items():
+            self.count(name, value)
+    
+    def record_write(self, file_path: str, seconds: float, size: int):
+        with self._lock:
+            self.writes.append((seconds, file_path, size))
+            self.counters['bytes_out'] = self.counters.get('bytes_out', 0) + size
+    
+    def counted_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Počítá přečtené řádky a bajty vstupu.
+        
+        Bez měření času - fázi read měří timed_stream po blocích čtených
+        ze streamu (s --pipeline iter_pipelined_lines), hodiny na každém
+        řádku by čtení samy zpomalily.
+        """
+        line_count = 0
+        size = 0
+        try:
+            for line in lines:
+                line_count += 1
+                # isascii je O(1), kódovat se musí jen řádky s ne-ASCII znaky
+                size += len(line) if line.isascii() else utf8_length(line)
+                yield line
+        finally:
+            self.count('lines_in', line_count)
+            self.count('bytes_in', size)
+    
+    def timed_stream(self, stream) -> io.BufferedReader:
+        """
+        Obalí binární stream tak, aby se jeho čtení měřilo jako fáze read.
+        """
+        return io.BufferedReader(_TimedReader(stream, self))
+    
+    def record_memory(self, top: int = 10):
+        """
+        Uloží špičku paměti a největší alokační místa z běžícího tracemalloc.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        self.memory = {
+            'current_bytes': current,
+            'peak_bytes': peak,
+            'top_allocations': [
+                {'location': str(statistic.traceback[0]), 'bytes': statistic.size, 'count': statistic.count}
+                for statistic in snapshot.statistics('lineno')[:top]
+            ],
+        }
+    
+    def to_dict(self) -> Dict:
+        return {
+            'version': 1,
+            'wall_seconds': time.perf_counter() - self._started_wall,
+            'cpu_seconds': time.process_time() - self._started_cpu,
+            'phases': {
+                name: {'wall_seconds': wall, 'cpu_seconds': cpu, 'calls': calls}
+                for name, (wall, cpu, calls) in self.phases.items()
+            },
+            'counters': dict(sorted(self.counters.items())),
+            'slowest_writes': [
+                {'path': file_path, 'seconds': seconds, 'bytes': size}
+                for seconds, file_path, size in heapq.nlargest(self.slowest_writes, self.writes)
+            ],
+            'memory': self.memory,
+        }
+    
+    def write(self, target: str):
+        """
+        Zapíše statistiky jako JSON do souboru, nebo s '-' na stderr.
+        """
+        if target == '-':
+            json.dump(self.to_dict(), sys.stderr, indent=2)
+            sys.stderr.write('\n')
+            return
+        with open(target, 'w', encoding='utf-8', newline='\n') as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write('\n')
+
+
+class _TimedReader(io.RawIOBase):
+    """
+    Binární stream, jehož každé čtení bloku se měří jako fáze read
+    (včetně rozbalení komprimovaného vstupu).
+    """
+    
+    def __init__(self, stream, stats: ExtractionStats):
+        self.stream = stream
+        self.stats = stats
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        # read1 jako u _PrefixedReader - na rouře nečeká na zaplnění bufferu
+        read1 = getattr(self.stream, 'read1', None)
+        with self.stats.phase('read'):
+            if read1 is None:
+                return self.stream.readinto(buffer)
+            data = read1(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def stats_phase(stats: ExtractionStats | None, name: str):
+    """
+    Kontext fáze, bez --stats prázdný.
+    """
+    return stats.phase(name) if stats is not None else nullcontext()
+
+
+def timed_phase(name: str):
+    """
+    Dekorátor metody FileExtractor, který ji se --stats měří jako fázi name.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.stats is None:
+                return method(self, *args, **kwargs)
+            with self.stats.phase(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+WRITTEN_STATUSES = ('created', 'updated')
+
+
+class ExtractedFile:
+    """
+    Výsledek extrakce jednoho souboru.
+    
+    status je 'created', 'updated', 'unchanged', 'skipped', 'failed',
+    nebo 'pending', pokud se soubor nezapisoval. content je vyčištěný
+    obsah tak, jak se zapisuje - počítá se až při prvním přístupu.
+    """
+    __slots__ = ('path', 'status', '_source', '_cleaner', '_content')
+    
+    def __init__(self, path: str, status: str, source: str | FileBlock,
+                 cleaner: Callable[[str | FileBlock, str], str]):
+        self.path = path
+        self.status = status
+        self._source = source
+        self._cleaner = cleaner
+        self._content = None
+    
+    @property
+    def provenance(self) -> BlockProvenance | None:
+        return self._source.provenance if isinstance(self._source, FileBlock) else None
+    
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            self._content = self._cleaner(self._source, self.path)
+            self._cleaner = None
+        return self._content
+    
+    @property
+    def written(self) -> bool:
+        return self.status in WRITTEN_STATUSES
+    
+    def __repr__(self) -> str:
+        return f"ExtractedFile({self.path!r}, {self.status!r})"
+
+
+class ReportSink:
+    """
+    Cíl hlášení FileExtractor. Základní implementace je tichá (knihovní použití).
+    """
+    
+    def message(self, text: str = ''):
+        pass
+    
+    def file_result(self, record: ExtractedFile):
+        pass
+
+
+class ConsoleReportSink(ReportSink):
+    """
+    Emoji výpis na stdout - výstup CLI.
+    """
+    
+    def message(self, text: str = ''):
+        print(text)
+
+
+class CollectingReportSink(ReportSink):
+    """
+    Sbírá hlášení a výsledky souborů - odpověď serveru (serve).
+    """
+    
+    def __init__(self):
+        self.messages: List[str] = []
+        self.records: List[ExtractedFile] = []
+    
+    def message(self, text: str = ''):
+        self.messages.append(text)
+    
+    def file_result(self, record: ExtractedFile):
+        self.records.append(record)
+
+
+class ArchiveWriter:
+    """
+    Výstup extrakce do jednoho zip/tar(.gz) archivu místo stromu souborů.
+    
+    Formát určuje přípona cíle (.zip, .tar, .tar.gz/.tgz), '-' je tar na stdout.
+    Záznamy mají pevný čas, práva i vlastníka a jdou v pořadí zápisu, takže
+    stejný artefakt dá bajtově stejný archiv. Soubory ze základního archivu
+    (base) se berou jako existující a ty nepřepsané se v close() zkopírují
+    na konec. Cíl se zapisuje do dočasného souboru, base tedy může být i sám cíl.
+    """
+    
+    def __init__(self, target: str, base: str | None = None, stdout=None):
+        self.target = target
+        self.format = self.archive_format(target)
+        self.base = base
+        self.base_names = self.read_base_names(base) if base else set()
+        self.written: Dict[str, int] = {}
+        
+        if target == '-':
+            self._tmp_path = None
+            self._output = stdout if stdout is not None else sys.stdout.buffer
+        else:
+            self._tmp_path = target + '.tmp'
+            self._output = open(self._tmp_path, 'wb')
+        
+        self._zip = None
+        self._tar = None
+        self._gzip = None
+        if self.format == 'zip':
+            self._zip = zipfile.ZipFile(self._output, 'w', compression=zipfile.ZIP_DEFLATED)
+        else:
+            output = self._output
+            if self.format == 'tar.gz':
+                # Bez jména a času v gzip hlavičce
+                self._gzip = output = gzip.GzipFile(filename='', mode='wb', fileobj=output,
+                                                    compresslevel=6, mtime=0)
+            self._tar = tarfile.open(fileobj=output, mode='w|', format=tarfile.PAX_FORMAT)
+    
+    @staticmethod
+    def archive_format(path: str) -> str:
+        name = path.lower()
+        if name == '-' or name.endswith('.tar'):
+            return 'tar'
+        if name.endswith(('.tar.gz', '.tgz')):
+            return 'tar.gz'
+        if name.endswith('.zip'):
+            return 'zip'
+        raise ValueError(f"neznámý formát archivu {path} (podporováno .zip, .tar, .tar.gz, -)")
+    
+    @property
+    def label(self) -> str:
+        return f"{'stdout' if self.target == '-' else self.target} ({self.format})"
+    
+    @staticmethod
+    def read_base_names(path: str) -> set:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                return {info.filename for info in archive.infolist() if not info.is_dir()}
+        with tarfile.open(path, 'r:*') as archive:
+            return {member.name for member in archive if member.isfile()}
+    
+    def iter_base_files(self) -> Iterator[Tuple[str, bytes]]:
+        if zipfile.is_zipfile(self.base):
+            with zipfile.ZipFile(self.base) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        yield info.filename, archive.read(info)
+        else:
+            with tarfile.open(self.base, 'r:*') as archive:
+                for member in archive:
+                    if member.isfile():
+                        yield member.name, archive.extractfile(member).read()
+    
+    def exists(self, name: str) -> bool:
+        return name in self.written or name in self.base_names
+    
+    def add(self, name: str, data: bytes):
+        if self._zip is not None:
+            info = zipfile.ZipInfo(name, ARCHIVE_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = (0o100000 | ARCHIVE_FILE_MODE) << 16
+            self._zip.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = ARCHIVE_MTIME
+            info.mode = ARCHIVE_FILE_MODE
+            self._tar.addfile(info, io.BytesIO(data))
+        self.written[name] = len(data)
+    
+    def close(self):
+        """
+        Doplní nepřepsané soubory ze základního archivu a dokončí cíl.
+        """
+        if self.base:
+            for name, data in self.iter_base_files():
+                if name not in self.written:
+                    self.add(name, data)
+        self._close_streams()
+        if self._tmp_path is not None:
+            os.replace(self._tmp_path, self.target)
+    
+    def abort(self):
+        """
+        Zahodí rozepsaný archiv (cíl zůstane, jak byl).
+        """
+        try:
+            self._close_streams()
+        except Exception:
+            pass
+        if self._tmp_path is not None:
+            try:
+                os.unlink(self._tmp_path)
+            except OSError:
+                pass
+    
+    def _close_streams(self):
+        if self._zip is not None:
+            self._zip.close()
+        else:
+            self._tar.close()
+        if self._gzip is not None:
+            self._gzip.close()
+        if self._tmp_path is not None:
+            self._output.close()
+        else:
+            self._output.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def parse_size(text: str) -> int:
+    """
+    Velikost z textu jako 500M, 2G, 1.5GiB nebo 1048576 (bajty).
+    """
+    match = SIZE_PATTERN.match(text)
+    if not match:
+        raise argparse.ArgumentTypeError(f"neplatná velikost: {text!r} (např. 500M, 2G)")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).lower()])
+
+
+class ContentStore:
+    """
+    Úložiště obsahu adresované hashem (--store), sdílené více extrakcemi.
+    
+    Objekt objects/ab/cdef... je vyčištěný obsah souboru pojmenovaný podle
+    jeho SHA-256. Soubor, jehož obsah už v úložišti je, se do stromu znovu
+    nezapisuje, ale připojí - reflinkem (copy-on-write kopie na btrfs/XFS),
+    s link_mode='hardlink' hardlinkem, jinak jako záloha kopií. Cíl se vždy
+    nahradí atomicky přes dočasný soubor, takže se nikdy nepřepisuje inode
+    sdílený s objektem. Objekty jsou jen pro čtení (STORE_OBJECT_MODE) -
+    hardlinkovaný soubor sdílí s objektem inode i tato práva a jeho úprava
+    na místě by změnila obsah úložiště. Reflink a kopie mají vlastní inode
+    a běžná práva, dají se tedy upravovat i přepsat další extrakcí.
+    
+    Použité objekty se po běhu zapíší do access.log (řádek 'čas hash'). Podle
+    něj evict() maže nejdéle nepoužité objekty nad limitem velikosti a gc()
+    objekty, na které už žádný strom neodkazuje. Úložiště může sdílet víc
+    procesů najednou - zápis logu, evict() i gc() drží zámek, objekt smazaný
+    jiným procesem během připojování se zapíše znovu.
+    """
+    
+    def __init__(self, root: str, link_mode: str = 'auto', max_size: int | None = None):
+        self.root = Path(root)
+        self.objects_dir = self.root / STORE_OBJECTS_DIR
+        self.link_modes = STORE_LINK_MODES[link_mode]
+        self.max_size = max_size
+        self.used: Dict[str, float] = {}
+        # Počty připojení podle způsobu (reflink/hardlink/copy) a nově uložených objektů
+        self.placed: Dict[str, int] = {}
+        self.reused = 0
+        self.added = 0
+        # Způsoby, které souborový systém nepodporuje - v dalších souborech se nezkouší
+        self._unsupported: set = set()
+        self._lock = threading.Lock()
+    
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+    
+    def place(self, data: bytes, target: Path, digest: str | None = None) -> str:
+        """
+        Zapíše data do target přes úložiště.
+        
+        Returns:
+            způsob připojení: 'reflink', 'hardlink' nebo 'copy'
+        """
+        if digest is None:
+            digest = hashlib.sha256(data).hexdigest()
+        object_path = self.object_path(digest)
+        
+        # Dvě kola - objekt mohl mezi kontrolou a připojením smazat gc jiného procesu
+        reused = True
+        for _ in range(2):
+            try:
+                object_stat = object_path.stat()
+            except FileNotFoundError:
+                object_stat = None
+            if object_stat is None or object_stat.st_size != len(data):
+                self._add_object(object_path, data)
+                reused = False
+            
+            try:
+                method = self._link(object_path, target, data)
+                break
+            except FileNotFoundError:
+                if not target.parent.is_dir():
+                    raise
+        else:
+            raise FileNotFoundError(errno.ENOENT, 'objekt zmizel z úložiště', str(object_path))
+        
+        with self._lock:
+            self.used[digest] = time.time()
+            self.placed[method] = self.placed.get(method, 0) + 1
+            self.reused += reused
+        return method
+    
+    def _add_object(self, object_path: Path, data: bytes):
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = object_path.with_name(f"{object_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.chmod(tmp_path, STORE_OBJECT_MODE)
+            os.replace(tmp_path, object_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            self.added += 1
+    
+    def _link(self, object_path: Path, target: Path, data: bytes) -> str:
+        """
+        Připojí objekt do target. Nový soubor vzniká rovnou na místě,
+        existující se nahradí přes dočasný soubor (os.replace).
+        """
+        try:
+            return self._link_new(object_path, target, data)
+        except FileExistsError:
+            pass
+        
+        # Cíl už je hardlink objektu - rename() na stejný inode by nic neudělal
+        # a dočasný soubor by zůstal
+        if os.path.samefile(object_path, target):
+            return 'hardlink'
+        
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            method = self._link_new(object_path, tmp_path, data)
+            os.replace(tmp_path, target)
+            return method
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+    
+    def _link_new(self, object_path: Path, destination: Path, data: bytes) -> str:
+        for method in self.link_modes:
+            if method in self._unsupported:
+                continue
+            try:
+                if method == 'reflink':
+                    self._reflink(object_path, destination)
+                elif method == 'hardlink':
+                    os.link(object_path, destination)
+                else:
+                    with open(destination, 'xb') as f:
+                        f.write(data)
+                return method
+            except (FileNotFoundError, FileExistsError):
+                raise
+            except OSError as e:
+                if method == 'copy':
+                    self._remove(destination)
+                    raise
+                # Příliš mnoho hardlinků je vlastnost objektu, ne souborového systému
+                if e.errno != errno.EMLINK:
+                    self._unsupported.add(method)
+        raise OSError(errno.ENOTSUP, 'žádný způsob připojení z úložiště nefunguje', str(destination))
+    
+    @staticmethod
+    def _reflink(source: Path, destination: Path):
+        try:
+            import fcntl
+        except ImportError:
+            raise OSError(errno.ENOTSUP, 'reflink vyžaduje fcntl')
+        with open(source, 'rb') as src, open(destination, 'xb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            except OSError:
+                dst.close()
+                os.unlink(destination)
+                raise
+    
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    
+    @contextmanager
+    def locked(self):
+        """
+        Výhradní zámek úložiště mezi procesy (bez fcntl jen v rámci procesu).
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / STORE_LOCK_FILE, 'a') as lock_file:
+            try:
+                import fcntl
+            except ImportError:
+                fcntl = None
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    
+    def flush(self) -> Tuple[int, int]:
+        """
+        Zapíše použité objekty do access.log a s max_size vyřadí nejdéle
+        nepoužité objekty nad limit.
+        
+        Returns:
+            (počet vyřazených objektů, uvolněné bajty)
+        """
+        with self._lock:
+            used, self.used = self.used, {}
+        with self.locked():
+            if used:
+                lines = ''.join(f"{used[digest]:.0f} {digest}\n" for digest in sorted(used))
+                with open(self.root / STORE_ACCESS_LOG, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+            if self.max_size is None:
+                return 0, 0
+            return self._evict(self.max_size)
+    
+    def iter_objects(self) -> Iterator[Tuple[str, Path, os.stat_result]]:
+        """
+        Objekty úložiště jako (hash, cesta, stat), bez rozepsaných dočasných souborů.
+        """
+        try:
+            fanout = sorted(os.scandir(self.objects_dir), key=lambda entry: entry.name)
+        except FileNotFoundError:
+            return
+        for directory in fanout:
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    yield directory.name + entry.name, Path(entry.path), entry.stat()
+                except FileNotFoundError:
+                    continue
+    
+    def read_access_log(self) -> Dict[str, float]:
+        """
+        Poslední použití každého objektu podle access.log.
+        """
+        last_used: Dict[str, float] = {}
+        try:
+            with open(self.root / STORE_ACCESS_LOG, 'r', encoding='utf-8') as f:
+                for line in f:
+                    timestamp, _, digest = line.strip().partition(' ')
+                    try:
+                        used = float(timestamp)
+                    except ValueError:
+                        continue
+                    if used > last_used.get(digest, 0.0):
+                        last_used[digest] = used
+        except FileNotFoundError:
+            pass
+        return last_used
+    
+    def _write_access_log(self, last_used: Dict[str, float]):
+        tmp_path = self.root / (STORE_ACCESS_LOG + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for digest in sorted(last_used, key=last_used.get):
+                f.write(f"{last_used[digest]:.0f} {digest}\n")
+        os.replace(tmp_path, self.root / STORE_ACCESS_LOG)
+    
+    def _scan(self) -> Tuple[List[Tuple[float, str, Path, int]], Dict[str, float]]:
+        """
+        Objekty seřazené od nejdéle nepoužitého jako (poslední použití, hash,
+        cesta, velikost). Objekt bez záznamu v logu bere čas svého vložení.
+        """
+        logged = self.read_access_log()
+        objects = []
+        for digest, path, stat in self.iter_objects():
+            objects.append((logged.get(digest, stat.st_mtime), digest, path, stat.st_size))
+        objects.sort()
+        return objects, {digest: used for used, digest, _, _ in objects}
+    
+    def _delete_objects(self, victims: Iterable[Tuple[float, str, Path, int]],
+                        last_used: Dict[str, float]) -> Tuple[int, int]:
+        count = freed = 0
+        for _, digest, path, size in victims:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            last_used.pop(digest, None)
+            count += 1
+            freed += size
+            try:
+                path.parent.rmdir()
+            except OSError:
+                pass
+        return count, freed
+    
+    def _evict(self, max_size: int) -> Tuple[int, int]:
+        objects, last_used = self._scan()
+        excess = sum(size for _, _, _, size in objects) - max_size
+        victims = []
+        for item in objects:
+            if excess <= 0:
+                break
+            victims.append(item)
+            excess -= item[3]
+        result = self._delete_objects(victims, last_used)
+        # Log se přepíše kompaktní - jeden řádek na žijící objekt
+        self._write_access_log(last_used)
+        return result
+    
+    def evict(self, max_size: int) -> Tuple[int, int]:
+        """
+        Vyřadí nejdéle nepoužité objekty, dokud úložiště nepřekračuje max_size.
+        Soubory připojené ve stromech zůstanou (hardlink/reflink/kopie mají
+        vlastní odkaz na data), jen se příště znovu uloží.
+        """
+        with self.locked():
+            return self._evict(max_size)
+    
+    def gc(self, max_age: float, max_size: int | None = None, verify: bool = False) -> Dict[str, int]:
+        """
+        Úklid úložiště.
+        
+        - objekty, na které neodkazuje žádný hardlink a nebyly použity
+          max_age sekund (u reflinku a kopie rozhoduje jen stáří),
+        - s verify objekty, jejichž obsah neodpovídá hashi,
+        - s max_size nejdéle nepoužité objekty nad limit,
+        - dočasné soubory po přerušených zápisech.
+        
+        Returns:
+            počty smazaných objektů a uvolněných bajtů podle důvodu a velikost zbytku
+        """
+        now = time.time()
+        result = {}
+        with self.locked():
+            objects, last_used = self._scan()
+            
+            if verify:
+                corrupt = []
+                for item in objects:
+                    if hashlib.sha256(item[2].read_bytes()).hexdigest() != item[1]:
+                        corrupt.append(item)
+                result['corrupt'], result['corrupt_bytes'] = self._delete_objects(corrupt, last_used)
+                objects = [item for item in objects if item[1] in last_used]
+            
+            unreferenced = []
+            for item in objects:
+                try:
+                    links = item[2].stat().st_nlink
+                except FileNotFoundError:
+                    continue
+                if links <= 1 and now - item[0] > max_age:
+                    unreferenced.append(item)
+            result['unreferenced'], result['unreferenced_bytes'] = self._delete_objects(unreferenced, last_used)
+            objects = [item for item in objects if item[1] in last_used]
+            
+            evicted = []
+            if max_size is not None:
+                excess = sum(item[3] for item in objects) - max_size
+                for item in objects:
+                    if excess <= 0:
+                        break
+                    evicted.append(item)
+                    excess -= item[3]
+            result['evicted'], result['evicted_bytes'] = self._delete_objects(evicted, last_used)
+            
+            stale = 0
+            for directory in (self.objects_dir.glob('*') if self.objects_dir.is_dir() else ()):
+                for tmp_path in directory.glob('*.tmp'):
+                    try:
+                        if now - tmp_path.stat().st_mtime > STORE_STALE_TMP_SECONDS:
+                            tmp_path.unlink()
+                            stale += 1
+                    except OSError:
+                        pass
+            result['stale_tmp'] = stale
+            
+            self._write_access_log(last_used)
+            remaining = [item for item in objects if item[1] in last_used]
+            result['objects'] = len(remaining)
+            result['bytes'] = sum(item[3] for item in remaining)
+        return result
+    
+    def summary(self) -> Dict[str, int]:
+        """
+        Počet a velikost objektů, z toho objekty bez hardlinku ve stromech.
+        """
+        objects = bytes_total = unreferenced = 0
+        for _, _, stat in self.iter_objects():
+            objects += 1
+            bytes_total += stat.st_size
+            if stat.st_nlink <= 1:
+                unreferenced += 1
+        return {'objects': objects, 'bytes': bytes_total, 'unreferenced': unreferenced}
+    
+    def describe_run(self) -> str:
+        methods = ', '.join(f"{method} {count}" for method, count in sorted(self.placed.items()))
+        return (f"{self.reused} z {sum(self.placed.values())} souborů z úložiště, "
+                f"{self.added} nových objektů ({methods})")
+
 
 class FileExtractor:
-    def __init__(self, base_dir: str = ".", force_overwrite: bool = False, debug: bool = False):
+    def __init__(self, base_dir: str = ".", force_overwrite: bool = False, debug: bool = False,
+                 jobs: int = 1, incremental: bool = False, prune: bool = False,
+                 stats: ExtractionStats | None = None, sink: ReportSink | None = None,
+                 reindex: bool = False, archive: ArchiveWriter | None = None,
+                 index_cache: Dict[str, SolutionIndex] | None = None,
+                 file_filter: FileFilter | None = None, store: ContentStore | None = None):
         self.base_dir = Path(base_dir)
         self.force_overwrite = force_overwrite
         self.debug = debug
+        self.jobs = jobs
+        self.incremental = incremental
+        self.prune = prune
+        self.stats = stats
+        self.sink = sink if sink is not None else ReportSink()
+        self.reindex = reindex
+        # Výstup do --output-archive místo do base_dir (base_dir slouží jen k routování)
+        self.archive = archive
+        # Teplé indexy solution sdílené mezi extrakcemi (serve), klíčem je absolutní base_dir
+        self.index_cache = index_cache
+        # --only/--exclude/--namespace - vyřazené bloky se nesbírají ani nečistí
+        self.file_filter = file_filter if file_filter is not None else FileFilter()
+        # --store - soubory se připojují z úložiště obsahu místo zápisu
+        self.store = store
+        self._solution_index: SolutionIndex | None = None
+        # Klasifikace auto segmentů podle textu (--watch), jinak None
+        self.segment_cache: Dict[str, Tuple[str, str] | None] | None = None
+        self._previous_segment_cache: Dict[str, Tuple[str, str] | None] = {}
         self.extracted_files: List[str] = []
         self.skipped_files: List[str] = []
+        self.unchanged_files: List[str] = []
+        self.removed_files: List[str] = []
+        self.manifest: Dict[str, Dict] = {}
+        self.index = ProvenanceIndex()
+        
+    def report(self, text: str = ''):
+        self.sink.message(text)
+    
+    @property
+    def destination(self) -> str:
+        if self.archive is not None:
+            return f"archiv {self.archive.label}"
+        return str(self.base_dir.absolute())
+    
+    def parse_artifact_content(self, content: str) -> Dict[str, str]:
+        """
+        Parsuje obsah artefaktu a extrahuje jednotlivé soubory.
+        
+        Returns:
+            Dict[file_path, file_content]
+        """
+        return self.build_index(iter_lines(content)).contents()
+    
+    def build_index(self, lines: Iterable[str]) -> ProvenanceIndex:
+        """
+        Naparsuje artefakt a sloučí bloky do indexu s provenance každého souboru.
+        """
+        return ProvenanceIndex(self.iter_file_blocks(lines))
+    
+    def detect_csharp_files(self, content: str) -> Dict[str, str]:
+        """
+        Detekuje C# soubory podle using a namespace statements.
+        """
+        return {
+            block.path: block.content
+            for block in self.iter_file_blocks(iter_lines(content))
+            if block.source == 'auto'
+        }
+    
+    def iter_file_blocks(self, lines: Iterable[str], first_line: int = 1, first_offset: int = 0,
+                         measure: Callable[[str], int] = len) -> Iterator[FileBlock]:
+        """
+        Jednoprůchodový streaming parser artefaktu.
+        
+        Čte artefakt po řádcích a průběžně vrací hotové bloky - explicitní
+        (// File:), project/XAML i auto-detekované C# soubory. V paměti drží
+        vždy jen právě rozpracovaný blok.
+        
+        Řádky mohou obsahovat konce řádků. first_line/first_offset posouvají
+        číslování provenance, measure určuje délku řádku v jednotkách offsetu
+        (znaky, u --mmap bajty).
+        
+        Složitost je lineární v délce vstupu i v nejhorším případě - každý
+        řádek se projde jednou a každý blok či segment se jednou spojí,
+        naskenuje a vyčistí. Neuzavřené /*, obří řádky ani tisíce using bez
+        typu nevedou k opakovanému skenování (benchmarks/pathological.py).
+        
+        Yields:
+            FileBlock pro každý nalezený soubor v pořadí výskytu
+        """
+        current_file = None
+        file_lines: List[str] = []
+        file_start = (0, 0)
+        wrapper_start = None
+        wrapper_end = None
+        file_selected = True
+        
+        segment: List[str] = []
+        segment_start = (0, 0)
+        segment_has_body = False
+        segment_index = 0
+        
+        line_number = first_line - 1
+        offset = first_offset
+        header_matches = 0
+        boundary_matches = 0
+        
+        if self.debug:
+            self.report("🔍 DEBUG: Spouštím auto-detekci C# souborů...")
+        
+        for raw_line in lines:
+            line_number += 1
+            line_offset = offset
+            offset += measure(raw_line)
+            
+            line = raw_line.rstrip('\r\n') if raw_line.endswith('\n') else raw_line
+            stripped = line.strip()
+            
+            # Detekce začátku souboru: // File: path/to/file.ext
+            if stripped.startswith('// File:'):
+                header_matches += 1
+                file_match = FILE_HEADER_PATTERN.match(stripped)
+                if not file_match:
+                    continue
+                
+                if current_file:
+                    block = self._finish_file_block(current_file, file_lines, wrapper_start, wrapper_end,
+                                                    file_start, (line_number - 1, line_offset))
+                    if block:
+                        yield block
+                if segment:
+                    segment_index += 1
+                    block = self._finish_csharp_segment(segment, segment_index,
+                                                        segment_start, (line_number - 1, line_offset))
+                    if block:
+                        yield block
+                    segment = []
+                    segment_has_body = False
+                
+                # Začít nový soubor
+                current_file = file_match.group(1)
+                file_lines = []
+                file_start = (line_number, line_offset)
+                wrapper_start = None
+                wrapper_end = None
+                # Blok mimo výběr se jen dočte - řádky se nesbírají, takže se
+                # ani nespojí a _finish_file_block ho zahodí jako prázdný
+                file_selected = self.file_filter.accepts_path(current_file)
+                if not file_selected:
+                    self._filtered_out(current_file)
+                continue
+            
+            # Detekce konce file bloku
+            if stripped.startswith('// ==='):
+                if current_file:
+                    block = self._finish_file_block(current_file, file_lines, wrapper_start, wrapper_end,
+                                                    file_start, (line_number - 1, line_offset))
+                    if block:
+                        yield block
+                    current_file = None
+                    file_lines = []
+                elif segment:
+                    segment_index += 1
+                    block = self._finish_csharp_segment(segment, segment_index,
+                                                        segment_start, (line_number - 1, line_offset))
+                    if block:
+                        yield block
+                    segment = []
+                    segment_has_body = False
+                continue
+            
+            if current_file:
+                # Detekce komentáře s obsahem souboru: /*...*/
+                if stripped.startswith('/*'):
+                    if wrapper_start is None:
+                        wrapper_start = len(file_lines)
+                    continue
+                if stripped.endswith('*/'):
+                    if wrapper_start is not None and wrapper_end is None:
+                        wrapper_end = len(file_lines)
+                    continue
+                
+                if file_selected:
+                    file_lines.append(line)
+                continue
+            
+            # Holý /* */ obal (bez // File: hlavičky) na začátku řádku
+            # uzavírá blok stejně jako oddělovač
+            if line.rstrip() in ('/*', '*/'):
+                if segment:
+                    segment_index += 1
+                    block = self._finish_csharp_segment(segment, segment_index,
+                                                        segment_start, (line_number - 1, line_offset))
+                    if block:
+                        yield block
+                    segment = []
+                    segment_has_body = False
+                continue
+            
+            # Mimo explicitní bloky - auto-detekce C# podle using/namespace.
+            # Úvodní using direktivy zůstávají u svého namespace/typu.
+            if segment_has_body:
+                boundary_matches += 1
+            if segment_has_body and CSHARP_BOUNDARY_PATTERN.match(line):
+                segment_index += 1
+                block = self._finish_csharp_segment(segment, segment_index,
+                                                    segment_start, (line_number - 1, line_offset))
+                if block:
+                    yield block
+                segment = []
+                segment_has_body = False
+            
+            if not segment:
+                segment_start = (line_number, line_offset)
+            segment.append(line)
+            if (stripped and not segment_has_body
+                    and not stripped.startswith(('using ', '//', '/*', '*'))):
+                segment_has_body = True
+        
+        # Uložit poslední soubor
+        if current_file:
+            block = self._finish_file_block(current_file, file_lines, wrapper_start, wrapper_end,
+                                            file_start, (line_number, offset))
+            if block:
+                yield block
+        if segment:
+            segment_index += 1
+            block = self._finish_csharp_segment(segment, segment_index,
+                                                segment_start, (line_number, offset))
+            if block:
+                yield block
+        
+        if self.stats is not None:
+            self.stats.count('regex.file_header', header_matches)
+            self.stats.count('regex.csharp_boundary', boundary_matches)
+            self.stats.count('segments.scanned', segment_index)
+        
+        if self.debug:
+            self.report(f"🎯 DEBUG: Celkem prohledáno {segment_index} potenciálních C# bloků")
+    
+    def iter_indexed_blocks(self, index: ArtifactIndex) -> Iterator[FileBlock]:
+        """
+        Vrací bloky z memory-mapped artefaktu podle jeho indexu.
+        
+        Explicitní bloky se nedekódují - jejich obsah se načte až při zápisu.
+        Text mimo explicitní bloky se prochází auto-detekcí po řádcích.
+        Offsety v provenance jsou bajtové.
+        """
+        for entry in index.entries:
+            if entry.kind == 'gap':
+                yield from self.iter_file_blocks(index.iter_lines(entry.start, entry.end),
+                                                 first_line=entry.start_line, first_offset=entry.start,
+                                                 measure=utf8_length)
+                continue
+            
+            if not self.file_filter.accepts_path(entry.path):
+                self._filtered_out(entry.path)
+                continue
+            
+            if entry.path.endswith(PROJECT_FILE_SUFFIXES) and entry.wrapper_end is not None:
+                source = 'project'
+            else:
+                source = 'explicit'
+            provenance = BlockProvenance(source, entry.start_line, entry.end_line, entry.start, entry.end)
+            
+            if self.file_filter.namespaces:
+                # Namespace je vidět až v obsahu - blok se dekóduje hned, vyřazený vrátí ''
+                content = self.read_indexed_block(index, entry)
+                if content:
+                    yield FileBlock(entry.path, content, provenance)
+                continue
+            yield FileBlock(entry.path, None, provenance,
+                            loader=lambda entry=entry: self.read_indexed_block(index, entry))
+    
+    def read_indexed_block(self, index: ArtifactIndex, entry: IndexEntry) -> str:
+        """
+        Dekóduje obsah jednoho explicitního bloku z indexu.
+        """
+        for block in self.iter_file_blocks(index.iter_lines(entry.start, entry.end)):
+            if block.source != 'auto':
+                return block.content
+        return ''
+    
+    def _finish_file_block(self, file_path: str, lines: List[str],
+                           wrapper_start: int | None, wrapper_end: int | None,
+                           start: Tuple[int, int], end: Tuple[int, int]) -> FileBlock | None:
+        """
+        Uzavře explicitní // File: blok.
+        
+        Project a XAML soubory berou jen obsah uvnitř /* */ obalu.
+        start a end jsou dvojice (řádek, offset) pro provenance.
+        """
+        if file_path.endswith(PROJECT_FILE_SUFFIXES) and wrapper_end is not None:
+            content = '\n'.join(lines[wrapper_start:wrapper_end]).strip()
+            source = 'project'
+        else:
+            content = '\n'.join(lines).strip()
+            source = 'explicit'
+        
+        if not content:
+            return None
+        
+        if self.file_filter.namespaces:
+            declaration = scan_csharp_declaration(content)
+            if not self.file_filter.accepts_namespace(declaration.namespace if declaration else None):
+                self._filtered_out(file_path)
+                return None
+        return FileBlock(file_path, content, BlockProvenance(source, start[0], end[0], start[1], end[1]))
+    
+    def _filtered_out(self, file_path: str):
+        if self.stats is not None:
+            self.stats.count('blocks.filtered')
+        if self.debug:
+            self.report(f"⏭️  DEBUG: {file_path} vyřazen filtrem")
+    
+    @timed_phase('csharp_detect')
+    def _finish_csharp_segment(self, lines: List[str], index: int,
+                               start: Tuple[int, int], end: Tuple[int, int]) -> FileBlock | None:
+        """
+        Uzavře blok mimo explicitní soubory a zkusí v něm najít C# soubor.
+        
+        Se zapnutou segment_cache (--watch) se stejný text klasifikuje jen jednou.
+        """
+        block = '\n'.join(lines).strip()
+        if not block:
+            return None
+        
+        if self.segment_cache is None:
+            file_info = self._classify_segment(block, index)
+        elif block in self.segment_cache:
+            file_info = self.segment_cache[block]
+        else:
+            if block in self._previous_segment_cache:
+                file_info = self._previous_segment_cache[block]
+            else:
+                file_info = self._classify_segment(block, index)
+            self.segment_cache[block] = file_info
+        
+        if not file_info:
+            return None
+        file_path, clean_content = file_info
+        return FileBlock(file_path, clean_content, BlockProvenance('auto', start[0], end[0], start[1], end[1]),
+                         cleaned=True)
+    
+    def _classify_segment(self, block: str, index: int) -> Tuple[str, str] | None:
+        """
+        Rozhodne, jestli je blok C# soubor, a určí jeho cestu a vyčištěný obsah.
+        """
+        if self.debug:
+            first_lines = '\n'.join(block.split('\n', 3)[:3])
+            self.report(f"🔍 DEBUG: Blok {index}:\n{first_lines}...")
+        
+        # Detekce C# kódu (musí začínat using nebo namespace a nesmí být zakomentovaný)
+        if self.stats is not None:
+            self.stats.count('regex.csharp_code_start')
+        if not self.is_csharp_code_block(block):
+            if self.debug:
+                self.report(f"⏭️  DEBUG: Blok {index} přeskočen (není C# kód)")
+            return None
+        
+        if self.debug:
+            self.report(f"✅ DEBUG: Blok {index} identifikován jako C# kód")
         
-    def parse_artifact_content(self, content: str) -> Dict[str, str]:
+        file_info = self.extract_csharp_file_info(block)
+        if not file_info:
+            if self.debug:
+                self.report(f"❌ DEBUG: Nepodařilo se extrahovat info ze souboru")
+            return None
+        
+        if self.debug:
+            self.report(f"📁 DEBUG: Detekován soubor: {file_info[0]}")
+        return file_info
+    
+    def is_csharp_code_block(self, block: str) -> bool:
+        """
+        Zkontroluje, jestli blok obsahuje C# kód.
+        """
+        return starts_with_csharp_code(block)
+    
+    def extract_csharp_file_info(self, block: str) -> Tuple[str, str] | None:
+        """
+        Extrahuje informace o C# souboru z bloku kódu.
+        
+        Typ vyřazený filtrem se nevyčistí a vrací se None - namespace se
+        ověří už před routováním, cesta hned po něm.
+        
+        Returns:
+            (file_path, clean_content) or None
+        """
+        # Analýza kódu pro určení názvu souboru
+        if self.stats is not None:
+            self.stats.count('regex.csharp_scan')
+        declaration = scan_csharp_declaration(block)
+        if not declaration:
+            return None
+        
+        if not self.file_filter.accepts_namespace(declaration.namespace):
+            self._filtered_out(f"{declaration.namespace or '(bez namespace)'}.{declaration.name}")
+            return None
+        
+        file_path = self.route_csharp_type(declaration.namespace, declaration.name)
+        if not self.file_filter.accepts_path(file_path):
+            self._filtered_out(file_path)
+            return None
+        
+        # Vyčisti obsah
+        clean_content = self.clean_csharp_content(block)
+        
+        return (file_path, clean_content)
+    
+    @property
+    def solution_index(self) -> SolutionIndex:
+        """
+        Index solution pod base_dir, načtený až při první auto-detekci.
+        """
+        if self._solution_index is None:
+            with stats_phase(self.stats, 'solution_index'):
+                self._solution_index = self._load_solution_index()
+            if self.debug:
+                self.report(f"🗂️  DEBUG: Index solution - {len(self._solution_index.projects)} projektů, "
+                            f"{len(self._solution_index.types)} typů")
+        return self._solution_index
+    
+    def refresh_solution_index(self) -> bool:
+        """
+        Dorovná už načtený index solution se stromem (--watch) - projdou se
+        jen adresáře se změněným mtime, takže se najde i nově přidaný projekt.
+        
+        Returns:
+            True, pokud se změnily projekty nebo mapa typů (a tím routování)
+        """
+        index = self._solution_index
+        if index is None:
+            return False
+        with stats_phase(self.stats, 'solution_index'):
+            if not index.refresh():
+                return False
+            if self.archive is None:
+                index.save()
+            routing = (index.projects, index.types, index.type_names)
+            index.build_lookups()
+        return routing != (index.projects, index.types, index.type_names)
+    
+    def _load_solution_index(self) -> SolutionIndex:
+        # S --output-archive se do base_dir nezapisuje nic, ani cache indexu
+        persist = self.archive is None
+        if self.index_cache is None:
+            return SolutionIndex.load(self.base_dir, rebuild=self.reindex, persist=persist)
+        
+        # Teplý index stačí dorovnat - projdou se jen adresáře se změněným mtime
+        key = str(self.base_dir.absolute())
+        index = self.index_cache.get(key)
+        if index is None or self.reindex:
+            index = SolutionIndex.load(self.base_dir, rebuild=self.reindex, persist=persist)
+        elif index.refresh():
+            if persist:
+                index.save()
+            index.build_lookups()
+        self.index_cache[key] = index
+        return index
+    
+    def route_csharp_type(self, namespace: str | None, type_name: str) -> str:
+        """
+        Cesta auto-detekovaného typu.
+        
+        Přednost má soubor, ve kterém typ v solution už je, pak projekt
+        s nejdelším odpovídajícím root namespace. Typ mimo známé projekty
+        jde podle konvence Firma.Projekt do src/Firma.Projekt/<zbytek namespace>,
+        projekt se přejmenuje podle PROJECT_NAMESPACE_ALIASES.
+        """
+        resolved = self.solution_index.resolve(namespace, type_name)
+        if resolved:
+            return resolved
+        
+        namespace_parts = namespace.split('.') if namespace else []
+        if len(namespace_parts) < 2:
+            return f"src/{type_name}.cs"
+        project = '.'.join(namespace_parts[:2])
+        project = PROJECT_NAMESPACE_ALIASES.get(project, project)
+        return '/'.join(['src', project] + namespace_parts[2:] + [f"{type_name}.cs"])
+    
+    @timed_phase('clean')
+    def clean_csharp_content(self, content: str) -> str:
+        """
+        Vyčistí auto-detekovaný C# blok do podoby, ve které se zapíše.
+        
+        Jeden průchod řádky: zahodí hlavičky artefaktu (// ===, // KROK,
+        // File:), komentářové bloky od řádku začínajícího /* po řádek
+        končící */ a osamocené */ řádky, nakonec okrajové bílé znaky.
+        Výsledek se při zápisu už znovu nečistí (final_content).
+        """
+        if not self._needs_cleaning(content):
+            return content
+        
+        cleaned_lines = []
+        skip_comment_block = False
+        
+        for line in content.split('\n'):
+            stripped = line.strip()
+            
+            # Přeskoč artifact header komentáře
+            if stripped.startswith(('// ===', '// KROK', '// File:')):
+                continue
+            
+            # Přeskoč comment bloky /*...*/
+            if stripped.startswith('/*'):
+                skip_comment_block = True
+                continue
+            if stripped.endswith('*/'):
+                skip_comment_block = False
+                continue
+            if skip_comment_block or stripped.startswith('*/'):
+                continue
+            
+            cleaned_lines.append(line)
+        
+        return '\n'.join(cleaned_lines).strip()
+    
+    def extract_project_files(self, content: str) -> Dict[str, str]:
+        """
+        Alternativní parser pro project soubory (.csproj, .xaml).
+        """
+        return {
+            block.path: block.content
+            for block in self.iter_file_blocks(iter_lines(content))
+            if block.source == 'project'
+        }
+    
+    @staticmethod
+    def _needs_cleaning(content: str) -> bool:
+        return bool(content[:1].isspace() or content[-1:].isspace() or CLEAN_MARKER_PATTERN.search(content))
+    
+    @timed_phase('clean')
+    def clean_file_content(self, content: str, file_path: str) -> str:
+        """
+        Vyčistí surový obsah souboru od artefact komentářů.
+        
+        Čištění se volí podle typu souboru a proběhne jedním průchodem
+        řádky. Obsah bez značek artefaktu se vrací beze změny (stejný objekt).
+        """
+        if not self._needs_cleaning(content):
+            return content
+        if file_path.endswith('.cs'):
+            return self._clean_csharp_file(content)
+        # .csproj/.props/.targets, .xaml i ostatní soubory - jen značky a okraje
+        return '\n'.join(line for line in content.split('\n')
+                         if not line.strip().startswith(ARTIFACT_LINE_PREFIXES)).strip()
+    
+    def _clean_csharp_file(self, content: str) -> str:
+        """
+        Explicitní C# soubor jedním průchodem - zahodí značky artefaktu,
+        // KROK a řádky končící */, ořeže okraje.
+        
+        Okrajové mezery se berou z prvního a posledního textového řádku
+        ještě před zahozením // KROK a */ řádků, i když pak sám vypadne.
+        """
+        cleaned_lines = []
+        seen_text = False
+        last_text_dropped = False
+        
+        for line in content.split('\n'):
+            stripped = line.strip()
+            if stripped.startswith(ARTIFACT_LINE_PREFIXES):
+                continue
+            
+            if not seen_text:
+                if not stripped:
+                    continue
+                seen_text = True
+                line = line.lstrip()
+            
+            if stripped.startswith('// KROK') or stripped.endswith('*/'):
+                last_text_dropped = True
+                continue
+            if not cleaned_lines and not stripped:
+                continue
+            
+            cleaned_lines.append(line)
+            if stripped:
+                last_text_dropped = False
+        
+        while cleaned_lines and not cleaned_lines[-1].strip():
+            cleaned_lines.pop()
+        if cleaned_lines and not last_text_dropped:
+            cleaned_lines[-1] = cleaned_lines[-1].rstrip()
+        return '\n'.join(cleaned_lines)
+    
+    def final_content(self, content: str | FileBlock, file_path: str) -> str:
+        """
+        Obsah tak, jak se zapíše. Auto-detekované bloky jsou vyčištěné
+        už z detekce, čistí se jen surový obsah - každý blok právě jednou.
+        """
+        if isinstance(content, FileBlock):
+            if content.cleaned:
+                return content.content
+            content = content.content
+        return self.clean_file_content(content, file_path)
+    
+    def clean_block(self, block: FileBlock) -> FileBlock:
+        """
+        Blok s obsahem vyčištěným do podoby pro zápis (čistí --parse-jobs workery).
+        """
+        if block.cleaned:
+            return block
+        return FileBlock(block.path, self.final_content(block, block.path), block.provenance, cleaned=True)
+    
+    def create_file(self, file_path: str, content: str | FileBlock) -> bool:
+        """
+        Vytvoří soubor na daném místě.
+        
+        Obsah FileBlock se načte až po kontrole existence souboru.
+        
+        Returns:
+            True pokud byl soubor vytvořen, False pokud byl přeskočen
+        """
+        return self._record_result(file_path, *self._materialize(file_path, content), content=content).written
+    
+    def _materialize(self, file_path: str, content: str | FileBlock, make_dirs: bool = True,
+                     overwrite: bool = False) -> Tuple[str, str, Dict | None]:
+        """
+        Zapíše jeden soubor bez výpisu a bez úprav sdíleného stavu,
+        takže může běžet i ve worker vlákně. overwrite přepíše existující
+        soubor i bez --force (soubor zapsaný dříve v tomtéž běhu).
+        
+        Returns:
+            (status, message, manifest_entry) kde status je 'created',
+            'updated', 'unchanged', 'skipped' nebo 'failed'
+        """
+        if self.stats is None:
+            return self._write_file(file_path, content, make_dirs, overwrite)
+        
+        started = time.perf_counter()
+        with self.stats.phase('write'):
+            result = self._write_file(file_path, content, make_dirs, overwrite)
+        
+        size = 0
+        if result[0] in ('created', 'updated'):
+            if self.archive is not None:
+                size = self.archive.written.get(file_path, 0)
+            else:
+                try:
+                    size = (self.base_dir / file_path).stat().st_size
+                except OSError:
+                    pass
+        self.stats.record_write(file_path, time.perf_counter() - started, size)
+        return result
+    
+    def _write_file(self, file_path: str, content: str | FileBlock,
+                    make_dirs: bool, overwrite: bool) -> Tuple[str, str, Dict | None]:
+        if self.archive is not None:
+            return self._write_archive_entry(file_path, content, overwrite)
+        
+        full_path = self.base_dir / file_path
+        
+        # Vytvoř adresáře
+        if make_dirs:
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        if self.incremental:
+            return self._materialize_incremental(file_path, full_path, content, overwrite)
+        
+        # Zkontroluj, jestli soubor existuje
+        exists = full_path.exists()
+        if exists and not (self.force_overwrite or overwrite):
+            return 'skipped', f"⚠️  Soubor již existuje: {file_path} (použij --force pro přepsání)", None
+        
+        # Zapis soubor
+        try:
+            clean_content = self.final_content(content, file_path)
+            
+            if self.store is not None:
+                self.store.place(clean_content.encode('utf-8'), full_path)
+            else:
+                if exists:
+                    self._unshare(full_path)
+                with open(full_path, 'w', encoding='utf-8', newline='\n') as f:
+                    f.write(clean_content)
+            
+            if exists:
+                return 'updated', f"🔄 Aktualizován: {file_path}", None
+            return 'created', f"✅ Vytvořen: {file_path}", None
+            
+        except Exception as e:
+            return 'failed', f"❌ Chyba při vytváření {file_path}: {e}", None
+    
+    def _write_archive_entry(self, file_path: str, content: str | FileBlock,
+                             overwrite: bool) -> Tuple[str, str, Dict | None]:
+        """
+        Přidá soubor do --output-archive. Existující je soubor, který už je
+        v archivu nebo v základním archivu (--base-archive).
+        """
+        exists = self.archive.exists(file_path)
+        if exists and not (self.force_overwrite or overwrite):
+            return 'skipped', f"⚠️  Soubor již je v archivu: {file_path} (použij --force pro přepsání)", None
+        
+        try:
+            self.archive.add(file_path, self.final_content(content, file_path).encode('utf-8'))
+            if exists:
+                return 'updated', f"🔄 Aktualizován: {file_path}", None
+            return 'created', f"✅ Vytvořen: {file_path}", None
+            
+        except Exception as e:
+            return 'failed', f"❌ Chyba při vytváření {file_path}: {e}", None
+    
+    def _materialize_incremental(self, file_path: str, full_path: Path, content: str | FileBlock,
+                                 overwrite: bool = False) -> Tuple[str, str, Dict | None]:
+        """
+        Zapíše soubor jen pokud se jeho vyčištěný obsah liší od toho na disku.
+        
+        Shoda velikosti a mtime se záznamem v manifestu znamená, že soubor
+        od minulé extrakce nikdo neměnil a stačí porovnat hash z manifestu.
+        Jinak se porovná s hashem skutečného obsahu na disku. Soubor upravený
+        od minulé extrakce (hash se liší od manifestu) nebo cizí soubor mimo
+        manifest se stejně jako při mazání (--prune) nepřepíše bez --force.
+        """
+        try:
+            data = self.final_content(content, file_path).encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+            
+            previous = self.manifest.get(file_path)
+            try:
+                stat = full_path.stat()
+            except FileNotFoundError:
+                stat = None
+            
+            if stat is not None:
+                if (previous and previous['size'] == stat.st_size
+                        and previous['mtime_ns'] == stat.st_mtime_ns):
+                    disk_digest = previous['sha256']
+                else:
+                    disk_digest = hashlib.sha256(full_path.read_bytes()).hexdigest()
+                
+                if disk_digest == digest:
+                    entry = {'sha256': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+                    return 'unchanged', '', entry
+                
+                if not (self.force_overwrite or overwrite):
+                    if previous is None:
+                        return 'skipped', (f"⚠️  Soubor již existuje: {file_path} "
+                                           f"(použij --force pro přepsání)"), None
+                    if disk_digest != previous['sha256']:
+                        return 'skipped', (f"⚠️  Soubor byl upraven od minulé extrakce: {file_path} "
+                                           f"(použij --force pro přepsání)"), None
+            
+            existed = stat is not None
+            if self.store is not None:
+                self.store.place(data, full_path, digest)
+            else:
+                if existed and self._is_shared(stat):
+                    full_path.unlink()
+                with open(full_path, 'wb') as f:
+                    f.write(data)
+            
+            stat = full_path.stat()
+            entry = {'sha256': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+            if existed:
+                return 'updated', f"🔄 Aktualizován: {file_path}", entry
+            return 'created', f"✅ Vytvořen: {file_path}", entry
+            
+        except Exception as e:
+            return 'failed', f"❌ Chyba při vytváření {file_path}: {e}", None
+    
+    @staticmethod
+    def _is_shared(stat: os.stat_result) -> bool:
+        """
+        Soubor připojený z --store hardlinkem - má víc odkazů, nebo je jen
+        pro čtení (STORE_OBJECT_MODE zůstane i po vyřazení či smazání objektu).
+        """
+        return stat.st_nlink > 1 or not stat.st_mode & S_IWUSR
+    
+    @classmethod
+    def _unshare(cls, full_path: Path):
+        """
+        Sdílený soubor (_is_shared) se před přepsáním odpojí, aby zápis na
+        místě nezměnil ostatní odkazy ani objekt v úložišti a neselhal na
+        souboru jen pro čtení.
+        """
+        try:
+            if cls._is_shared(full_path.stat()):
+                full_path.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def _record_result(self, file_path: str, status: str, message: str,
+                       manifest_entry: Dict | None = None,
+                       content: str | FileBlock = '') -> ExtractedFile:
+        if message:
+            self.report(message)
+        if manifest_entry is not None:
+            self.manifest[file_path] = manifest_entry
+        if status in WRITTEN_STATUSES:
+            self.extracted_files.append(file_path)
+        elif status == 'skipped':
+            self.skipped_files.append(file_path)
+        elif status == 'unchanged':
+            self.unchanged_files.append(file_path)
+        
+        record = self._make_record(file_path, status, content)
+        self.sink.file_result(record)
+        return record
+    
+    def _make_record(self, file_path: str, status: str, content: str | FileBlock) -> ExtractedFile:
+        return ExtractedFile(file_path, status, content, self.final_content)
+    
+    @property
+    def manifest_path(self) -> Path:
+        return self.base_dir / MANIFEST_FILE_NAME
+    
+    @timed_phase('manifest')
+    def load_manifest(self):
+        """
+        Načte manifest hashů z předchozí extrakce (chybějící nebo vadný = prázdný).
+        """
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.manifest = data.get('files', {})
+            else:
+                self.manifest = {}
+        except (OSError, ValueError, AttributeError):
+            self.manifest = {}
+    
+    @timed_phase('manifest')
+    def save_manifest(self):
+        """
+        Atomicky uloží manifest hashů do --base-dir.
+        """
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_name(MANIFEST_FILE_NAME + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': self.manifest},
+                      f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+    
+    @timed_phase('manifest')
+    def prune_removed_files(self, current_paths: Iterable[str]):
+        """
+        Smaže soubory z manifestu, které už v artefaktu nejsou.
+        
+        Soubory upravené od minulé extrakce (jiný hash) se nemažou, s filtrem
+        se zvažují jen soubory, které --only/--exclude vybírá.
+        """
+        current_paths = set(current_paths)
+        removed = (file_path for file_path in set(self.manifest) - current_paths
+                   if self.file_filter.accepts_path(file_path))
+        
+        for file_path in sorted(removed):
+            entry = self.manifest.pop(file_path)
+            full_path = self.base_dir / file_path
+            
+            try:
+                data = full_path.read_bytes()
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                self.report(f"❌ Chyba při mazání {file_path}: {e}")
+                continue
+            
+            if hashlib.sha256(data).hexdigest() != entry['sha256']:
+                self.report(f"⚠️  Soubor byl upraven, nemažu: {file_path}")
+                continue
+            
+            full_path.unlink()
+            self.removed_files.append(file_path)
+            self.report(f"🗑️  Odstraněn: {file_path}")
+            
+            # Ukliď prázdné adresáře až k --base-dir
+            parent = full_path.parent
+            while parent != self.base_dir and self.base_dir in parent.parents:
+                try:
+                    parent.rmdir()
+                except OSError:
+                    break
+                parent = parent.parent
+    
+    def write_files(self, files: Dict[str, str | FileBlock]) -> List[ExtractedFile]:
+        """
+        Zapíše všechny soubory - sériově, nebo s jobs > 1 v omezeném poolu vláken.
+        """
+        return list(self.iter_write_files(files))
+    
+    def iter_write_files(self, files: Dict[str, str | FileBlock]) -> Iterator[ExtractedFile]:
+        """
+        Zapisuje soubory a průběžně vrací jejich výsledky.
+        
+        Výpis, pořadí výsledků i extracted_files/skipped_files odpovídá pořadí
+        souborů bez ohledu na to, v jakém pořadí zápisy doběhnou. Do archivu
+        se zapisuje vždy sériově. Když volající přestane odebírat dřív,
+        nezačaté zápisy se zruší a doběhlé se aspoň zapíšou do manifestu.
+        """
+        if self.jobs <= 1 or len(files) <= 1 or self.archive is not None:
+            for file_path, content in files.items():
+                yield self._record_result(file_path, *self._materialize(file_path, content), content=content)
+            return
+        
+        # Každý adresář vytvoř jen jednou, ještě před spuštěním workerů
+        directories = {(self.base_dir / file_path).parent for file_path in files}
+        with stats_phase(self.stats, 'write'):
+            for directory in sorted(directories):
+                try:
+                    directory.mkdir(parents=True, exist_ok=True)
+                except OSError as e:
+                    self.report(f"❌ Chyba při vytváření adresáře {directory}: {e}")
+        
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            futures = [executor.submit(self._materialize, file_path, content, False)
+                       for file_path, content in files.items()]
+            recorded = 0
+            try:
+                for file_path, future in zip(files, futures):
+                    recorded += 1
+                    yield self._record_result(file_path, *future.result(), content=files[file_path])
+            finally:
+                if recorded < len(futures):
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    for file_path, future in zip(list(files)[recorded:], futures[recorded:]):
+                        if future.cancelled() or future.exception() is not None:
+                            continue
+                        manifest_entry = future.result()[2]
+                        if manifest_entry is not None:
+                            self.manifest[file_path] = manifest_entry
+    
+    def extract_all_files(self, artifact_content: str | Iterable[str]) -> List[ExtractedFile]:
+        """
+        Extrahuje všechny soubory z artefaktu.
+        
+        artifact_content může být celý text artefaktu nebo iterátor řádků
+        (např. otevřený soubor nebo stdin), který se čte streamovaně.
+        """
+        return self.extract_blocks(self.iter_file_blocks(self._input_lines(artifact_content)))
+    
+    def iter_extract(self, artifact_content: str | Iterable[str],
+                     write: bool = True) -> Iterator[ExtractedFile]:
+        """
+        Knihovní API - líně extrahuje soubory a vrací záznam o každém z nich.
+        
+        Artefakt se naparsuje při prvním next(), soubory se pak zapisují
+        po jednom, jak je volající odebírá. S write=False se nic nezapisuje
+        a záznamy mají status 'pending'. Hlášení jdou do self.sink.
+        
+        Použití:
+            extractor = FileExtractor(base_dir='out', force_overwrite=True)
+            for record in extractor.iter_extract(artifact_text):
+                if record.status == 'failed':
+                    ...
+        """
+        self.merge_blocks(self.iter_file_blocks(self._input_lines(artifact_content)))
+        
+        if not write:
+            for file_path, block in self.index.files.items():
+                yield self._make_record(file_path, 'pending', block)
+            return
+        
+        if self.incremental:
+            self.load_manifest()
+        # Dokončí se i při předčasném close() nebo výjimce u volajícího
+        finished = False
+        try:
+            yield from self.iter_write_files(self.index.files)
+            finished = True
+        finally:
+            if finished:
+                self.finish_extraction()
+            else:
+                self.abort_extraction()
+    
+    def _input_lines(self, artifact_content: str | Iterable[str]) -> Iterable[str]:
+        if isinstance(artifact_content, str):
+            artifact_content = iter_lines(artifact_content)
+        if self.stats is not None:
+            artifact_content = self.stats.counted_lines(artifact_content)
+        return artifact_content
+    
+    def extract_stream(self, lines: Iterable[str]):
+        """
+        Pipelined extrakce - explicitní a project bloky se zapisují hned,
+        jak je parser uzavře, auto-detekované až po konci vstupu (explicitní
+        blok se stejnou cestou může přijít až za nimi).
+        
+        Výpis výsledků zápisu zachovává pořadí bloků i s jobs > 1.
+        """
+        self.report(f"🚀 Extrahuji soubory do: {self.destination} (pipeline)")
+        if self.file_filter:
+            self.report(f"🎯 Filtr: {self.file_filter.describe()}")
+        self.report("=" * 60)
+        
+        if self.incremental:
+            self.load_manifest()
+        if self.stats is not None:
+            lines = self.stats.counted_lines(lines)
+        
+        self.index = ProvenanceIndex()
+        executor = ThreadPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else None
+        pending = collections.deque()  # (cesta, future) v pořadí zápisu
+        writes: Dict[str, object] = {}  # cesta -> poslední future / výsledek
+        recorded = set()
+        
+        def record(file_path: str, result: Tuple[str, str, Dict | None]):
+            if file_path in recorded:
+                # Opakovaný zápis stejné cesty - jen hláška, soubor už je v přehledu
+                if result[1]:
+                    self.report(result[1])
+                if result[2] is not None:
+                    self.manifest[file_path] = result[2]
+                return
+            recorded.add(file_path)
+            self._record_result(file_path, *result, content=self.index.files.get(file_path, ''))
+        
+        def drain(wait: bool):
+            while pending and (wait or pending[0][1].done()):
+                file_path, future = pending.popleft()
+                record(file_path, future.result())
+        
+        def write(block: FileBlock):
+            previous = writes.get(block.path)
+            rewrite = previous is not None
+            if executor is None:
+                writes[block.path] = True
+                record(block.path, self._materialize(block.path, block, overwrite=rewrite))
+                return
+            
+            # Dva zápisy stejné cesty nesmí běžet souběžně
+            if rewrite:
+                previous.result()
+            future = executor.submit(self._materialize, block.path, block, True, rewrite)
+            writes[block.path] = future
+            pending.append((block.path, future))
+            drain(wait=False)
+        
+        try:
+            with stats_phase(self.stats, 'explicit_parse'):
+                for block in self.iter_file_blocks(lines):
+                    with stats_phase(self.stats, 'merge'):
+                        accepted = self.index.add(block)
+                    if accepted and block.source != 'auto':
+                        write(block)
+            
+            # Konec vstupu - teprve teď je jasné, které auto-detekce platí
+            for block in self.index.auto_detected_files().values():
+                write(block)
+            drain(wait=True)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        if not self.index.files:
+            self.report("❌ Nebyly nalezeny žádné soubory k extrakci!")
+            return
+        
+        if self.stats is not None:
+            self.count_blocks()
+        self.finish_extraction()
+    
+    def extract_indexed_files(self, index: ArtifactIndex) -> List[ExtractedFile]:
+        """
+        Extrahuje všechny soubory z memory-mapped artefaktu.
+        """
+        if self.stats is not None:
+            self.stats.count('bytes_in', len(index))
+        return self.extract_blocks(self.iter_indexed_blocks(index))
+    
+    def extract_batch(self, artifact_paths: List[str]) -> bool:
+        """
+        Extrahuje soubory z více artefaktů jedním společným zápisem.
+        
+        Artefakty se s jobs > 1 parsují paralelně v procesech. Pokud víc
+        artefaktů obsahuje stejnou cestu, vypíše kolize (seřazené podle cesty,
+        kandidáti v pořadí artefaktů) a nic nezapíše.
+        
+        Returns:
+            False při chybě čtení nebo kolizi cest
+        """
+        collect_stats = self.stats is not None
+        results: List[Tuple[List[FileBlock], Tuple | None] | None] = []
+        
+        if self.jobs <= 1 or len(artifact_paths) <= 1:
+            for artifact_path in artifact_paths:
+                try:
+                    results.append(parse_artifact_file(artifact_path, str(self.base_dir), self.debug,
+                                                       collect_stats, self.file_filter, self.solution_index))
+                except Exception as e:
+                    self.report(f"❌ Chyba při čtení souboru {artifact_path}: {e}")
+                    results.append(None)
+        else:
+            # Index solution se obnoví jednou a workery ho dostanou hotový
+            # Čekání na workery - jejich vlastní fáze se přičtou níže
+            with stats_phase(self.stats, 'batch_wait'), \
+                    ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                futures = [executor.submit(parse_artifact_file, artifact_path, str(self.base_dir),
+                                           self.debug, collect_stats, self.file_filter, self.solution_index)
+                           for artifact_path in artifact_paths]
+                for artifact_path, future in zip(artifact_paths, futures):
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        self.report(f"❌ Chyba při čtení souboru {artifact_path}: {e}")
+                        results.append(None)
+        
+        if None in results:
+            return False
+        
+        # Kolize hledáme až nad výsledky všech artefaktů, v pořadí vstupu
+        candidates: Dict[str, List[FileBlock]] = {}
+        for blocks, worker_stats in results:
+            if worker_stats is not None:
+                self.stats.merge(*worker_stats)
+            winners = ProvenanceIndex(blocks)
+            for block in winners:
+                candidates.setdefault(block.path, []).append(block)
+        
+        collisions = {path: blocks for path, blocks in candidates.items() if len(blocks) > 1}
+        if collisions:
+            self.report(f"❌ Kolize cest mezi artefakty ({len(collisions)}):")
+            for file_path in sorted(collisions):
+                sources = '; '.join(block.provenance.describe() for block in collisions[file_path])
+                self.report(f"   • {file_path}: {sources}")
+            self.report("💡 Nic nebylo zapsáno - uprav cesty v artefaktech nebo je extrahuj zvlášť")
+            return False
+        
+        self.extract_blocks(block for blocks, _ in results for block in blocks)
+        return True
+    
+    def extract_sharded(self, artifact_content: str | Iterable[str], parse_jobs: int) -> List[ExtractedFile]:
         """
-        Parsuje obsah artefaktu a extrahuje jednotlivé soubory.
+        Extrahuje jeden velký artefakt s parsováním rozděleným do procesů.
         
-        Returns:
-            Dict[file_path, file_content]
+        Shardy potřebují celý text - iterátor řádků se načte najednou
+        (řádky a bajty vstupu se spočítají už při čtení). Text se rozdělí na shardy na hranicích, kde sériový parser začíná
+        s čistým stavem (split_artifact). Workery shardy naparsují,
+        klasifikují a vyčistí, bloky se pak v pořadí shardů sloučí stejně
+        jako při sériovém průchodu - výsledek je s ním shodný včetně
+        provenance a přednosti explicitních bloků.
         """
-        files = {}
-        current_file = None
-        current_content = []
-        in_file_block = False
+        counted = not isinstance(artifact_content, str)
+        text = ''.join(self._input_lines(artifact_content)) if counted else artifact_content
         
-        lines = content.split('\n')
+        shards = split_artifact(text, parse_jobs * 4)
+        if parse_jobs <= 1 or len(shards) <= 1:
+            if counted:
+                return self.extract_blocks(self.iter_file_blocks(iter_lines(text)))
+            return self.extract_all_files(text)
         
-        for i, line in enumerate(lines):
-            # Detekce začátku souboru: // File: path/to/file.ext
-            file_match = re.match(r'^// File: (.+)$', line.strip())
-            if file_match:
-                # Uložit předchozí soubor
-                if current_file and current_content:
-                    files[current_file] = '\n'.join(current_content).strip()
-                
-                # Začít nový soubor
-                current_file = file_match.group(1)
-                current_content = []
-                in_file_block = True
-                continue
-            
-            # Detekce komentáře s obsahem souboru: /*...*/
-            if line.strip().startswith('/*') and in_file_block:
-                continue
-                
-            if line.strip().endswith('*/') and in_file_block:
-                continue
-            
-            # Detekce konce file bloku
-            if line.strip().startswith('// ===') or line.strip().startswith('// File:'):
-                if current_file and current_content:
-                    files[current_file] = '\n'.join(current_content).strip()
-                    current_content = []
-                
-                if not line.strip().startswith('// File:'):
-                    in_file_block = False
-                    current_file = None
-                continue
-            
-            # Přidat obsah do aktuálního souboru
-            if in_file_block and current_file:
-                current_content.append(line)
+        collect_stats = self.stats is not None
+        if collect_stats:
+            if not counted:
+                # Jen spočítá řádky a bajty - bez druhé kopie celého textu v UTF-8
+                collections.deque(self.stats.counted_lines(iter_lines(text)), maxlen=0)
+            self.stats.count('shards', len(shards))
         
-        # Uložit poslední soubor
-        if current_file and current_content:
-            files[current_file] = '\n'.join(current_content).strip()
+        # Index solution se obnoví jednou a workery ho dostanou hotový
+        # (necachují ho samy - s --output-archive se cache neukládá)
+        with stats_phase(self.stats, 'shard_wait'), \
+                ProcessPoolExecutor(max_workers=parse_jobs, initializer=init_shard_worker,
+                                    initargs=(str(self.base_dir), self.debug, self.file_filter,
+                                              self.solution_index)) as executor:
+            futures = [executor.submit(parse_shard, text[start:end], first_line, start, collect_stats)
+                       for start, end, first_line in shards]
+            results = [future.result() for future in futures]
+        
+        blocks = []
+        for shard_blocks, worker_stats in results:
+            if worker_stats is not None:
+                self.stats.merge(*worker_stats)
+            blocks.extend(shard_blocks)
+        return self.extract_blocks(blocks)
+    
+    def watch(self, artifact_path: str, interval: float = 0.5) -> bool:
+        """
+        Extrahuje artefakt a pak při každé jeho změně přepíše jen soubory,
+        jejichž obsah se změnil. Běží do Ctrl+C.
         
-        # Detekce C# souborů podle using/namespace (fallback)
-        csharp_files = self.detect_csharp_files(content)
+        Auto segmenty se stejným textem se znovu neklasifikují. Přepisují se
+        jen soubory zapsané v tomto běhu, ostatní se řídí --force.
         
-        # Merge, ale priorita má explicitní File: definice
-        for path, content_data in csharp_files.items():
-            if path not in files:  # Přidej jen pokud už není definovaný
-                files[path] = content_data
+        Returns:
+            False pokud artefakt nejde napoprvé přečíst
+        """
+        self.segment_cache = {}
+        try:
+            with open_artifact(artifact_path, self.stats) as f:
+                self.extract_all_files(f)
+        except ARTIFACT_READ_ERRORS as e:
+            self.report(f"❌ Chyba při čtení souboru {artifact_path}: {e}")
+            return False
         
-        return files
+        digests = self.block_digests(self.index)
+        owned = set(self.extracted_files) | set(self.unchanged_files)
+        
+        watcher = open_watcher(artifact_path, interval)
+        self.report(f"\n👀 Sleduji {artifact_path} ({watcher.name}), Ctrl+C ukončí")
+        try:
+            while True:
+                watcher.wait()
+                digests = self.refresh_changed(artifact_path, digests, owned)
+        except KeyboardInterrupt:
+            self.report("\n👋 Sledování ukončeno")
+        finally:
+            watcher.close()
+        return True
     
-    def detect_csharp_files(self, content: str) -> Dict[str, str]:
+    def block_digests(self, index: ProvenanceIndex) -> Dict[str, str]:
         """
-        Detekuje C# soubory podle using a namespace statements.
+        Hash obsahu každého souboru v indexu podle výsledné cesty.
         """
-        csharp_files = {}
+        return {
+            block.path: hashlib.blake2b(block.content.encode('utf-8'), digest_size=16).hexdigest()
+            for block in index
+        }
+    
+    def refresh_changed(self, artifact_path: str, digests: Dict[str, str],
+                        owned: set) -> Dict[str, str]:
+        """
+        Znovu naparsuje artefakt a zapíše jen nové a změněné soubory.
         
-        if self.debug:
-            print("🔍 DEBUG: Spouštím auto-detekci C# souborů...")
+        Returns:
+            hashe souborů z nového parsování (při chybě čtení původní)
+        """
+        self._previous_segment_cache = self.segment_cache
+        self.segment_cache = {}
+        if self.refresh_solution_index():
+            # Nový projekt nebo přesunutý typ mění cesty - klasifikace z minula neplatí
+            self._previous_segment_cache = {}
+        try:
+            with open_artifact(artifact_path) as f:
+                index = self.build_index(f)
+        except ARTIFACT_READ_ERRORS as e:
+            self.report(f"❌ Chyba při čtení souboru {artifact_path}: {e}")
+            self.segment_cache = self._previous_segment_cache
+            return digests
+        finally:
+            self._previous_segment_cache = {}
         
-        # Split obsah na potenciální bloky podle using a namespace
-        blocks = re.split(r'\n(?=(?:using\s+|namespace\s+))', content)
+        current = self.block_digests(index)
+        changed = [file_path for file_path, digest in current.items() if digests.get(file_path) != digest]
+        removed = sorted(set(digests) - set(current))
+        self.index = index
+        if not changed and not removed:
+            return current
         
-        if self.debug:
-            print(f"🔍 DEBUG: Nalezeno {len(blocks)} potenciálních bloků")
+        self.report(f"\n🔁 {time.strftime('%H:%M:%S')} Změna artefaktu: "
+              f"{len(changed)} změněných, {len(removed)} zmizelých souborů")
         
-        for i, block in enumerate(blocks):
-            block = block.strip()
-            if not block:
-                continue
-                
-            if self.debug:
-                first_lines = '\n'.join(block.split('\n')[:3])
-                print(f"🔍 DEBUG: Blok {i+1}:\n{first_lines}...")
-                
-            # Detekce C# kódu (musí začínat using nebo namespace a nesmí být zakomentovaný)
-            if self.is_csharp_code_block(block):
-                if self.debug:
-                    print(f"✅ DEBUG: Blok {i+1} identifikován jako C# kód")
-                    
-                file_info = self.extract_csharp_file_info(block)
-                if file_info:
-                    file_path, clean_content = file_info
-                    csharp_files[file_path] = clean_content
-                    
-                    if self.debug:
-                        print(f"📁 DEBUG: Detekován soubor: {file_path}")
-                else:
-                    if self.debug:
-                        print(f"❌ DEBUG: Nepodařilo se extrahovat info ze souboru")
-            else:
-                if self.debug:
-                    print(f"⏭️  DEBUG: Blok {i+1} přeskočen (není C# kód)")
+        for file_path in changed:
+            status, message, manifest_entry = self._materialize(file_path, index.files[file_path],
+                                                                overwrite=file_path in owned)
+            if message:
+                self.report(message)
+            if manifest_entry is not None:
+                self.manifest[file_path] = manifest_entry
+            if status in ('created', 'updated', 'unchanged'):
+                owned.add(file_path)
+            # Seznamy extracted_files apod. popisují první extrakci, sink dostane každý přepis
+            self.sink.file_result(self._make_record(file_path, status, index.files[file_path]))
         
-        if self.debug:
-            print(f"🎯 DEBUG: Celkem auto-detekováno {len(csharp_files)} C# souborů")
+        if removed:
+            if self.incremental and self.prune:
+                self.prune_removed_files(current)
+            else:
+                for file_path in removed:
+                    self.report(f"⚠️  Soubor z artefaktu zmizel, ponechán: {file_path}")
         
-        return csharp_files
+        if self.incremental:
+            self.save_manifest()
+        if self.store is not None:
+            self.flush_store()
+        return current
     
-    def is_csharp_code_block(self, block: str) -> bool:
+    def flush_store(self):
         """
-        Zkontroluje, jestli blok obsahuje C# kód.
+        Zaznamená použité objekty úložiště, vyřadí objekty nad limit a vypíše shrnutí.
         """
-        lines = block.split('\n')
-        
-        # Najdi první non-empty, non-comment řádek
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            if line.startswith('//') or line.startswith('/*') or line.startswith('*'):
-                continue
-                
-            # Zkontroluj, jestli začíná C# keywords
-            if (line.startswith('using ') or 
-                line.startswith('namespace ') or
-                line.startswith('[') or  # Attributes
-                line.startswith('public ') or
-                line.startswith('internal ') or
-                line.startswith('private ')):
-                return True
-            break
+        if self.store.placed:
+            self.report(f"   🗄️  Úložiště: {self.store.describe_run()}")
+        if self.stats is not None:
+            self.stats.count('store.reused', self.store.reused)
+            self.stats.count('store.added', self.store.added)
+            for method, count in self.store.placed.items():
+                self.stats.count(f'store.{method}', count)
+        self.store.placed, self.store.reused, self.store.added = {}, 0, 0
         
-        return False
+        try:
+            with stats_phase(self.stats, 'store'):
+                evicted, freed = self.store.flush()
+        except OSError as e:
+            self.report(f"   ❌ Chyba při zápisu do úložiště {self.store.root}: {e}")
+            return
+        if evicted:
+            self.report(f"   🧹 Z úložiště vyřazeno {evicted} objektů ({freed / 1024 / 1024:.1f} MiB) "
+                        f"nad limit {self.store.max_size / 1024 / 1024:.1f} MiB")
     
-    def extract_csharp_file_info(self, block: str) -> Tuple[str, str] | None:
+    def count_blocks(self):
         """
-        Extrahuje informace o C# souboru z bloku kódu.
+        Zapíše do statistik počty bloků podle původu a přehlasované kandidáty.
+        """
+        for block in self.index:
+            self.stats.count(f'blocks.{block.source}')
+        self.stats.count('blocks.overridden', sum(len(blocks) for blocks in self.index.overridden.values()))
+    
+    def count_results(self):
+        """
+        Zapíše do statistik výsledky zápisu.
+        """
+        self.stats.count('files.written', len(self.extracted_files))
+        self.stats.count('files.skipped', len(self.skipped_files))
+        self.stats.count('files.unchanged', len(self.unchanged_files))
+        self.stats.count('files.removed', len(self.removed_files))
+    
+    def merge_blocks(self, blocks: Iterable[FileBlock]) -> ProvenanceIndex:
+        """
+        Sloučí bloky z parseru do self.index - explicitní definice mají
+        prioritu před auto-detekcí.
+        """
+        if self.stats is None:
+            self.index = ProvenanceIndex(blocks)
+            return self.index
         
-        Returns:
-            (file_path, clean_content) or None
+        self.index = ProvenanceIndex()
+        with self.stats.phase('explicit_parse'):
+            for block in blocks:
+                with self.stats.phase('merge'):
+                    self.index.add(block)
+        self.count_blocks()
+        return self.index
+    
+    def extract_blocks(self, blocks: Iterable[FileBlock]) -> List[ExtractedFile]:
+        """
+        Zapíše bloky z parseru a vypíše shrnutí.
         """
-        lines = block.split('\n')
-        namespace_name = None
-        class_name = None
-        file_type = "cs"
+        self.report(f"🚀 Extrahuji soubory do: {self.destination}")
+        if self.file_filter:
+            self.report(f"🎯 Filtr: {self.file_filter.describe()}")
+        self.report("=" * 60)
         
-        # Analýza kódu pro určení názvu souboru
-        for line in lines:
-            stripped = line.strip()
-            
-            # Přeskoč komentáře
-            if stripped.startswith('//') or stripped.startswith('/*') or stripped.startswith('*'):
-                continue
-            
-            # Detekce namespace
-            namespace_match = re.match(r'namespace\s+([^\s{]+)', stripped)
-            if namespace_match:
-                namespace_name = namespace_match.group(1)
-                continue
-            
-            # Detekce třídy, interface, record, enum
-            class_matches = [
-                re.match(r'.*?(?:public|internal|private)?\s*(?:partial\s+)?(?:class|interface|record|enum|struct)\s+(\w+)', stripped),
-                re.match(r'.*?\[Generator\].*?(?:public|internal)?\s*(?:class)\s+(\w+)', stripped),
-                re.match(r'.*?(?:public|internal)?\s*(?:static\s+)?(?:class)\s+(\w+)', stripped)
-            ]
-            
-            for match in class_matches:
-                if match:
-                    class_name = match.group(1)
-                    break
-            
-            # Detekce special případů
-            if 'ModelWrapperAttribute' in stripped:
-                class_name = 'ModelWrapperAttribute'
-            elif '[Generator]' in stripped or 'SourceGenerator' in stripped:
-                if not class_name:
-                    words = stripped.split()
-                    for word in words:
-                        if 'Generator' in word and word.endswith('Generator'):
-                            class_name = word
-                            break
-        
-        # Pokus o určení cesty k souboru
-        if not class_name and not namespace_name:
-            return None
+        all_files = self.merge_blocks(blocks).files
         
-        # Sestavení cesty
-        if namespace_name and class_name:
-            # Standardní C# soubor
-            
-            # Detekce typu projektu podle namespace
-            if 'Attributes' in namespace_name:
-                base_path = 'src/HierarchicalMvvm.Attributes'
-            elif 'Generators' in namespace_name or 'Generator' in namespace_name:
-                base_path = 'src/HierarchicalMvvm.Generator'
-            elif 'Core' in namespace_name:
-                base_path = 'src/HierarchicalMvvm.Core'
-            elif 'Demo' in namespace_name:
-                if 'Models' in namespace_name:
-                    base_path = 'src/HierarchicalMvvm.Demo/Models'
-                elif 'ViewModels' in namespace_name:
-                    base_path = 'src/HierarchicalMvvm.Demo/ViewModels'
-                else:
-                    base_path = 'src/HierarchicalMvvm.Demo'
-            else:
-                # Fallback na namespace strukturu
-                namespace_parts = namespace_name.split('.')
-                base_path = '/'.join(['src'] + namespace_parts) if len(namespace_parts) > 1 else 'src'
-            
-            file_path = f"{base_path}/{class_name}.{file_type}"
+        if not all_files:
+            self.report("❌ Nebyly nalezeny žádné soubory k extrakci!")
+            return []
         
-        elif class_name:
-            # Jen class name bez namespace
-            file_path = f"src/{class_name}.{file_type}"
-        else:
-            return None
+        # Rozdělení na explicitní a auto-detekované
+        explicit_files = self.index.explicit_files()
+        auto_detected_files = self.index.auto_detected_files()
         
-        # Vyčisti obsah
-        clean_content = self.clean_csharp_content(block)
+        self.report(f"📁 Nalezeno celkem {len(all_files)} souborů:")
         
-        return (file_path, clean_content)
+        if explicit_files:
+            self.report(f"📋 Explicitně definované ({len(explicit_files)}):")
+            for file_path in sorted(explicit_files.keys()):
+                self.report(f"   ✓ {file_path}")
+        
+        if auto_detected_files:
+            self.report(f"🔍 Auto-detekované ({len(auto_detected_files)}):")
+            for file_path in sorted(auto_detected_files.keys()):
+                self.report(f"   🤖 {file_path}")
+        
+        self.report()
+        
+        # Vytvoř soubory
+        if self.incremental:
+            self.load_manifest()
+        
+        records = self.write_files(all_files)
+        self.finish_extraction()
+        return records
     
-    def clean_csharp_content(self, content: str) -> str:
+    def abort_extraction(self):
         """
-        Vyčistí C# obsah od artefact komentářů a metadata.
+        Uloží manifest a úložiště pro soubory zapsané před přerušením
+        iter_extract. Bez --prune a bez shrnutí - zbytek se nezapsal.
         """
-        lines = content.split('\n')
-        cleaned_lines = []
-        skip_comment_block = False
+        if self.incremental:
+            self.save_manifest()
+        if self.stats is not None:
+            self.count_results()
+        if self.store is not None:
+            self.flush_store()
+    
+    def finish_extraction(self):
+        """
+        Po zápisu všech souborů uloží manifest (s --prune smaže zmizelé
+        soubory) a vypíše shrnutí.
+        """
+        all_files = self.index.files
+        auto_detected_files = self.index.auto_detected_files()
+        
+        if self.incremental:
+            if self.prune:
+                self.prune_removed_files(all_files)
+            self.save_manifest()
+        
+        if self.stats is not None:
+            self.count_results()
+        
+        # Shrnutí
+        self.report("=" * 60)
+        self.report(f"📊 Výsledky:")
+        self.report(f"   ✅ Vytvořeno: {len(self.extracted_files)} souborů")
+        self.report(f"   ⚠️  Přeskočeno: {len(self.skipped_files)} souborů")
+        
+        if self.incremental:
+            self.report(f"   ⏸️  Beze změny: {len(self.unchanged_files)} souborů")
+            if self.prune:
+                self.report(f"   🗑️  Odstraněno: {len(self.removed_files)} souborů")
+        
+        if self.store is not None:
+            self.flush_store()
+        
+        if auto_detected_files:
+            self.report(f"   🤖 Auto-detekováno: {len(auto_detected_files)} souborů")
+        
+        conflicts = self.index.conflicts()
+        if conflicts:
+            self.report(f"\n⚔️  Konflikty cest ({len(conflicts)}):")
+            for file_path in sorted(conflicts):
+                winner = self.index.files[file_path].provenance.describe()
+                losers = '; '.join(block.provenance.describe() for block in conflicts[file_path])
+                self.report(f"   • {file_path}: použit {winner}, přehlasováno {losers}")
+        
+        if self.skipped_files:
+            self.report(f"\n📋 Přeskočené soubory:")
+            for file_path in self.skipped_files:
+                self.report(f"   • {file_path}")
+            self.report(f"\n💡 Tip: Použij --force pro přepsání existujících souborů")
+        
+        if auto_detected_files:
+            self.report(f"\n🔍 Auto-detekované soubory:")
+            for file_path in sorted(auto_detected_files.keys()):
+                self.report(f"   🤖 {file_path}")
+            self.report(f"\n💡 Auto-detekce funguje podle using/namespace statements")
+            self.report(f"   Pokud je cesta špatná, přidej explicitní // File: komentář")
+
+def iter_pipelined_lines(stream, chunk_size: int = 1 << 16, max_chunks: int = 64,
+                         stats: ExtractionStats | None = None) -> Iterator[str]:
+    """
+    Čte binární stream v samostatném vlákně a vrací jeho řádky (i s konci).
+    
+    read1 vrací, co je zrovna k dispozici, takže uzavřený blok se dostane
+    k parseru hned, i když producent na druhé straně roury zapisuje pomalu.
+    Fronta je omezená na max_chunks úseků, pomalý zápis tedy čtení přibrzdí.
+    Stream může být i rozbalující (open_decompressed). Se stats se jako
+    fáze read měří čekání na další úsek z fronty.
+    """
+    read = getattr(stream, 'read1', stream.read)
+    chunks = queue.Queue(maxsize=max_chunks)
+    
+    def reader():
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            while True:
+                data = read(chunk_size)
+                text = decoder.decode(data, final=not data)
+                if text:
+                    chunks.put(text)
+                if not data:
+                    break
+        except Exception as e:
+            chunks.put(e)
+        chunks.put(None)
+    
+    threading.Thread(target=reader, name='artifact-reader', daemon=True).start()
+    
+    partial: List[str] = []
+    while True:
+        if stats is None:
+            text = chunks.get()
+        else:
+            with stats.phase('read'):
+                text = chunks.get()
+        if text is None:
+            break
+        if isinstance(text, Exception):
+            raise text
         
+        if '\n' not in text:
+            partial.append(text)
+            continue
+        
+        lines = text.split('\n')
+        if partial:
+            partial.append(lines[0])
+            lines[0] = ''.join(partial)
+            partial = []
+        tail = lines.pop()
         for line in lines:
-            stripped = line.strip()
-            
-            # Přeskoč artifact header komentáře
-            if (stripped.startswith('// ===') or 
-                stripped.startswith('// KROK') or
-                stripped.startswith('// File:') or
-                stripped.startswith('// =====')):
-                continue
-            
-            # Přeskoč comment bloky /*...*/
-            if stripped.startswith('/*'):
-                skip_comment_block = True
-                continue
-            if stripped.endswith('*/'):
-                skip_comment_block = False
-                continue
-            if skip_comment_block:
+            yield line + '\n'
+        if tail:
+            partial.append(tail)
+    
+    if partial:
+        yield ''.join(partial)
+
+
+class PollingWatcher:
+    """
+    Hlídá změny souboru porovnáváním stat() v pravidelném intervalu.
+    """
+    name = 'polling'
+    
+    def __init__(self, path: str, interval: float = 0.5):
+        self.path = path
+        self.interval = interval
+        self._signature = self._stat()
+    
+    def _stat(self) -> Tuple[int, int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    
+    def wait(self):
+        """
+        Blokuje, dokud se soubor nezmění a jeden interval nezůstane stejný.
+        """
+        while True:
+            time.sleep(self.interval)
+            signature = self._stat()
+            if signature is None or signature == self._signature:
                 continue
             
-            # Přeskoč prázdné řádky na začátku
-            if not cleaned_lines and not stripped:
-                continue
-                
-            cleaned_lines.append(line)
+            # Zápis může ještě probíhat - počkej na ustálení
+            while True:
+                time.sleep(self.interval)
+                settled = self._stat()
+                if settled == signature:
+                    break
+                signature = settled
+            self._signature = signature
+            return
+    
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Hlídá změny souboru přes Linux inotify (ctypes, bez závislostí).
+    
+    Sleduje se nadřazený adresář, takže se zachytí i editory, které soubor
+    nahrazují přejmenováním.
+    """
+    name = 'inotify'
+    
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    EVENT_HEADER = struct.Struct('iIII')
+    
+    def __init__(self, path: str, debounce: float = 0.1):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.file_name = os.fsencode(os.path.basename(path))
+        self.debounce = debounce
         
-        # Odstraň trailing prázdné řádky
-        while cleaned_lines and not cleaned_lines[-1].strip():
-            cleaned_lines.pop()
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 selhal')
         
-        return '\n'.join(cleaned_lines)
+        directory = os.path.dirname(os.path.abspath(path))
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory),
+                                  self.IN_CLOSE_WRITE | self.IN_MOVED_TO) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f'inotify_add_watch selhal pro {directory}')
     
-    def extract_project_files(self, content: str) -> Dict[str, str]:
+    def _read_events(self) -> bool:
         """
-        Alternativní parser pro project soubory (.csproj, .sln).
+        Přečte čekající události a vrátí True, pokud se týkají sledovaného souboru.
         """
-        project_files = {}
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        matched = False
+        while offset < len(data):
+            _, mask, _, name_length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b'\0')
+            offset += name_length
+            if name == self.file_name:
+                matched = True
+        return matched
+    
+    def wait(self):
+        while True:
+            select.select([self.fd], [], [])
+            if not self._read_events():
+                continue
+            
+            # Spoj rychle po sobě jdoucí zápisy do jedné změny
+            while select.select([self.fd], [], [], self.debounce)[0]:
+                self._read_events()
+            return
+    
+    def close(self):
+        os.close(self.fd)
+
+
+def open_watcher(path: str, interval: float = 0.5):
+    """
+    Vrátí InotifyWatcher, kde je inotify k dispozici, jinak PollingWatcher.
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(path, interval)
+
+
+def parse_artifact_file(artifact_path: str, base_dir: str = '.', debug: bool = False,
+                        collect_stats: bool = False, file_filter: FileFilter | None = None,
+                        solution_index: SolutionIndex | None = None) -> Tuple[List[FileBlock], Tuple | None]:
+    """
+    Naparsuje jeden artefakt pro --batch (spouští se i ve worker procesu).
+    
+    solution_index je index načtený hlavním procesem, bez něj se načte
+    (a uloží do cache) znovu.
+    
+    Returns:
+        (bloky v pořadí výskytu, (fáze, čítače) se collect_stats, jinak None)
+    """
+    stats = ExtractionStats() if collect_stats else None
+    # Debug výpis workeru jde rovnou na stdout
+    extractor = FileExtractor(base_dir=base_dir, debug=debug, stats=stats,
+                              sink=ConsoleReportSink() if debug else None, file_filter=file_filter)
+    extractor._solution_index = solution_index
+    
+    with open_artifact(artifact_path, stats) as f:
+        lines = stats.counted_lines(f) if stats is not None else f
+        with stats_phase(stats, 'explicit_parse'):
+            blocks = list(extractor.iter_file_blocks(lines))
+    
+    for block in blocks:
+        block.provenance.artifact = artifact_path
+    
+    if stats is None:
+        return blocks, None
+    stats.count('artifacts')
+    return blocks, (stats.phases, stats.counters)
+
+
+def split_artifact(text: str, shards: int) -> List[Tuple[int, int, int]]:
+    """
+    Rozdělí text artefaktu na nejvýš zhruba shards částí pro --parse-jobs.
+    
+    Returns:
+        [(začátek, konec, číslo prvního řádku)] - offsety ve znacích
+    """
+    target = max(len(text) // max(shards, 1), SHARD_MIN_SIZE)
+    cuts = [0]
+    for boundary in iter_shard_boundaries(text, target):
+        if boundary - cuts[-1] >= target:
+            cuts.append(boundary)
+    cuts.append(len(text))
+    
+    result = []
+    first_line = 1
+    for start, end in zip(cuts, cuts[1:]):
+        result.append((start, end, first_line))
+        first_line += text.count('\n', start, end)
+    return result
+
+
+def iter_shard_boundaries(text: str, min_gap: int) -> Iterator[int]:
+    """
+    Offsety řádků, od kterých parser naparsuje zbytek stejně jako sériový průchod.
+    
+    Jsou to platné // File: hlavičky a // === oddělovače - obojí uzavře
+    rozpracovaný blok i segment. Úseky mimo explicitní bloky delší než
+    min_gap se navíc dělí na začátcích using/namespace segmentů.
+    """
+    previous = 0
+    previous_is_gap = True  # text začíná mimo explicitní blok
+    for match in SHARD_MARKER_PATTERN.finditer(text):
+        start = match.start()
+        end = text.find('\n', start)
+        stripped = text[start:end if end != -1 else len(text)].strip()
+        is_header = stripped.startswith('// File:')
+        if is_header and not FILE_HEADER_PATTERN.match(stripped):
+            continue
+        
+        if previous_is_gap and start - previous > min_gap:
+            yield from iter_segment_starts(text, previous, start)
+        yield start
+        previous = start
+        previous_is_gap = not is_header
+    
+    if previous_is_gap and len(text) - previous > min_gap:
+        yield from iter_segment_starts(text, previous, len(text))
+
+
+def iter_segment_starts(text: str, start: int, end: int) -> Iterator[int]:
+    """
+    Offsety řádků v úseku mimo explicitní bloky, kde auto-detekce
+    FileExtractor.iter_file_blocks začíná nový segment (using/namespace
+    za segmentem s tělem). Zrcadlí jen tu část parseru, která o tom
+    rozhoduje.
+    """
+    segment_has_body = False
+    offset = start
+    for raw_line in iter_lines(text[start:end]):
+        line_start = offset
+        offset += len(raw_line)
         
-        # Hledej .csproj soubory
-        csproj_pattern = r'// File: ([^\n]+\.csproj)\s*\n/\*\n(.*?)\n\*/'
-        for match in re.finditer(csproj_pattern, content, re.DOTALL):
-            file_path = match.group(1)
-            file_content = match.group(2).strip()
-            project_files[file_path] = file_content
+        line = raw_line.rstrip('\r\n') if raw_line.endswith('\n') else raw_line
+        stripped = line.strip()
+        # Neplatné hlavičky parser přeskakuje, // === je jen na začátku úseku
+        if stripped.startswith(('// File:', '// ===')):
+            continue
+        if line.rstrip() in ('/*', '*/'):
+            segment_has_body = False
+            continue
         
-        # Hledej .sln soubory
-        # sln_pattern = r'// File: ([^\n]+\.sln)\s*\n/\*\s*\n(.*?)\n\*/'
-        # for match in re.finditer(sln_pattern, content, re.DOTALL):
-        #     file_path = match.group(1)
-        #     file_content = match.group(2).strip()
-        #     project_files[file_path] = file_content
-            
-        #  Hledej XAML soubory
-        xaml_pattern = r'// File: ([^\n]+\.xaml)\n/\*\s*\n(.*?)\n\*/'
-        for match in re.finditer(xaml_pattern, content, re.DOTALL):
-            file_path = match.group(1)
-            file_content = match.group(2).strip()
-            project_files[file_path] = file_content
+        if segment_has_body and CSHARP_BOUNDARY_PATTERN.match(line):
+            yield line_start
+            segment_has_body = False
+        if (stripped and not segment_has_body
+                and not stripped.startswith(('using ', '//', '/*', '*'))):
+            segment_has_body = True
+
+
+# Extraktor --parse-jobs workeru - index solution dostane hotový od hlavního procesu
+_shard_extractor = None
+
+
+def init_shard_worker(base_dir: str, debug: bool, file_filter: FileFilter, solution_index: SolutionIndex):
+    global _shard_extractor
+    _shard_extractor = FileExtractor(base_dir=base_dir, debug=debug,
+                                     sink=ConsoleReportSink() if debug else None, file_filter=file_filter)
+    _shard_extractor._solution_index = solution_index
+
+
+def parse_shard(text: str, first_line: int, first_offset: int,
+                collect_stats: bool) -> Tuple[List[FileBlock], Tuple | None]:
+    """
+    Naparsuje, klasifikuje a vyčistí jeden shard (běží ve worker procesu).
+    
+    Returns:
+        (vyčištěné bloky v pořadí výskytu, (fáze, čítače) se collect_stats, jinak None)
+    """
+    extractor = _shard_extractor
+    stats = ExtractionStats() if collect_stats else None
+    extractor.stats = stats
+    
+    with stats_phase(stats, 'explicit_parse'):
+        blocks = [extractor.clean_block(block)
+                  for block in extractor.iter_file_blocks(iter_lines(text), first_line, first_offset)]
+    
+    if stats is None:
+        return blocks, None
+    return blocks, (stats.phases, stats.counters)
+
+
+class TreePacker:
+    """
+    Opak extrakce - sbalí strom zdrojáků do artefaktu (// File: hlavička
+    a obsah v /* */ obalu).
+    
+    Soubory se čtou paralelně ve vláknech (jobs) a výstup se zapisuje
+    průběžně v seřazeném pořadí cest, celý balík tedy nikdy není v paměti.
+    Obsah se normalizuje stejně jako při extrakci (LF, bez okrajových
+    prázdných řádků), takže FileExtractor zapíše každý soubor přesně tak,
+    jak byl zabalen. Soubory, které by extrakce změnila, binární a prázdné
+    soubory se přeskočí.
+    
+    Vzory include/exclude bez '/' se porovnávají se jménem souboru,
+    ostatní s cestou relativní k rootu. Exclude vyřazuje i celé adresáře.
+    """
+    
+    def __init__(self, roots: List[str], include: List[str] | None = None,
+                 exclude: List[str] | None = None, jobs: int = 1,
+                 sink: ReportSink | None = None, skip_paths: Iterable[str] = ()):
+        self.roots = roots
+        self.include = include or []
+        self.exclude = exclude or []
+        self.jobs = jobs
+        self.sink = sink if sink is not None else ReportSink()
+        self.skip_paths = {os.path.abspath(path) for path in skip_paths}
+        # Jen pro ověření round-tripu - parser explicitních bloků nepotřebuje base_dir
+        self.extractor = FileExtractor()
+        self.packed_files: List[str] = []
+        self.skipped_files: List[Tuple[str, str]] = []
+        self.bytes_in = 0
+        self.bytes_out = 0
+    
+    @staticmethod
+    def matches(relative: str, patterns: List[str]) -> bool:
+        name = relative.rsplit('/', 1)[-1]
+        return any(fnmatch.fnmatchcase(relative if '/' in pattern else name, pattern)
+                   for pattern in patterns)
+    
+    def iter_paths(self) -> Iterator[Tuple[str, str]]:
+        """
+        Projde rooty a vrací (cesta na disku, cesta v artefaktu) v seřazeném pořadí.
+        
+        Cesta v artefaktu je relativní k aktuálnímu adresáři, pokud root leží
+        pod ním (pack src tests -> src/..., tests/...), jinak k rootu.
+        """
+        for root in self.roots:
+            relative_root = os.path.relpath(root)
+            if relative_root == os.curdir or relative_root.startswith(os.pardir):
+                relative_root = ''
             
-        return project_files
+            for directory, dirnames, filenames in os.walk(root):
+                relative_dir = os.path.relpath(directory, root)
+                prefix = '' if relative_dir == os.curdir else relative_dir.replace(os.sep, '/') + '/'
+                if relative_root:
+                    prefix = relative_root.replace(os.sep, '/') + '/' + prefix
+                
+                dirnames[:] = sorted(name for name in dirnames
+                                     if not name.startswith('.') and name not in SOLUTION_SKIP_DIRS
+                                     and not self.matches(prefix + name, self.exclude))
+                
+                for name in sorted(filenames):
+                    relative = prefix + name
+                    if name == MANIFEST_FILE_NAME:
+                        continue
+                    if self.include and not self.matches(relative, self.include):
+                        continue
+                    if self.matches(relative, self.exclude):
+                        continue
+                    full_path = os.path.join(directory, name)
+                    if self.skip_paths and os.path.abspath(full_path) in self.skip_paths:
+                        continue
+                    yield full_path, relative
     
-    def clean_file_content(self, content: str, file_path: str) -> str:
+    def pack_file(self, full_path: str, relative: str) -> Tuple[str, bytes | None, str, int]:
         """
-        Vyčistí obsah souboru od artefact komentářů.
+        Načte a zabalí jeden soubor (běží ve worker vlákně).
+        
+        Returns:
+            (cesta v artefaktu, blok artefaktu nebo None, důvod přeskočení, velikost souboru)
         """
-        lines = content.split('\n')
-        cleaned_lines = []
+        try:
+            with open(full_path, 'rb') as f:
+                raw = f.read()
+        except OSError as e:
+            return relative, None, f"chyba čtení: {e}", 0
         
-        for line in lines:
-            # Přeskoč artifact komentáře
-            if (line.strip().startswith('// ===') or 
-                line.strip().startswith('// File:') or
-                line.strip().startswith('/*') or
-                line.strip().startswith('*/')):
-                continue
-            
-            cleaned_lines.append(line)
+        if b'\0' in raw:
+            return relative, None, "binární soubor", len(raw)
+        try:
+            text = raw.decode('utf-8')
+        except UnicodeDecodeError:
+            return relative, None, "není v UTF-8", len(raw)
         
-        result = '\n'.join(cleaned_lines).strip()
+        content = text.replace('\r\n', '\n').replace('\r', '\n').strip()
+        if not content:
+            return relative, None, "prázdný soubor", len(raw)
         
-        # Speciální zpracování pro různé typy souborů
-        if file_path.endswith('.csproj') or file_path.endswith('.props') or file_path.endswith('.targets'):
-            # Odstraň leading/trailing prázdné řádky z XML
-            result = result.strip()
-        elif file_path.endswith('.cs'):
-            # Pro C# soubory použij specializované čištění
-            result = self.clean_csharp_content(result)
+        block = f"// File: {relative}\n/*\n{content}\n*/\n\n"
+        # Rychlé hledání podřetězců, regex jen u souborů, kde se značka vyskytuje
+        risky = relative != relative.strip() or (
+            any(marker in content for marker in PACK_ROUNDTRIP_MARKERS)
+            and PACK_ROUNDTRIP_RISK_PATTERN.search(content))
+        if risky and not self.round_trips(relative, block, content):
+            return relative, None, "extrakce by obsah změnila - řádky /* */ nebo značky artefaktu", len(raw)
+        return relative, block.encode('utf-8'), '', len(raw)
+    
+    def round_trips(self, relative: str, block: str, content: str) -> bool:
+        """
+        Ověří skutečným parserem a čištěním, že se blok extrahuje beze změny.
+        """
+        blocks = list(self.extractor.iter_file_blocks(iter_lines(block)))
+        return (len(blocks) == 1 and blocks[0].path == relative
+                and self.extractor.final_content(blocks[0], relative) == content)
+    
+    def iter_packed(self) -> Iterator[Tuple[str, bytes | None, str, int]]:
+        """
+        Výsledky pack_file v pořadí cest. Rozpracovaných je nejvýš jobs * 4
+        souborů, takže čtení předbíhá zápis jen o omezený kus.
+        """
+        if self.jobs <= 1:
+            for full_path, relative in self.iter_paths():
+                yield self.pack_file(full_path, relative)
+            return
         
-        return result
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            pending = collections.deque()
+            for full_path, relative in self.iter_paths():
+                pending.append(executor.submit(self.pack_file, full_path, relative))
+                if len(pending) >= self.jobs * 4:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
     
-    def create_file(self, file_path: str, content: str) -> bool:
+    def write(self, output) -> int:
         """
-        Vytvoří soubor na daném místě.
+        Zapíše artefakt do binárního streamu.
         
         Returns:
-            True pokud byl soubor vytvořen, False pokud byl přeskočen
+            počet zabalených souborů
         """
-        full_path = self.base_dir / file_path
+        for relative, data, reason, size in self.iter_packed():
+            self.bytes_in += size
+            if data is None:
+                self.skipped_files.append((relative, reason))
+                self.sink.message(f"⚠️  Přeskočen: {relative} ({reason})")
+                continue
+            
+            output.write(data)
+            self.packed_files.append(relative)
+            self.bytes_out += len(data)
+        return len(self.packed_files)
+
+
+def pack_main(argv: List[str]):
+    """
+    Podpříkaz pack - sbalí strom zdrojáků do artefaktu.
+    """
+    parser = argparse.ArgumentParser(
+        prog='extract_files.py pack',
+        description='Sbalí strom zdrojáků do artefaktu, který FileExtractor rozbalí beze změny',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Příklady použití:
+  python extract_files.py pack src tests -o artifact.txt
+  python extract_files.py pack . --include '*.cs' '*.csproj' --exclude 'tests/*' -o core.txt
+  python extract_files.py pack src | python extract_files.py --base-dir /tmp/copy
+  python extract_files.py pack . --allow-skipped -o artifact.txt  # binární soubory ap. jen ohlásí
+
+Obsah se zabalí normalizovaný (LF, bez okrajových prázdných řádků) - přesně
+v podobě, ve které ho extrakce zapíše. Soubory, které by extrakce změnila
+(řádky začínající /* nebo */, // File:, // ===), binární, prázdné a soubory
+mimo UTF-8 se přeskočí s varováním. Artefakt se zapíše i tak, ale pack pak
+skončí s kódem 1 - strom by se z něj neobnovil celý. --allow-skipped
+přeskočené soubory jen ohlásí.
+        """
+    )
+    parser.add_argument('roots', nargs='*', default=['.'], metavar='DIR',
+                        help='Adresáře k zabalení (default: aktuální adresář)')
+    parser.add_argument('--output', '-o', type=str, default='-',
+                        help='Výstupní artefakt (default: stdout)')
+    parser.add_argument('--include', nargs='+', action='extend', metavar='GLOB',
+                        help='Zabalit jen soubory odpovídající některému vzoru')
+    parser.add_argument('--exclude', nargs='+', action='extend', metavar='GLOB',
+                        help='Vynechat soubory a adresáře odpovídající vzoru')
+    parser.add_argument('--jobs', '-j', type=int, default=4,
+                        help='Počet vláken pro čtení souborů (default: 4)')
+    parser.add_argument('--allow-skipped', action='store_true',
+                        help='Neskončit s chybou, když některý soubor nejde zabalit')
+    args = parser.parse_args(argv)
+    
+    for root in args.roots:
+        if not os.path.isdir(root):
+            print(f"❌ Adresář neexistuje: {root}")
+            sys.exit(1)
+    
+    if args.output == '-' and sys.stdout.isatty():
+        print("❌ Artefakt nejde zapsat na terminál, použij --output nebo přesměruj stdout")
+        sys.exit(1)
+    
+    # Artefakt na stdout - hlášky jdou na stderr
+    stdout = sys.stdout.buffer
+    messages = redirect_stdout(sys.stderr) if args.output == '-' else nullcontext()
+    
+    with messages:
+        packer = TreePacker(args.roots, args.include, args.exclude, args.jobs, ConsoleReportSink(),
+                            skip_paths=[] if args.output == '-' else [args.output])
+        print(f"📦 Balím: {', '.join(args.roots)}")
+        started = time.perf_counter()
         
-        # Vytvoř adresáře
-        full_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if args.output == '-':
+                packer.write(stdout)
+                stdout.flush()
+            else:
+                with open(args.output, 'wb') as f:
+                    packer.write(f)
+        except OSError as e:
+            print(f"❌ Chyba při zápisu artefaktu {args.output}: {e}")
+            sys.exit(1)
         
-        # Zkontroluj, jestli soubor existuje
-        if full_path.exists() and not self.force_overwrite:
-            print(f"⚠️  Soubor již existuje: {file_path} (použij --force pro přepsání)")
-            self.skipped_files.append(file_path)
-            return False
+        elapsed = time.perf_counter() - started
+        print("=" * 60)
+        print(f"📊 Výsledky:")
+        print(f"   ✅ Zabaleno: {len(packer.packed_files)} souborů "
+              f"({packer.bytes_out / 1024 / 1024:.1f} MiB za {elapsed:.2f} s)")
+        print(f"   ⚠️  Přeskočeno: {len(packer.skipped_files)} souborů")
         
-        # Vyčisti obsah
-        clean_content = self.clean_file_content(content, file_path)
+        if not packer.packed_files:
+            print("❌ Nebyly nalezeny žádné soubory k zabalení!")
+            sys.exit(1)
         
-        # Zapis soubor
+        if packer.skipped_files and not args.allow_skipped:
+            print(f"❌ Artefakt je neúplný - {len(packer.skipped_files)} souborů nejde zabalit beze změny "
+                  f"(použij --allow-skipped, pokud to nevadí)")
+            sys.exit(1)
+
+
+def store_main(argv: List[str]):
+    """
+    Podpříkaz store - údržba úložiště obsahu (--store).
+    """
+    parser = argparse.ArgumentParser(
+        prog='extract_files.py store',
+        description='Údržba úložiště obsahu sdíleného extrakcemi do více stromů',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Příklady použití:
+  python extract_files.py store stats --store /var/cache/extract
+  python extract_files.py store gc --store /var/cache/extract --max-age 7
+  python extract_files.py store gc --store /var/cache/extract --max-size 2G --verify
+
+gc smaže objekty, na které neodkazuje žádný hardlink ve stromech a nebyly
+použity --max-age dní (u reflinku a kopie rozhoduje jen stáří), s --max-size
+pak nejdéle nepoužité objekty nad limit. Soubory ve stromech zůstanou vždy.
+Úložiště se bere z --store nebo z proměnné ${STORE_ENV}.
+        """
+    )
+    parser.add_argument('action', choices=['gc', 'stats'], help='Akce')
+    parser.add_argument('--store', type=str, default=os.environ.get(STORE_ENV), metavar='DIR',
+                        help=f'Adresář úložiště (default: ${STORE_ENV})')
+    parser.add_argument('--max-age', type=float, default=7.0, metavar='DAYS',
+                        help='gc: smazat objekty bez odkazu nepoužité DAYS dní (default: 7)')
+    parser.add_argument('--max-size', type=parse_size, metavar='SIZE',
+                        help='gc: vyřadit nejdéle nepoužité objekty nad limit (např. 2G)')
+    parser.add_argument('--verify', action='store_true',
+                        help='gc: přepočítat hashe a smazat poškozené objekty')
+    args = parser.parse_args(argv)
+    
+    if not args.store:
+        print(f"❌ Chybí --store (nebo proměnná {STORE_ENV})")
+        sys.exit(1)
+    if not os.path.isdir(args.store):
+        print(f"❌ Úložiště neexistuje: {args.store}")
+        sys.exit(1)
+    
+    store = ContentStore(args.store)
+    if args.action == 'stats':
+        summary = store.summary()
+        print(f"🗄️  Úložiště {args.store}: {summary['objects']} objektů "
+              f"({summary['bytes'] / 1024 / 1024:.1f} MiB), bez hardlinku ve stromech {summary['unreferenced']}")
+        return
+    
+    print(f"🧹 Úklid úložiště: {args.store}")
+    try:
+        result = store.gc(args.max_age * 86400, args.max_size, args.verify)
+    except OSError as e:
+        print(f"❌ Chyba při úklidu úložiště: {e}")
+        sys.exit(1)
+    
+    if args.verify:
+        print(f"   ⚠️  Poškozené: {result['corrupt']} objektů ({result['corrupt_bytes'] / 1024 / 1024:.1f} MiB)")
+    print(f"   🗑️  Bez odkazu: {result['unreferenced']} objektů "
+          f"({result['unreferenced_bytes'] / 1024 / 1024:.1f} MiB)")
+    if args.max_size is not None:
+        print(f"   📉 Nad limit: {result['evicted']} objektů ({result['evicted_bytes'] / 1024 / 1024:.1f} MiB)")
+    if result['stale_tmp']:
+        print(f"   🧽 Rozepsané dočasné soubory: {result['stale_tmp']}")
+    print(f"   🗄️  Zůstává: {result['objects']} objektů ({result['bytes'] / 1024 / 1024:.1f} MiB)")
+
+
+def runtime_dir() -> str:
+    return (os.environ.get('XDG_RUNTIME_DIR') or os.environ.get('TMPDIR') or os.environ.get('TEMP')
+            or '/tmp')
+
+
+def default_socket_path() -> str:
+    """
+    Výchozí Unix socket serveru - stejně ho počítá extract_client.py.
+    """
+    if os.environ.get('EXTRACT_FILES_SOCKET'):
+        return os.environ['EXTRACT_FILES_SOCKET']
+    return os.path.join(runtime_dir(), f"extract-files-{getattr(os, 'getuid', lambda: 0)()}.sock")
+
+
+def default_token_path() -> str:
+    """
+    Výchozí soubor s tokenem TCP serveru - stejně ho počítá extract_client.py.
+    """
+    if os.environ.get(SERVER_TOKEN_ENV):
+        return os.environ[SERVER_TOKEN_ENV]
+    return os.path.join(runtime_dir(), f"extract-files-{getattr(os, 'getuid', lambda: 0)()}.token")
+
+
+def write_token_file(path: str) -> str:
+    """
+    Vygeneruje token TCP serveru a atomicky ho zapíše do souboru čitelného jen
+    pro vlastníka (na Windows chrání soubor uživatelský adresář TEMP).
+    """
+    token = secrets.token_hex(32)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, SERVER_TOKEN_MODE)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(token + '\n')
+        os.chmod(tmp_path, SERVER_TOKEN_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
         try:
-            with open(full_path, 'w', encoding='utf-8', newline='\n') as f:
-                f.write(clean_content)
-            
-            print(f"✅ Vytvořen: {file_path}")
-            self.extracted_files.append(file_path)
-            return True
-            
-        except Exception as e:
-            print(f"❌ Chyba při vytváření {file_path}: {e}")
-            return False
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return token
+
+
+class ExtractionService:
+    """
+    Teplá extrakce pro podpříkaz serve.
     
-    def extract_all_files(self, artifact_content: str):
-        """
-        Extrahuje všechny soubory z artefaktu.
-        """
-        print(f"🚀 Extrahuji soubory do: {self.base_dir.absolute()}")
-        print("=" * 60)
-        
-        # Parsuj obsah
-        files = self.parse_artifact_content(artifact_content)
-        project_files = self.extract_project_files(artifact_content)
+    Proces žije mezi požadavky, takže import, kompilace regexů a indexy
+    solution se platí jen jednou. Každý požadavek dostane vlastní
+    FileExtractor s volbami z požadavku, indexy solution (po base_dir)
+    se jen dorovnají podle mtime adresářů.
+    
+    Požadavek:
+        {"command": "extract", "base_dir": "/abs/out", "force": true, "input": "/abs/artifact.txt",
+         "only": ["src/App/**"]}
+        místo input lze poslat "length": N a za hlavičkou N bajtů artefaktu (i komprimovaného)
+    Odpověď:
+        {"ok": true, "files": [{"path": ..., "status": ...}], "messages": [...],
+         "summary": {"written": ..., ...}, "seconds": ...}
+    """
+    
+    def __init__(self):
+        self.index_cache: Dict[str, SolutionIndex] = {}
+        self.started = time.time()
+        self.requests = 0
+    
+    def handle(self, request: Dict, payload: bytes | None) -> Dict:
+        command = request.pop('command', 'extract')
+        if command == 'extract':
+            return self.extract(request, payload)
+        if command == 'status':
+            return {
+                'ok': True,
+                'pid': os.getpid(),
+                'uptime': time.time() - self.started,
+                'requests': self.requests,
+                'indexes': sorted(self.index_cache),
+            }
+        raise ValueError(f"neznámý příkaz: {command}")
+    
+    def extract(self, options: Dict, payload: bytes | None) -> Dict:
+        for name, value in options.items():
+            expected = SERVER_OPTIONS.get(name)
+            if expected is None:
+                raise ValueError(f"neznámá volba: {name}")
+            # type() místo isinstance - bool je podtřída int
+            if type(value) is not expected:
+                raise ValueError(f"volba {name} musí být {expected.__name__}")
+            if expected is list and not all(isinstance(item, str) for item in value):
+                raise ValueError(f"volba {name} musí být seznam řetězců")
+        if options.get('prune') and not options.get('incremental'):
+            raise ValueError("prune vyžaduje incremental")
+        if options.get('prune') and options.get('namespace'):
+            raise ValueError("prune nelze kombinovat s namespace")
+        if options.get('jobs', 1) < 1:
+            raise ValueError("jobs musí být aspoň 1")
+        if ('input' in options) == (payload is not None):
+            raise ValueError("požadavek potřebuje buď input, nebo artefakt za hlavičkou")
         
-        # Spojí oba slovníky
-        all_files = {**files, **project_files}
+        started = time.perf_counter()
+        sink = CollectingReportSink()
+        extractor = FileExtractor(
+            base_dir=options.get('base_dir', '.'),
+            force_overwrite=options.get('force', False),
+            debug=options.get('debug', False),
+            jobs=options.get('jobs', 1),
+            incremental=options.get('incremental', False),
+            prune=options.get('prune', False),
+            sink=sink,
+            reindex=options.get('reindex', False),
+            index_cache=self.index_cache,
+            file_filter=FileFilter(options.get('only'), options.get('exclude'), options.get('namespace')),
+            store=ContentStore(options['store']) if options.get('store') else None
+        )
         
-        if not all_files:
-            print("❌ Nebyly nalezeny žádné soubory k extrakci!")
-            return
+        if 'input' in options:
+            with open_artifact(options['input']) as f:
+                extractor.extract_all_files(f)
+        else:
+            binary, _ = open_decompressed(io.BytesIO(payload))
+            extractor.extract_all_files(io.TextIOWrapper(binary, encoding='utf-8'))
+        self.requests += 1
         
-        # Rozdělení na explicitní a auto-detekované
-        explicit_files = {}
-        auto_detected_files = {}
+        return {
+            'ok': True,
+            'files': [{'path': record.path, 'status': record.status} for record in sink.records],
+            'messages': sink.messages,
+            'summary': {
+                'written': len(extractor.extracted_files),
+                'skipped': len(extractor.skipped_files),
+                'unchanged': len(extractor.unchanged_files),
+                'removed': len(extractor.removed_files),
+                'failed': sum(record.status == 'failed' for record in sink.records),
+                'auto_detected': len(extractor.index.auto_detected_files()),
+            },
+            'seconds': time.perf_counter() - started,
+        }
+
+
+class ExtractionRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Jedno spojení = jeden požadavek a jedna JSON odpověď na jednom řádku.
+    """
+    
+    def handle(self):
+        header = self.rfile.readline(SERVER_MAX_HEADER)
+        if not header:
+            return  # spojení bez požadavku (např. kontrola, zda server běží)
         
-        for file_path, content in all_files.items():
-            # Zkontroluj, jestli byl soubor explicitně definován v artefaktu
-            if f"// File: {file_path}" in artifact_content:
-                explicit_files[file_path] = content
+        command = None
+        try:
+            request = json.loads(header)
+            if not isinstance(request, dict):
+                raise ValueError("hlavička požadavku musí být JSON objekt")
+            # TCP může otevřít kdokoli na stroji - bez tokenu se nic neprovede
+            token = request.pop('token', None)
+            if self.server.token is not None and not (
+                    isinstance(token, str) and hmac.compare_digest(token, self.server.token)):
+                raise PermissionError("chybí nebo neplatný token serveru")
+            command = request.get('command', 'extract')
+            
+            payload = None
+            length = request.pop('length', None)
+            if length is not None:
+                if type(length) is not int or length < 0:
+                    raise ValueError("length musí být nezáporné celé číslo")
+                payload = self.rfile.read(length)
+                if len(payload) != length:
+                    raise ValueError("artefakt skončil předčasně")
+            
+            if command == 'shutdown':
+                response = {'ok': True}
+                # shutdown() čeká na konec serve_forever, nesmí běžet v jeho vlákně
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
             else:
-                auto_detected_files[file_path] = content
-        
-        print(f"📁 Nalezeno celkem {len(all_files)} souborů:")
-        
-        if explicit_files:
-            print(f"📋 Explicitně definované ({len(explicit_files)}):")
-            for file_path in sorted(explicit_files.keys()):
-                print(f"   ✓ {file_path}")
-        
-        if auto_detected_files:
-            print(f"🔍 Auto-detekované ({len(auto_detected_files)}):")
-            for file_path in sorted(auto_detected_files.keys()):
-                print(f"   🤖 {file_path}")
-        
-        print()
-        
-        # Vytvoř soubory
-        for file_path, content in all_files.items():
-            self.create_file(file_path, content)
-        
-        # Shrnutí
-        print("=" * 60)
-        print(f"📊 Výsledky:")
-        print(f"   ✅ Vytvořeno: {len(self.extracted_files)} souborů")
-        print(f"   ⚠️  Přeskočeno: {len(self.skipped_files)} souborů")
+                response = self.server.service.handle(request, payload)
+        except Exception as e:
+            response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
         
-        if auto_detected_files:
-            print(f"   🤖 Auto-detekováno: {len(auto_detected_files)} souborů")
+        if not response['ok']:
+            print(f"❌ {command or 'požadavek'}: {response['error']}")
+        elif command == 'extract':
+            summary = response['summary']
+            print(f"📨 {request.get('base_dir', '.')}: {len(response['files'])} souborů, "
+                  f"zapsáno {summary['written']}, {response['seconds'] * 1000:.1f} ms")
         
-        if self.skipped_files:
-            print(f"\n📋 Přeskočené soubory:")
-            for file_path in self.skipped_files:
-                print(f"   • {file_path}")
-            print(f"\n💡 Tip: Použij --force pro přepsání existujících souborů")
+        try:
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+        except OSError:
+            pass  # klient se mezitím odpojil
+
+
+class _ExtractionTCPServer(socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+def open_server(socket_path: str, port: int | None,
+                token_path: str | None = None) -> Tuple[socketserver.BaseServer, str]:
+    """
+    Otevře naslouchající server - TCP jen na 127.0.0.1 a s tokenem v souboru
+    token_path, jinak Unix socket jen pro vlastníka.
+    
+    Returns:
+        (server, popis adresy)
+    """
+    if port is not None:
+        server = _ExtractionTCPServer(('127.0.0.1', port), ExtractionRequestHandler)
+        try:
+            server.token = write_token_file(token_path or default_token_path())
+        except OSError:
+            server.server_close()
+            raise
+        return server, f"127.0.0.1:{server.server_address[1]}"
+    
+    if not hasattr(socketserver, 'UnixStreamServer'):
+        raise RuntimeError("Unix sockety tu nejsou k dispozici, použij --port")
+    
+    path = Path(socket_path)
+    if path.is_socket():
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            path.unlink()  # socket po spadlém serveru
+        else:
+            raise RuntimeError(f"na {socket_path} už server běží")
+        finally:
+            probe.close()
+    elif path.exists():
+        raise RuntimeError(f"{socket_path} existuje a není socket")
+    
+    previous_umask = os.umask(0o077)
+    try:
+        server = socketserver.UnixStreamServer(socket_path, ExtractionRequestHandler)
+    finally:
+        os.umask(previous_umask)
+    # Přístup hlídají práva socketu, token není potřeba
+    server.token = None
+    return server, socket_path
+
+
+def serve_main(argv: List[str]):
+    """
+    Podpříkaz serve - teplý extrakční server pro extract_client.py.
+    """
+    parser = argparse.ArgumentParser(
+        prog='extract_files.py serve',
+        description='Dlouho běžící extrakční server - klient extract_client.py neplatí start scriptu',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Příklady použití:
+  python extract_files.py serve &
+  python extract_client.py --input artifact.txt --base-dir ./MyProject --force
+  generate_artifact | python extract_client.py --base-dir ./MyProject
+  python extract_files.py serve --port 8765  # Windows - bez Unix socketů
+  python extract_client.py --port 8765 --status
+
+Server vyřizuje požadavky postupně. Kdo se k němu připojí, zapisuje všude,
+kam smí server - Unix socket se proto vytváří jen pro vlastníka. TCP
+naslouchá jen na 127.0.0.1 a přijímá jen požadavky s tokenem, který server
+při startu zapíše do souboru čitelného jen pro vlastníka (--token-file,
+klient ho čte odtud). Relativní cesty v požadavku se berou vůči pracovnímu
+adresáři serveru, klient posílá absolutní.
+        """
+    )
+    parser.add_argument('--socket', type=str,
+                        help=f'Cesta k Unix socketu (default: {default_socket_path()})')
+    parser.add_argument('--port', type=int, help='Naslouchat na 127.0.0.1:PORT místo Unix socketu')
+    parser.add_argument('--token-file', type=str,
+                        help=f'S --port soubor s tokenem pro klienty (default: {default_token_path()})')
+    args = parser.parse_args(argv)
+    
+    if args.socket and args.port is not None:
+        print("❌ --socket nelze kombinovat s --port")
+        sys.exit(1)
+    
+    socket_path = args.socket or default_socket_path()
+    token_path = args.token_file or default_token_path()
+    try:
+        server, address = open_server(socket_path, args.port, token_path)
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Server nejde spustit: {e}")
+        sys.exit(1)
+    server.service = ExtractionService()
+    
+    # SIGTERM ukončí server stejně jako Ctrl+C, včetně smazání socketu
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"🔌 Server naslouchá na {address} (ukončí ho Ctrl+C nebo extract_client.py --shutdown)",
+          flush=True)
+    if args.port is not None:
+        print(f"🔑 Token pro klienty: {token_path}", flush=True)
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.unlink(socket_path if args.port is None else token_path)
+        except OSError:
+            pass
+        print("👋 Server ukončen")
+
+
+def collect_artifact_paths(patterns: List[str]) -> List[str]:
+    """
+    Rozbalí vstupy --batch: soubory, adresáře (jejich soubory) a glob vzory.
+    
+    Pořadí je deterministické - vstupy v zadaném pořadí, rozbalené
+    adresáře a vzory seřazené, duplicity vynechané.
+    """
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(str(path) for path in Path(pattern).iterdir()
+                             if path.is_file() and not path.name.startswith('.'))
+        elif glob.has_magic(pattern):
+            matches = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        else:
+            matches = [pattern]
         
-        if auto_detected_files:
-            print(f"\n🔍 Auto-detekované soubory:")
-            for file_path in sorted(auto_detected_files.keys()):
-                print(f"   🤖 {file_path}")
-            print(f"\n💡 Auto-detekce funguje podle using/namespace statements")
-            print(f"   Pokud je cesta špatná, přidej explicitní // File: komentář")
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
 
 def main():
+    # Podpříkazy mají vlastní argumenty, bez podpříkazu jde o extrakci
+    subcommands = {'pack': pack_main, 'serve': serve_main, 'store': store_main}
+    if len(sys.argv) > 1 and sys.argv[1] in subcommands:
+        subcommands[sys.argv[1]](sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(
         description='Extrahuje soubory z HierarchicalMvvm artefaktu',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -465,18 +4278,48 @@ Příklady použití:
   python extract_files.py --input artifact.txt --base-dir ./MyProject
   python extract_files.py --force
   python extract_files.py --debug
+  python extract_files.py --input artifact.txt --mmap
+  python extract_files.py --input artifact.txt.zst
+  cat artifact.txt.xz | python extract_files.py --pipeline
+  python extract_files.py --input artifact.txt --jobs 8
+  python extract_files.py --input huge.txt --parse-jobs 8 --jobs 8
+  python extract_files.py --input artifact.txt --incremental --prune
+  python extract_files.py --input artifact.txt --only 'src/HierarchicalMvvm.Generator/**'
+  python extract_files.py --input artifact.txt --namespace HierarchicalMvvm.Core --exclude '*Tests*'
+  python extract_files.py --input artifact.txt --stats stats.json --profile extract.prof
+  python extract_files.py --batch artifacts/ 'more/*.txt' --jobs 8
+  generate_artifact | python extract_files.py --pipeline
+  python extract_files.py --input artifact.txt --watch
+  python extract_files.py --input artifact.txt --output-archive out.tar.gz
+  python extract_files.py --input artifact.txt --output-archive - | tar -x -C build
+  python extract_files.py --input new.txt --output-archive out.zip --base-archive out.zip --force
+  python extract_files.py --input artifact.txt --base-dir wt1 --store /var/cache/extract --store-max-size 2G
+  python extract_files.py --input artifact.txt --store /var/cache/extract --store-link hardlink  # soubory 0444
+  python extract_files.py store gc --store /var/cache/extract --max-age 7  # viz store --help
+  python extract_files.py pack src tests -o artifact.txt  # viz pack --help
+  python extract_files.py serve &  # teplý server pro extract_client.py, viz serve --help
   
 Script očekává, že obsah artefaktu bude buď:
 1. Vložen přímo do scriptu (jako ARTIFACT_CONTENT konstanta)
 2. Načten ze souboru (--input parametr)
 3. Načten ze stdin (pipe)
+
+Soubor i stdin mohou být komprimované gzip, bz2, xz nebo zstd - formát
+se pozná podle magic bytes. zstd vyžaduje Python 3.14+ nebo balíček zstandard.
         """
     )
     
     parser.add_argument(
         '--input', '-i',
         type=str,
-        help='Cesta k souboru s obsahem artefaktu'
+        help='Cesta k souboru s obsahem artefaktu (může být gzip/bz2/xz/zstd)'
+    )
+    
+    parser.add_argument(
+        '--batch', '-b',
+        nargs='+',
+        metavar='PATH',
+        help='Více artefaktů najednou - soubory, adresáře nebo glob vzory'
     )
     
     parser.add_argument(
@@ -486,6 +4329,44 @@ Script očekává, že obsah artefaktu bude buď:
         help='Základní adresář pro extrakci (default: aktuální adresář)'
     )
     
+    parser.add_argument(
+        '--output-archive',
+        type=str,
+        metavar='ARCHIVE',
+        help='Zapsat soubory do .zip/.tar/.tar.gz archivu místo do --base-dir (- = tar na stdout)'
+    )
+    
+    parser.add_argument(
+        '--base-archive',
+        type=str,
+        metavar='ARCHIVE',
+        help='S --output-archive převzít soubory z existujícího archivu (přepíšou se jen s --force)'
+    )
+    
+    parser.add_argument(
+        '--only',
+        nargs='+',
+        action='extend',
+        metavar='GLOB',
+        help='Extrahovat jen soubory, jejichž cesta nebo adresář odpovídá některému vzoru'
+    )
+    
+    parser.add_argument(
+        '--exclude',
+        nargs='+',
+        action='extend',
+        metavar='GLOB',
+        help='Vynechat soubory, jejichž cesta nebo adresář odpovídá některému vzoru'
+    )
+    
+    parser.add_argument(
+        '--namespace',
+        nargs='+',
+        action='extend',
+        metavar='NS',
+        help='Extrahovat jen C# typy z namespace NS a jeho podnamespaců'
+    )
+    
     parser.add_argument(
         '--force', '-f',
         action='store_true',
@@ -498,30 +4379,345 @@ Script očekává, že obsah artefaktu bude buď:
         help='Zobrazit debug informace o detekci souborů'
     )
     
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help=f'Zapsat jen soubory se změněným obsahem podle manifestu {MANIFEST_FILE_NAME}'
+    )
+    
+    parser.add_argument(
+        '--prune',
+        action='store_true',
+        help='S --incremental smazat soubory, které z artefaktu zmizely'
+    )
+    
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Počet vláken pro zápis souborů, s --batch i procesů pro parsování (default: 1 = sériově)'
+    )
+    
+    parser.add_argument(
+        '--parse-jobs',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Rozdělit artefakt na shardy a parsovat je v N procesech (default: 1 = sériově)'
+    )
+    
+    parser.add_argument(
+        '--store',
+        type=str,
+        metavar='DIR',
+        help=f'Úložiště obsahu sdílené mezi stromy - stejné soubory se připojí reflinkem místo zápisu '
+             f'(default: ${STORE_ENV}, s --output-archive se proměnná ignoruje)'
+    )
+    
+    parser.add_argument(
+        '--store-link',
+        choices=list(STORE_LINK_MODES),
+        default='auto',
+        help='Způsob připojení z úložiště, při selhání se kopíruje (default: auto = reflink, jinak kopie; '
+             'hardlink šetří místo i bez reflinku, ale soubory jsou jen pro čtení - práva 0444 objektu)'
+    )
+    
+    parser.add_argument(
+        '--store-max-size',
+        type=parse_size,
+        metavar='SIZE',
+        help='Po extrakci vyřadit z úložiště nejdéle nepoužité objekty nad limit (např. 2G)'
+    )
+    
+    parser.add_argument(
+        '--mmap',
+        action='store_true',
+        help='Namapovat --input soubor do paměti a dekódovat bloky až při zápisu'
+    )
+    
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='Číst vstup ve vlákně a zapisovat explicitní bloky hned, jak se uzavřou'
+    )
+    
+    parser.add_argument(
+        '--reindex',
+        action='store_true',
+        help=f'Znovu projít celou solution v --base-dir a ignorovat cache {SOLUTION_INDEX_PATH.as_posix()}'
+    )
+    
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Po extrakci sledovat --input soubor a při změně přepsat jen změněné soubory'
+    )
+    
+    parser.add_argument(
+        '--watch-interval',
+        type=float,
+        default=0.5,
+        help='Interval kontroly změn v sekundách, pokud není k dispozici inotify (default: 0.5)'
+    )
+    
+    parser.add_argument(
+        '--stats',
+        nargs='?',
+        const='-',
+        metavar='FILE',
+        help='Zapsat JSON s časy fází, počty bloků a bajtů do FILE (bez FILE na stderr)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        type=str,
+        metavar='FILE',
+        help='Uložit cProfile data extrakce do FILE (pro pstats/snakeviz)'
+    )
+    
+    parser.add_argument(
+        '--tracemalloc',
+        action='store_true',
+        help='Přidat do --stats špičku paměti a největší alokace (zpomaluje)'
+    )
+    
     args = parser.parse_args()
     
-    # Získej obsah artefaktu
-    artifact_content = None
+    if args.prune and not args.incremental:
+        print("❌ --prune vyžaduje --incremental")
+        sys.exit(1)
+    
+    if args.prune and args.namespace:
+        print("❌ --prune nelze kombinovat s --namespace (namespace smazaných souborů není známý)")
+        sys.exit(1)
+    
+    if args.mmap and not args.input:
+        print("❌ --mmap vyžaduje --input soubor")
+        sys.exit(1)
+    
+    if args.batch and args.input:
+        print("❌ --batch nelze kombinovat s --input")
+        sys.exit(1)
+    
+    if args.parse_jobs > 1 and (args.batch or args.mmap or args.pipeline or args.watch):
+        print("❌ --parse-jobs nelze kombinovat s --batch, --mmap, --pipeline ani --watch")
+        sys.exit(1)
+    
+    if args.pipeline and (args.mmap or args.batch):
+        print("❌ --pipeline nelze kombinovat s --mmap ani --batch")
+        sys.exit(1)
+    
+    if args.watch and (not args.input or args.mmap or args.pipeline):
+        print("❌ --watch vyžaduje --input soubor a nelze ho kombinovat s --mmap ani --pipeline")
+        sys.exit(1)
+    
+    if args.output_archive and (args.incremental or args.watch or args.pipeline):
+        print("❌ --output-archive nelze kombinovat s --incremental, --watch ani --pipeline")
+        sys.exit(1)
+    
+    if args.store and args.output_archive:
+        print("❌ --store nelze kombinovat s --output-archive")
+        sys.exit(1)
+    
+    # Úložiště z prostředí platí jen pro zápis do stromu - archiv ho nepoužívá
+    if not args.store and not args.output_archive:
+        args.store = os.environ.get(STORE_ENV)
+    
+    if args.store_max_size is not None and not args.store:
+        print("❌ --store-max-size vyžaduje --store")
+        sys.exit(1)
+    
+    if args.base_archive and not args.output_archive:
+        print("❌ --base-archive vyžaduje --output-archive")
+        sys.exit(1)
+    
+    if args.output_archive == '-' and sys.stdout.isatty():
+        print("❌ Archiv nejde zapsat na terminál, přesměruj stdout")
+        sys.exit(1)
+    
+    stats = None
+    if args.stats or args.tracemalloc:
+        stats = ExtractionStats()
+    
+    # Archiv na stdout - hlášky jdou na stderr
+    stdout = sys.stdout.buffer
+    messages = redirect_stdout(sys.stderr) if args.output_archive == '-' else nullcontext()
+    
+    with messages, instrument(stats, args.stats or '-', args.profile, args.tracemalloc):
+        archive = None
+        if args.output_archive:
+            try:
+                archive = ArchiveWriter(args.output_archive, args.base_archive, stdout)
+            except (OSError, ValueError, tarfile.TarError) as e:
+                print(f"❌ Nelze otevřít archiv: {e}")
+                sys.exit(1)
+        
+        with archive if archive is not None else nullcontext():
+            run_extraction(args, stats, archive)
+
+
+@contextmanager
+def instrument(stats: ExtractionStats | None, stats_target: str, profile_path: str | None,
+               trace_memory: bool):
+    """
+    Obalí extrakci profilováním a na konci (i při chybě) zapíše statistiky.
+    """
+    profiler = None
+    if trace_memory:
+        tracemalloc.start()
+    if profile_path:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        if trace_memory:
+            stats.record_memory()
+            tracemalloc.stop()
+        if stats is not None:
+            stats.write(stats_target)
+
+
+def open_input_lines(stream, pipeline: bool = False,
+                     stats: ExtractionStats | None = None) -> Tuple[Iterator[str], str | None]:
+    """
+    Řádky binárního vstupu (soubor nebo stdin), komprimovaný se rozbalí za běhu.
+    Se stats se čtení měří jako fáze read.
+    
+    Returns:
+        (iterátor řádků, formát komprese nebo None)
+    """
+    binary, compression = open_decompressed(stream)
+    if pipeline:
+        # Čtecí vlákno běží souběžně s parserem - měří se jen čekání na něj
+        return iter_pipelined_lines(binary, stats=stats), compression
+    if stats is not None:
+        binary = stats.timed_stream(binary)
+    return iter(io.TextIOWrapper(binary, encoding='utf-8')), compression
+
+
+def run_extraction(args: argparse.Namespace, stats: ExtractionStats | None,
+                   archive: ArchiveWriter | None = None):
+    """
+    Načte artefakt podle argumentů a extrahuje z něj soubory.
+    """
+    file_filter = FileFilter(args.only, args.exclude, args.namespace)
+    store = ContentStore(args.store, args.store_link, args.store_max_size) if args.store else None
+    
+    if args.batch:
+        artifact_paths = collect_artifact_paths(args.batch)
+        if not artifact_paths:
+            print("❌ Zadaným vstupům --batch neodpovídá žádný soubor!")
+            sys.exit(1)
+        
+        print(f"📚 Dávka: {len(artifact_paths)} artefaktů")
+        extractor = FileExtractor(
+            base_dir=args.base_dir,
+            force_overwrite=args.force,
+            debug=args.debug,
+            jobs=args.jobs,
+            incremental=args.incremental,
+            prune=args.prune,
+            stats=stats,
+            sink=ConsoleReportSink(),
+            reindex=args.reindex,
+            archive=archive,
+            file_filter=file_filter,
+            store=store
+        )
+        if not extractor.extract_batch(artifact_paths):
+            sys.exit(1)
+        return
+    
+    compression = file_compression(args.input) if args.mmap else None
+    if compression:
+        print(f"⚠️  Komprimovaný artefakt ({compression}) nejde namapovat, čtu ho průběžně")
+        args.mmap = False
+    
+    if args.mmap:
+        try:
+            with stats_phase(stats, 'read'):
+                index = ArtifactIndex(args.input)
+        except Exception as e:
+            print(f"❌ Chyba při čtení souboru {args.input}: {e}")
+            sys.exit(1)
+        
+        with index:
+            print(f"📖 Namapován obsah z: {args.input} ({len(index.entries)} bloků v indexu)")
+            if index.is_blank():
+                print("❌ Obsah artefaktu je prázdný!")
+                sys.exit(1)
+            
+            extractor = FileExtractor(
+                base_dir=args.base_dir,
+                force_overwrite=args.force,
+                debug=args.debug,
+                jobs=args.jobs,
+                incremental=args.incremental,
+                prune=args.prune,
+                stats=stats,
+                sink=ConsoleReportSink(),
+                reindex=args.reindex,
+                archive=archive,
+                file_filter=file_filter,
+                store=store
+            )
+            extractor.extract_indexed_files(index)
+        return
+    
+    if args.watch:
+        if not os.path.isfile(args.input):
+            print(f"❌ Soubor neexistuje: {args.input}")
+            sys.exit(1)
+        
+        extractor = FileExtractor(
+            base_dir=args.base_dir,
+            force_overwrite=args.force,
+            debug=args.debug,
+            jobs=args.jobs,
+            incremental=args.incremental,
+            prune=args.prune,
+            stats=stats,
+            sink=ConsoleReportSink(),
+            reindex=args.reindex,
+            file_filter=file_filter,
+            store=store
+        )
+        if not extractor.watch(args.input, args.watch_interval):
+            sys.exit(1)
+        return
+    
+    # Získej obsah artefaktu (soubor i stdin se čtou po řádcích)
+    artifact_lines = None
+    input_file = None
     
     if args.input:
         # Načti ze souboru
         try:
-            with open(args.input, 'r', encoding='utf-8') as f:
-                artifact_content = f.read()
-            print(f"📖 Načten obsah z: {args.input}")
+            input_file = open(args.input, 'rb')
+            artifact_lines, compression = open_input_lines(input_file, args.pipeline, stats)
+            print(f"📖 Načten obsah z: {args.input}" + (f" ({compression})" if compression else ""))
         except Exception as e:
             print(f"❌ Chyba při čtení souboru {args.input}: {e}")
             sys.exit(1)
     
     elif not sys.stdin.isatty():
         # Načti ze stdin (pipe)
-        artifact_content = sys.stdin.read()
-        print("📖 Načten obsah ze stdin")
+        try:
+            artifact_lines, compression = open_input_lines(sys.stdin.buffer, args.pipeline, stats)
+        except Exception as e:
+            print(f"❌ Chyba při čtení stdin: {e}")
+            sys.exit(1)
+        print("📖 Načten obsah ze stdin" + (f" ({compression})" if compression else ""))
     
     else:
         # Použij embedded obsah (pokud je definován)
         try:
-            artifact_content = ARTIFACT_CONTENT
+            artifact_lines = iter_lines(ARTIFACT_CONTENT)
             print("📖 Použit vestavěný obsah artefaktu")
         except NameError:
             print("❌ Nebyl nalezen žádný obsah artefaktu!")
@@ -529,18 +4725,52 @@ Script očekává, že obsah artefaktu bude buď:
             print("💡 Nebo vlož obsah artefaktu do proměnné ARTIFACT_CONTENT v tomto scriptu")
             sys.exit(1)
     
-    if not artifact_content or not artifact_content.strip():
-        print("❌ Obsah artefaktu je prázdný!")
+    # Prázdný obsah poznáme podle prvního neprázdného řádku
+    leading_lines = []
+    try:
+        for line in artifact_lines:
+            leading_lines.append(line)
+            if line.strip():
+                break
+        else:
+            print("❌ Obsah artefaktu je prázdný!")
+            sys.exit(1)
+    except ARTIFACT_READ_ERRORS as e:
+        print(f"❌ Chyba při čtení {f'souboru {args.input}' if args.input else 'stdin'}: {e}")
         sys.exit(1)
     
+    artifact_lines = itertools.chain(leading_lines, artifact_lines)
+    
     # Extrahuj soubory
     extractor = FileExtractor(
         base_dir=args.base_dir,
         force_overwrite=args.force,
-        debug=args.debug
+        debug=args.debug,
+        jobs=args.jobs,
+        incremental=args.incremental,
+        prune=args.prune,
+        stats=stats,
+        sink=ConsoleReportSink(),
+        reindex=args.reindex,
+        archive=archive,
+        file_filter=file_filter,
+        store=store
     )
     
-    extractor.extract_all_files(artifact_content)
+    try:
+        if args.pipeline:
+            extractor.extract_stream(artifact_lines)
+        elif args.parse_jobs > 1:
+            extractor.extract_sharded(artifact_lines, args.parse_jobs)
+        else:
+            extractor.extract_all_files(artifact_lines)
+    except ARTIFACT_READ_ERRORS as e:
+        # Vstup se čte až během extrakce - useknutý nebo poškozený se pozná teprve tady
+        print(f"❌ Chyba při čtení {f'souboru {args.input}' if args.input else 'stdin'}: {e}")
+        sys.exit(1)
+    finally:
+        if input_file:
+            input_file.close()
 
 # Konstanta s obsahem artefaktu (volitelné - můžeš sem vložit obsah místo použití --input)
 ARTIFACT_CONTENT = """